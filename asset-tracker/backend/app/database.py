@@ -1,16 +1,54 @@
+import os
+from uuid import uuid4
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://localhost/asset_tracker")
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+# "transaction" when DATABASE_URL points at a transaction-level pooler such as
+# PgBouncer: no session state survives a transaction, so statement caches are
+# off and the app keeps no pool of its own unless DB_POOL_SIZE asks for one
+DB_POOLER_MODE = os.getenv("DB_POOLER_MODE", "")
+TRANSACTION_POOLER = DB_POOLER_MODE == "transaction"
+
+# Per-worker pool sizes (0 = NullPool); app.server derives them from a total connection budget
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "0" if TRANSACTION_POOLER else "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+# The sync engine only serves migrations, maintenance jobs and scripts
+DB_SYNC_POOL_SIZE = int(os.getenv("DB_SYNC_POOL_SIZE", "0" if TRANSACTION_POOLER else "10"))
+DB_SYNC_MAX_OVERFLOW = int(os.getenv("DB_SYNC_MAX_OVERFLOW", "20"))
+
+# LISTEN needs a real session, so behind a transaction pooler point this at PostgreSQL itself
+LISTEN_DATABASE_URL = os.getenv("DB_LISTEN_URL", DATABASE_URL)
+
+
+def _pool_args(pool_size: int, max_overflow: int, **queue_pool_args):
+    if pool_size == 0:
+        return {"poolclass": NullPool}
+    return {"pool_size": pool_size, "max_overflow": max_overflow, "pool_pre_ping": True, **queue_pool_args}
+
+
+def _async_connect_args():
+    if not TRANSACTION_POOLER:
+        return {}
+    # Each transaction may run on a different server connection, so nothing
+    # prepared may be reused across transactions: no asyncpg or SQLAlchemy
+    # statement cache, and unique names so two clients' statements can't clash
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
 
-DATABASE_URL = "postgresql://localhost/asset_tracker"
 
 engine = create_engine(
     DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
-    echo=False
+    echo=False,
+    **_pool_args(DB_SYNC_POOL_SIZE, DB_SYNC_MAX_OVERFLOW, poolclass=QueuePool)
 )
 
 SessionLocal = sessionmaker(
@@ -19,6 +57,21 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Async engine used by the API routers so DB round trips don't hold threadpool threads
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    connect_args=_async_connect_args(),
+    **_pool_args(DB_POOL_SIZE, DB_MAX_OVERFLOW)
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
@@ -29,3 +82,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Async dependency for routes
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
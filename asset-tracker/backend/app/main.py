@@ -1,10 +1,80 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
 from app.routes import categories, employees, assets
-from app.routes import clearance
+from app.routes import clearance, bulk, exports, history, events, warranty
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.gzip import GZipMiddleware
+from starlette.concurrency import run_in_threadpool
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from app.database import engine, async_engine, AsyncSessionLocal, DB_POOL_SIZE
+from app.utils.config import (
+    RUN_MIGRATIONS_ON_STARTUP,
+    STATS_RECONCILE_INTERVAL_SECONDS,
+    HISTORY_MAINTENANCE_INTERVAL_SECONDS,
+    WARRANTY_REPORT_REFRESH_SECONDS,
+    DRAIN_GRACE_SECONDS,
+)
+from app.utils.migrations import run_migrations, check_indexes
+from app.utils.metrics import MetricsMiddleware, setup_metrics
+from app.utils.inventory_stats import reconcile_periodically
+from app.utils.history_partitions import maintain_periodically
+from app.utils.warranty_report import refresh_periodically
+from app.utils.change_feed import change_feed
+from app.utils.asset_lookup import LOOKUP_SQL
+from app.utils.cache import lookup_cache, CATEGORIES_KEY, CATEGORY_INDEX_KEY, EMPLOYEES_KEY
+from app.utils.readiness import (
+    server_state,
+    warm_pool,
+    warm_caches,
+    database_ready,
+    install_drain_handler,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if RUN_MIGRATIONS_ON_STARTUP:
+        await run_in_threadpool(run_migrations, engine)
+    await run_in_threadpool(check_indexes, engine)
+
+    # Connect, prepare the scan lookup and fill the caches before taking traffic
+    await warm_pool(async_engine, DB_POOL_SIZE, [(LOOKUP_SQL, {"codes": []})])
+    await warm_caches(AsyncSessionLocal, lookup_cache, {
+        CATEGORIES_KEY: categories.load_categories,
+        CATEGORY_INDEX_KEY: categories.load_category_index,
+        EMPLOYEES_KEY: employees.load_employees,
+    })
+
+    background_tasks = [
+        asyncio.create_task(
+            reconcile_periodically(AsyncSessionLocal, STATS_RECONCILE_INTERVAL_SECONDS)
+        ),
+        asyncio.create_task(
+            maintain_periodically(engine, HISTORY_MAINTENANCE_INTERVAL_SECONDS)
+        ),
+        asyncio.create_task(
+            refresh_periodically(AsyncSessionLocal, WARRANTY_REPORT_REFRESH_SECONDS)
+        ),
+    ]
+    change_feed.start()
+
+    install_drain_handler(change_feed.close_streams, DRAIN_GRACE_SECONDS)
+    server_state.ready = True
+    yield
+    server_state.ready = False
+
+    await change_feed.stop()
+    for task in background_tasks:
+        task.cancel()
+    await async_engine.dispose()
+    engine.dispose()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+setup_metrics({"async": async_engine.sync_engine, "sync": engine})
 
 # Add GZIP compression middleware for faster responses
 app.add_middleware(GZipMiddleware, minimum_size=1000)
@@ -17,12 +87,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so timings include compression and CORS handling
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(categories.router)
 app.include_router(employees.router)
 app.include_router(assets.router)
 app.include_router(clearance.router)
+app.include_router(bulk.router)
+app.include_router(exports.router)
+app.include_router(history.router)
+app.include_router(events.router)
+app.include_router(warranty.router)
 
 
 @app.get("/")
 def root():
     return {"message": "Asset Tracker Backend Running"}
+
+
+@app.get("/metrics")
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/health/live")
+def liveness():
+    """The process is up and serving; restart it only when this fails"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Whether this worker should receive traffic: warmed up, not draining, database reachable"""
+
+    if server_state.draining:
+        return JSONResponse({"status": "draining"}, status_code=503)
+    if not server_state.ready:
+        return JSONResponse({"status": "starting"}, status_code=503)
+    if not await database_ready(async_engine):
+        return JSONResponse({"status": "database unavailable"}, status_code=503)
+    return {"status": "ready"}
@@ -1,350 +1,257 @@
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Optional
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel, Field
+import json
+import tempfile
 import uuid
-from datetime import datetime
 from app.utils.config import ADMIN_SECRET
-from app.database import get_db
+from app.database import get_async_db
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.streaming import ndjson_lines, NDJSON_MEDIA_TYPE
+from app.utils.asset_codes import next_asset_codes
+from app.utils.asset_import import import_assets
+from app.utils.lifecycle import apply_transition, TransitionItem
+from app.utils.inventory_stats import apply_counter_deltas, asset_deltas, read_stats
+from app.utils.asset_lookup import lookup_assets, scan_cache
+from app.utils.asset_search import search_assets
+from app.utils.warranty_report import warranty_report
+from app.utils.holdings import invalidate_holdings
+from app.utils.repair_analytics import repair_analytics, invalidate_repair_analytics, clear_repair_analytics
+from app.utils.responses import accepted_encodings, json_response, rows_response, ROW_LAYOUTS
+from app.utils.asset_snapshot import (
+    current_version,
+    etag_matches,
+    snapshot_body,
+    SNAPSHOT_FORMATS,
+    SNAPSHOT_MEDIA_TYPES,
+)
 
 router = APIRouter()
 
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
+
+# Generated codes tried before giving up when hand-entered codes occupy them
+AUTO_CODE_ATTEMPTS = 5
+
+INSERT_ASSET_SQL = text("""
+    INSERT INTO assets
+    (asset_code, category_id, type, brand, model,
+     serial_number, status, location,
+     warranty_applicable, warranty_end_date)
+    VALUES
+    (:code, :cat, :type, :brand, :model,
+     :sn, 'instock', :loc,
+     COALESCE(:warranty, FALSE), :warranty_end)
+    ON CONFLICT (asset_code) DO NOTHING
+    RETURNING asset_code
+""")
+
 @router.get("/assets/count")
-def count_assets(db: Session = Depends(get_db)):
-    result = db.execute(
-        text("SELECT COUNT(*) AS total FROM assets")
-    ).fetchone()
-    return {"count": result.total or 0}
+async def count_assets(db: AsyncSession = Depends(get_async_db)):
+    result = (await db.execute(
+        text("SELECT count AS total FROM inventory_counters WHERE dimension = 'total' AND key = ''")
+    )).fetchone()
+    return {"count": result.total if result else 0}
+
+@router.get("/stats")
+async def inventory_stats(db: AsyncSession = Depends(get_async_db)):
+    """Dashboard counts by status, category and location from the maintained counters"""
+    return await read_stats(db)
+
+# Registered before /assets/{asset_code} so "search" isn't taken for a code
+@router.get("/assets/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Ranked prefix/fuzzy search over code, serial, brand, model, category and assignee"""
+
+    return {"items": await search_assets(db, q, limit)}
+
+# Registered before /assets/{asset_code} so "snapshot" isn't taken for a code
+@router.get("/assets/snapshot")
+async def asset_snapshot(
+    request: Request,
+    since: Optional[str] = None,
+    format: str = Query("json", pattern=SNAPSHOT_FORMATS),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    The whole inventory as a versioned, dictionary-encoded columnar snapshot.
+
+    Pass a held version as `since` to get only the rows changed after it, and
+    as If-None-Match to get 304 when nothing changed. Deltas are upserts by
+    asset_code; one too large to be worth it comes back as a full snapshot
+    (`delta` false).
+    """
+
+    version = await current_version(db)
+    headers = {"ETag": f'W/"{version}"', "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, version):
+        return Response(status_code=304, headers=headers)
+
+    accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+    body, encoding = await snapshot_body(db, version, format, accepted, since)
+    if encoding:
+        headers.update({"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+    return Response(body, media_type=SNAPSHOT_MEDIA_TYPES[format], headers=headers)
 
 @router.get("/assets/{asset_code}")
-def get_asset(asset_code: str, db: Session = Depends(get_db)):
+async def get_asset(asset_code: str, request: Request, db: AsyncSession = Depends(get_async_db)):
 
-    result = db.execute(
-        text("""
-            SELECT 
-                a.asset_code,
-                c.name AS category,
-                a.type,
-                a.brand,
-                a.model,
-                a.serial_number,
-                a.status,
-                a.location,
-                a.warranty_applicable,
-                a.warranty_end_date,
-                a.remarks,
-                aa.employee_id,
-                e.name AS employee_name,
-                e.email AS employee_email,
-                e.location AS employee_location
-            FROM assets a
-            JOIN categories c ON a.category_id = c.id
-            LEFT JOIN asset_assignments aa ON a.asset_code = aa.asset_code 
-                AND aa.is_active = TRUE
-            LEFT JOIN employees e ON aa.employee_id = e.employee_id
-            WHERE a.asset_code = :code
-        """),
-        {"code": asset_code}
-    ).fetchone()
+    result = (await lookup_assets(db, [asset_code])).get(asset_code)
 
     if not result:
         raise HTTPException(status_code=404, detail="Asset not found")
 
-    return dict(result._mapping)
+    return await json_response(request, lambda: result)
 
-@router.post("/assign")
-def assign_asset(asset_code: str, employee_id: str, db: Session = Depends(get_db)):
-
-    # Check asset exists
-    asset = db.execute(
-        text("SELECT status FROM assets WHERE asset_code = :code"),
-        {"code": asset_code}
-    ).fetchone()
+async def run_transition(db: AsyncSession, name: str, item: TransitionItem):
+    """Apply one lifecycle transition, raising the engine's error for this asset"""
 
-    if not asset:
-        raise HTTPException(status_code=404, detail="Asset not found")
+    result = (await apply_transition(db, name, [item]))[0]
 
-    if asset.status == "assigned":
-        raise HTTPException(status_code=400, detail="Asset already assigned")
+    if not result["success"]:
+        raise HTTPException(status_code=result["status_code"], detail=result["detail"])
 
-    # Check employee exists
-    employee = db.execute(
-        text("SELECT employee_id FROM employees WHERE employee_id = :eid AND status='active'"),
-        {"eid": employee_id}
-    ).fetchone()
+    await db.commit()
+    scan_cache.invalidate(item.asset_code)
+    invalidate_holdings([result])
+    invalidate_repair_analytics(name, [result])
 
-    if not employee:
-        raise HTTPException(status_code=404, detail="Employee not found")
-
-    # Insert assignment
-    db.execute(
-        text("""
-            INSERT INTO asset_assignments (asset_code, employee_id)
-            VALUES (:code, :eid)
-        """),
-        {"code": asset_code, "eid": employee_id}
-    )
+    return result
 
-    # Update asset status
-    db.execute(
-        text("""
-            UPDATE assets
-            SET status='assigned',
-                updated_at=CURRENT_TIMESTAMP
-            WHERE asset_code=:code
-        """),
-        {"code": asset_code}
-    )
+@router.post("/assign")
+async def assign_asset(asset_code: str, employee_id: str, db: AsyncSession = Depends(get_async_db)):
 
-    db.commit()
+    await run_transition(db, "assign", TransitionItem(asset_code, employee_id))
 
     return {"message": "Asset assigned successfully"}
 
 @router.post("/return")
-def return_asset(asset_code: str, remarks: str = "", db: Session = Depends(get_db)):
+async def return_asset(asset_code: str, remarks: str = "", db: AsyncSession = Depends(get_async_db)):
 
-    # Check active assignment
-    assignment = db.execute(
-        text("""
-            SELECT id FROM asset_assignments
-            WHERE asset_code = :code
-            AND is_active = TRUE
-        """),
-        {"code": asset_code}
-    ).fetchone()
-
-    if not assignment:
-        raise HTTPException(status_code=400, detail="Asset not currently assigned")
-
-    # Close assignment
-    db.execute(
-        text("""
-            UPDATE asset_assignments
-            SET returned_date = CURRENT_TIMESTAMP,
-                is_active = FALSE
-            WHERE asset_code = :code
-            AND is_active = TRUE
-        """),
-        {"code": asset_code}
-    )
-
-    # Update asset status
-    db.execute(
-        text("""
-            UPDATE assets
-            SET status = 'instock',
-                updated_at = CURRENT_TIMESTAMP
-            WHERE asset_code = :code
-        """),
-        {"code": asset_code}
-    )
-
-    # Log to asset history
-    db.execute(
-        text("""
-            INSERT INTO asset_history (asset_code, action, old_status, new_status, remarks)
-            VALUES (:code, 'return', 'assigned', 'instock', :remarks)
-        """),
-        {"code": asset_code, "remarks": remarks}
-    )
-
-    db.commit()
+    await run_transition(db, "return", TransitionItem(asset_code, remarks=remarks))
 
     return {"message": "Asset returned to stock"}
 
 @router.post("/repair")
-def send_to_repair(asset_code: str, repair_employee_id: str, remarks: str = "", db: Session = Depends(get_db)):
-
-    # Close previous repair entries
-    db.execute(
-    text("""
-        UPDATE repair_tracking
-        SET is_active = FALSE
-        WHERE asset_code = :code
-        AND is_active = TRUE
-    """),
-    {"code": asset_code}
-)
-
-    # Close assignment if exists
-    db.execute(
-        text("""
-            UPDATE asset_assignments
-            SET returned_date = CURRENT_TIMESTAMP,
-                is_active = FALSE
-            WHERE asset_code = :code
-            AND is_active = TRUE
-        """),
-        {"code": asset_code}
-    )
-
-    # Update asset status
-    db.execute(
-        text("""
-            UPDATE assets
-            SET status = 'repair',
-                updated_at = CURRENT_TIMESTAMP
-            WHERE asset_code = :code
-        """),
-        {"code": asset_code}
-    )
-
-    # Add repair tracking
-    db.execute(
-        text("""
-            INSERT INTO repair_tracking (asset_code, repair_assignee_id)
-            VALUES (:code, :emp)
-        """),
-        {"code": asset_code, "emp": repair_employee_id}
-    )
-
-    # Log to asset history
-    db.execute(
-        text("""
-            INSERT INTO asset_history (asset_code, action, old_status, new_status, employee_id, remarks)
-            VALUES (:code, 'repair', 'assigned', 'repair', :emp, :remarks)
-        """),
-        {"code": asset_code, "emp": repair_employee_id, "remarks": remarks}
-    )
+async def send_to_repair(asset_code: str, repair_employee_id: str, remarks: str = "", db: AsyncSession = Depends(get_async_db)):
 
-    db.commit()
+    await run_transition(db, "repair", TransitionItem(asset_code, repair_employee_id, remarks))
 
     return {"message": "Asset moved to repair"}
 
 @router.post("/repair/complete")
-def complete_repair(asset_code: str, db: Session = Depends(get_db)):
+async def complete_repair(asset_code: str, db: AsyncSession = Depends(get_async_db)):
 
-    # Update asset status
-    db.execute(
-        text("""
-            UPDATE assets
-            SET status = 'instock',
-                type = 'Repaired',
-                updated_at = CURRENT_TIMESTAMP
-            WHERE asset_code = :code
-        """),
-        {"code": asset_code}
-    )
-
-    # Close repair record
-    db.execute(
-        text("""
-            UPDATE repair_tracking
-            SET is_active = FALSE
-            WHERE asset_code = :code
-            AND is_active = TRUE
-        """),
-        {"code": asset_code}
-    )
-
-    db.commit()
+    await run_transition(db, "complete_repair", TransitionItem(asset_code))
 
     return {"message": "Asset repaired and moved to stock"}
 
 @router.post("/missing")
-def mark_missing(asset_code: str, remarks: str = "", db: Session = Depends(get_db)):
-
-    # Close assignment if active
-    db.execute(
-        text("""
-            UPDATE asset_assignments
-            SET returned_date = CURRENT_TIMESTAMP,
-                is_active = FALSE
-            WHERE asset_code = :code
-            AND is_active = TRUE
-        """),
-        {"code": asset_code}
-    )
-
-    # Update asset status
-    db.execute(
-        text("""
-            UPDATE assets
-            SET status = 'missing',
-                updated_at = CURRENT_TIMESTAMP
-            WHERE asset_code = :code
-        """),
-        {"code": asset_code}
-    )
-
-    # Log to asset history
-    db.execute(
-        text("""
-            INSERT INTO asset_history (asset_code, action, new_status, remarks)
-            VALUES (:code, 'missing', 'missing', :remarks)
-        """),
-        {"code": asset_code, "remarks": remarks}
-    )
+async def mark_missing(asset_code: str, remarks: str = "", db: AsyncSession = Depends(get_async_db)):
 
-    db.commit()
+    await run_transition(db, "missing", TransitionItem(asset_code, remarks=remarks))
 
     return {"message": "Asset marked as missing"}
 
 @router.post("/missing/recover")
-def recover_missing(asset_code: str, db: Session = Depends(get_db)):
-
-    db.execute(
-        text("""
-            UPDATE assets
-            SET status = 'instock',
-                updated_at = CURRENT_TIMESTAMP
-            WHERE asset_code = :code
-        """),
-        {"code": asset_code}
-    )
+async def recover_missing(asset_code: str, db: AsyncSession = Depends(get_async_db)):
 
-    db.commit()
+    await run_transition(db, "recover", TransitionItem(asset_code))
 
     return {"message": "Missing asset recovered and moved to stock"}
 
 @router.post("/retire")
-def retire_asset(asset_code: str, secret: str, remarks: str = "", db: Session = Depends(get_db)):
+async def retire_asset(asset_code: str, secret: str, remarks: str = "", db: AsyncSession = Depends(get_async_db)):
 
     if secret != ADMIN_SECRET:
         raise HTTPException(status_code=403, detail="Invalid admin secret")
 
-    # Close assignment
-    db.execute(
-        text("""
-            UPDATE asset_assignments
-            SET returned_date = CURRENT_TIMESTAMP,
-                is_active = FALSE
-            WHERE asset_code = :code
-            AND is_active = TRUE
-        """),
-        {"code": asset_code}
-    )
-
-    # Update asset status
-    db.execute(
-        text("""
-            UPDATE assets
-            SET status = 'retired',
-                updated_at = CURRENT_TIMESTAMP
-            WHERE asset_code = :code
-        """),
-        {"code": asset_code}
-    )
+    await run_transition(db, "retire", TransitionItem(asset_code, remarks=remarks))
 
-    # Log to asset history
-    db.execute(
-        text("""
-            INSERT INTO asset_history (asset_code, action, new_status, remarks)
-            VALUES (:code, 'retire', 'retired', :remarks)
-        """),
-        {"code": asset_code, "remarks": remarks}
-    )
+    return {"message": "Asset retired successfully"}
 
-    db.commit()
+IMPORT_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+LIST_ASSETS_MAX_LIMIT = 1000
+STREAM_BATCH_SIZE = 500
+LOOKUP_MAX_CODES = 500
 
-    return {"message": "Asset retired successfully"}
 
 @router.get("/assets")
-def list_assets(db: Session = Depends(get_db)):
-
-    result = db.execute(
-        text("""
+async def list_assets(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=LIST_ASSETS_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+    employee_id: Optional[str] = None,
+    q: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    layout: str = Query("objects", pattern=ROW_LAYOUTS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    List assets newest first.
+
+    Without `limit` the full (filtered) list is returned as before. With `limit`
+    a page is returned together with `next_cursor`, a keyset position on
+    (created_at, asset_code) to pass back as `cursor`. `format=ndjson` streams
+    every matching row from a server-side cursor instead of building a list.
+    `layout=columnar` returns `columns` once and `rows` as value arrays.
+    """
+
+    filters = []
+    params = {}
+
+    if status:
+        filters.append("a.status = :status")
+        params["status"] = status
+
+    if category:
+        filters.append("LOWER(c.name) = LOWER(:category)")
+        params["category"] = category
+
+    if location:
+        filters.append("LOWER(a.location) = LOWER(:location)")
+        params["location"] = location
+
+    if employee_id:
+        filters.append("aa.employee_id = :employee_id")
+        params["employee_id"] = employee_id
+
+    if q:
+        filters.append("""(
+                a.asset_code ILIKE :q
+                OR a.serial_number ILIKE :q
+                OR a.brand ILIKE :q
+                OR a.model ILIKE :q
+                OR e.name ILIKE :q
+            )""")
+        params["q"] = f"%{q}%"
+
+    if cursor:
+        params["cursor_created_at"], params["cursor_code"] = decode_cursor(cursor)
+        filters.append("(a.created_at, a.asset_code) < (:cursor_created_at, :cursor_code)")
+
+    where_clause = ("WHERE " + " AND ".join(filters)) if filters else ""
+    limit_clause = ""
+    if limit and format == "json":
+        # Fetch one extra row to know whether another page exists
+        limit_clause = "LIMIT :limit"
+        params["limit"] = limit + 1
+
+    query = text(f"""
             SELECT
                 a.asset_code,
                 c.name AS category,
@@ -356,7 +263,8 @@ def list_assets(db: Session = Depends(get_db)):
                 a.location,
                 a.warranty_end_date,
                 aa.employee_id,
-                e.name AS employee_name
+                e.name AS employee_name,
+                a.created_at
             FROM assets a
             JOIN categories c ON a.category_id = c.id
             LEFT JOIN asset_assignments aa
@@ -364,15 +272,51 @@ def list_assets(db: Session = Depends(get_db)):
                 AND aa.is_active = TRUE
             LEFT JOIN employees e
                 ON e.employee_id = aa.employee_id
-            ORDER BY a.created_at DESC
+            {where_clause}
+            ORDER BY a.created_at DESC, a.asset_code DESC
+            {limit_clause}
         """)
-    )
 
-    return [dict(row._mapping) for row in result]
+    if format == "ndjson":
+        result = await db.stream(
+            query,
+            params,
+            execution_options={"yield_per": STREAM_BATCH_SIZE},
+        )
+        return StreamingResponse(
+            ndjson_lines(result, STREAM_BATCH_SIZE),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    result = await db.execute(query, params)
+    columns = list(result.keys())
+    rows = result.all()
+
+    if not limit:
+        return await rows_response(request, columns, rows, layout)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.asset_code)
+
+    return await rows_response(request, columns, rows, layout, next_cursor=next_cursor)
+
+
+async def _record_edit(db: AsyncSession, asset_code: str, action: str, old_status, new_status):
+    """History row for add/update; the 0005 trigger on asset_history sends it to the live feed"""
+    await db.execute(
+        text("""
+            INSERT INTO asset_history (asset_code, action, old_status, new_status)
+            VALUES (:code, :action, :old, :new)
+        """),
+        {"code": asset_code, "action": action, "old": old_status, "new": new_status}
+    )
 
 
 @router.post("/assets/add")
-def add_asset(
+async def add_asset(
     asset_code: Optional[str] = None,
     category_id: int = None,
     type: str = None,
@@ -380,41 +324,20 @@ def add_asset(
     model: str = None,
     serial_number: str = None,
     location: str = None,
-    db: Session = Depends(get_db),
+    warranty_applicable: Optional[bool] = None,
+    warranty_end_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
 
-    if not asset_code:
-        # Get category name first
-        category_result = db.execute(
-            text("SELECT name FROM categories WHERE id = :id"),
-            {"id": category_id}
-        ).fetchone()
-        
-        category_name = category_result.name if category_result else "XXX"
-        prefix = category_name[:3].upper()
-        
-        # Add date in DDMMYY format (without spaces)
-        date_str = datetime.now().strftime("%d%m%y")
-        
-        # Generate unique barcode by incrementing number until we find one that doesn't exist
-        counter = 1
-        while True:
-            asset_code = f"{prefix}{date_str}{counter:03d}"
-            existing = db.execute(
-                text("SELECT asset_code FROM assets WHERE asset_code = :code"),
-                {"code": asset_code}
-            ).fetchone()
-            if not existing:
-                break
-            counter += 1
-
-    existing = db.execute(
-        text("""
-            SELECT status FROM assets
-            WHERE asset_code = :code
-        """),
-        {"code": asset_code}
-    ).fetchone()
+    existing = None
+    if asset_code:
+        existing = (await db.execute(
+            text("""
+                SELECT status, category_id, location FROM assets
+                WHERE asset_code = :code
+            """),
+            {"code": asset_code}
+        )).fetchone()
 
     # Asset exists
     if existing:
@@ -423,16 +346,19 @@ def add_asset(
             status_update = ", status='instock'"
 
             # Close repair entry
-            db.execute(
+            await db.execute(
                 text("""
                     UPDATE repair_tracking
-                    SET is_active = FALSE
+                    SET is_active = FALSE,
+                        repair_end_date = CURRENT_TIMESTAMP,
+                        close_action = 'updated'
                     WHERE asset_code = :code
+                    AND is_active = TRUE
                 """),
                 {"code": asset_code}
             )
 
-        db.execute(
+        await db.execute(
             text(f"""
                 UPDATE assets
                 SET category_id=:cat,
@@ -441,6 +367,9 @@ def add_asset(
                     model=:model,
                     serial_number=:sn,
                     location=:loc,
+                    -- Omitted warranty fields keep their stored values
+                    warranty_applicable=COALESCE(:warranty, warranty_applicable),
+                    warranty_end_date=COALESCE(:warranty_end, warranty_end_date),
                     updated_at=CURRENT_TIMESTAMP
                     {status_update}
                 WHERE asset_code=:code
@@ -453,43 +382,133 @@ def add_asset(
                 "model": model,
                 "sn": serial_number,
                 "loc": location,
+                "warranty": warranty_applicable,
+                "warranty_end": warranty_end_date,
             }
         )
 
-        db.commit()
+        new_status = "instock" if existing.status == "repair" else existing.status
+        await _record_edit(db, asset_code, "updated", existing.status, new_status)
+        await apply_counter_deltas(db, asset_deltas(
+            (existing.status, existing.category_id, existing.location),
+            (new_status, category_id, location),
+        ))
+
+        await db.commit()
+        scan_cache.invalidate(asset_code)
+        warranty_report.invalidate(asset_code)
+        if existing.status == "repair":
+            clear_repair_analytics()
 
         return {"message": "Asset updated", "asset_code": asset_code}
 
     # New asset
-    db.execute(
-        text("""
-            INSERT INTO assets
-            (asset_code, category_id, type, brand, model,
-             serial_number, status, location)
-            VALUES
-            (:code, :cat, :type, :brand, :model,
-             :sn, 'instock', :loc)
-        """),
-        {
-            "code": asset_code,
-            "cat": category_id,
-            "type": type,
-            "brand": brand,
-            "model": model,
-            "sn": serial_number,
-            "loc": location,
-        }
-    )
+    new_asset = {
+        "cat": category_id,
+        "type": type,
+        "brand": brand,
+        "model": model,
+        "sn": serial_number,
+        "loc": location,
+        "warranty": warranty_applicable,
+        "warranty_end": warranty_end_date,
+    }
+
+    if asset_code:
+        if not (await db.execute(INSERT_ASSET_SQL, {**new_asset, "code": asset_code})).fetchone():
+            # Added by a concurrent request since the lookup above
+            raise HTTPException(status_code=409, detail="Asset code already exists")
+    else:
+        # Next free <prefix><DDMMYY><nnn> code from the per-day counter. A
+        # generated code is only ever inserted: if someone entered it by hand,
+        # the insert skips it and the next counter value is tried.
+        for _ in range(AUTO_CODE_ATTEMPTS):
+            candidate = (await next_asset_codes(db, category_id))[0]
+            if (await db.execute(INSERT_ASSET_SQL, {**new_asset, "code": candidate})).fetchone():
+                asset_code = candidate
+                break
+        else:
+            raise HTTPException(status_code=409, detail="No free asset code for this category today")
+
+    await _record_edit(db, asset_code, "added", None, "instock")
+    await apply_counter_deltas(db, asset_deltas(None, ("instock", category_id, location)))
 
-    db.commit()
+    await db.commit()
+    scan_cache.invalidate(asset_code)
+    warranty_report.invalidate(asset_code)
 
     return {"message": "Asset added successfully", "asset_code": asset_code}
 
 
+class LookupRequest(BaseModel):
+    codes: List[str] = Field(..., min_length=1, max_length=LOOKUP_MAX_CODES)
+
+
+@router.post("/assets/lookup")
+async def lookup_asset_codes(request: LookupRequest, db: AsyncSession = Depends(get_async_db)):
+    """Resolve a batch of scanned codes in one query; unknown codes are listed under `missing`"""
+
+    found = await lookup_assets(db, request.codes)
+    codes = list(dict.fromkeys(request.codes))
+
+    return {
+        "items": [found[code] for code in codes if code in found],
+        "missing": [code for code in codes if code not in found],
+    }
+
+
+@router.post("/assets/codes/reserve")
+async def reserve_asset_codes(
+    category_id: int,
+    count: int = Query(..., ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Reserve a block of consecutive asset codes, e.g. for bulk label printing"""
+
+    codes = await next_asset_codes(db, category_id, count)
+
+    await db.commit()
+
+    return {"asset_codes": codes}
+
+
+@router.post("/assets/import")
+async def import_assets_file(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Bulk import assets from a CSV or XLSX file sent as the raw request body.
+
+    Streams NDJSON progress events, one per committed chunk, followed by a
+    final summary with per-row errors, or by an error event with the last
+    committed row if a chunk failed.
+    """
+
+    upload = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MAX_MEMORY)
+    async for chunk in request.stream():
+        upload.write(chunk)
+    upload.seek(0)
+
+    async def events():
+        try:
+            async for event in import_assets(db, upload, format):
+                yield json.dumps(event) + "\n"
+        finally:
+            upload.close()
+
+    return StreamingResponse(events(), media_type=NDJSON_MEDIA_TYPE)
+
+
 @router.get("/repair/list")
-def repair_list(db: Session = Depends(get_db)):
+async def repair_list(
+    request: Request,
+    layout: str = Query("objects", pattern=ROW_LAYOUTS),
+    db: AsyncSession = Depends(get_async_db),
+):
 
-    result = db.execute(
+    result = await db.execute(
         text("""
             SELECT
                 r.asset_code,
@@ -502,12 +521,21 @@ def repair_list(db: Session = Depends(get_db)):
         """)
     )
 
-    return [dict(row._mapping) for row in result]
-
-
-
-
-
+    return await rows_response(request, list(result.keys()), result.all(), layout)
 
+@router.get("/repair/analytics")
+async def repair_queue_analytics(technician_id: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """
+    Open repairs and turnaround per technician: queue depth, average, p50
+    and p90 turnaround hours of recently completed repairs, and open repairs
+    per aging bucket. `technician_id` narrows the cached result to one.
+    """
 
+    analytics = await repair_analytics(db)
+    if technician_id is None:
+        return analytics
 
+    return {
+        **analytics,
+        "technicians": [t for t in analytics["technicians"] if t["technician_id"] == technician_id],
+    }
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+from app.utils.config import ADMIN_SECRET
+from app.database import get_async_db
+from app.utils.lifecycle import apply_transition, TransitionItem
+from app.utils.asset_lookup import scan_cache
+from app.utils.holdings import invalidate_holdings
+from app.utils.repair_analytics import invalidate_repair_analytics
+
+router = APIRouter()
+
+BULK_MAX_ITEMS = 5000
+
+
+class BulkItem(BaseModel):
+    asset_code: str
+    # Assignee for /bulk/assign, repair technician for /bulk/repair
+    employee_id: Optional[str] = None
+    remarks: str = ""
+
+
+class BulkRequest(BaseModel):
+    items: List[BulkItem] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+async def _run_bulk(db: AsyncSession, name: str, request: BulkRequest):
+    """Apply a transition to the whole batch in one statement and transaction"""
+
+    results = await apply_transition(
+        db,
+        name,
+        [TransitionItem(item.asset_code, item.employee_id, item.remarks) for item in request.items]
+    )
+
+    await db.commit()
+    scan_cache.invalidate(*(r["asset_code"] for r in results if r["success"]))
+    invalidate_holdings(results)
+    invalidate_repair_analytics(name, results)
+
+    succeeded = sum(1 for r in results if r["success"])
+    return {
+        "processed": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    }
+
+
+@router.post("/bulk/assign")
+async def bulk_assign(request: BulkRequest, db: AsyncSession = Depends(get_async_db)):
+
+    return await _run_bulk(db, "assign", request)
+
+
+@router.post("/bulk/return")
+async def bulk_return(request: BulkRequest, db: AsyncSession = Depends(get_async_db)):
+
+    return await _run_bulk(db, "return", request)
+
+
+@router.post("/bulk/repair")
+async def bulk_repair(request: BulkRequest, db: AsyncSession = Depends(get_async_db)):
+
+    return await _run_bulk(db, "repair", request)
+
+
+@router.post("/bulk/missing")
+async def bulk_missing(request: BulkRequest, db: AsyncSession = Depends(get_async_db)):
+
+    return await _run_bulk(db, "missing", request)
+
+
+@router.post("/bulk/retire")
+async def bulk_retire(request: BulkRequest, secret: str, db: AsyncSession = Depends(get_async_db)):
+
+    if secret != ADMIN_SECRET:
+        raise HTTPException(status_code=403, detail="Invalid admin secret")
+
+    return await _run_bulk(db, "retire", request)
@@ -1,57 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from difflib import SequenceMatcher
 
-from app.database import get_db
+from app.database import get_async_db
+from app.utils.cache import lookup_cache, cached_response, json_entry, CATEGORIES_KEY, CATEGORY_INDEX_KEY
+from app.utils.similarity import TrigramIndex
 
 router = APIRouter()
 
-@router.get("/categories")
-def get_categories(db: Session = Depends(get_db)):
-
-    result = db.execute(
+async def load_categories(db: AsyncSession):
+    result = await db.execute(
         text("SELECT id, name FROM categories WHERE is_active = TRUE")
     )
 
-    categories = [
+    return json_entry([
         {"id": row.id, "name": row.name}
         for row in result
-    ]
+    ])
 
-    return categories
 
-@router.post("/categories/check-duplicate")
-def check_duplicate_category(name: str, db: Session = Depends(get_db)):
-    """Check if category name is similar to existing categories"""
-    
-    # Get all existing categories
-    result = db.execute(
+async def load_category_index(db: AsyncSession):
+    result = await db.execute(
         text("SELECT name FROM categories WHERE is_active = TRUE")
     )
-    
-    existing_categories = [row.name for row in result]
-    
-    similar_categories = []
-    
-    for existing_name in existing_categories:
-        # Check for exact match (case-insensitive)
-        if existing_name.lower() == name.lower():
-            similar_categories.append({
-                "name": existing_name,
-                "similarity": 1.0,
-                "type": "exact"
-            })
-        else:
-            # Calculate similarity ratio
-            similarity = SequenceMatcher(None, name.lower(), existing_name.lower()).ratio()
-            # Consider similar if more than 70% match
-            if similarity > 0.7:
-                similar_categories.append({
-                    "name": existing_name,
-                    "similarity": round(similarity, 2),
-                    "type": "similar"
-                })
+    return TrigramIndex(row.name for row in result)
+
+
+@router.get("/categories")
+async def get_categories(request: Request, db: AsyncSession = Depends(get_async_db)):
+
+    entry = await lookup_cache.get_or_load(CATEGORIES_KEY, lambda: load_categories(db))
+
+    return cached_response(request, entry)
+
+@router.post("/categories/check-duplicate")
+async def check_duplicate_category(name: str, limit: int = 10, db: AsyncSession = Depends(get_async_db)):
+    """Check if category name is similar to existing categories"""
+
+    index = await lookup_cache.get_or_load(CATEGORY_INDEX_KEY, lambda: load_category_index(db))
+
+    # Exact (case-insensitive) matches and the closest names above the 70% threshold, in category order
+    similar_categories = index.search(name, limit=limit)
     
     return {
         "has_similar": len(similar_categories) > 0,
@@ -59,7 +48,7 @@ def check_duplicate_category(name: str, db: Session = Depends(get_db)):
     }
 
 @router.post("/categories/add")
-def add_category(name: str, db: Session = Depends(get_db)):
+async def add_category(name: str, db: AsyncSession = Depends(get_async_db)):
     """Add a new category"""
     
     if not name or not name.strip():
@@ -68,16 +57,16 @@ def add_category(name: str, db: Session = Depends(get_db)):
     name = name.strip()
     
     # Check if category already exists (exact match, case-insensitive)
-    existing = db.execute(
+    existing = (await db.execute(
         text("SELECT id FROM categories WHERE LOWER(name) = LOWER(:name) AND is_active = TRUE"),
         {"name": name}
-    ).fetchone()
+    )).fetchone()
     
     if existing:
         raise HTTPException(status_code=400, detail=f"Category '{name}' already exists")
     
     # Insert new category
-    db.execute(
+    await db.execute(
         text("""
             INSERT INTO categories (name, is_active)
             VALUES (:name, TRUE)
@@ -85,13 +74,15 @@ def add_category(name: str, db: Session = Depends(get_db)):
         {"name": name}
     )
     
-    db.commit()
+    await db.commit()
+
+    lookup_cache.invalidate(CATEGORIES_KEY, CATEGORY_INDEX_KEY)
     
     # Get the newly created category
-    result = db.execute(
+    result = (await db.execute(
         text("SELECT id, name FROM categories WHERE LOWER(name) = LOWER(:name) AND is_active = TRUE"),
         {"name": name}
-    ).fetchone()
+    )).fetchone()
     
     return {
         "message": f"Category '{name}' created successfully",
@@ -1,51 +1,80 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 from app.utils.config import ADMIN_SECRET
 
-from app.database import get_db
+from app.database import get_async_db
+from app.utils.cache import lookup_cache, EMPLOYEES_KEY, EMPLOYEE_HOLDINGS_KEY
 
 router = APIRouter()
 
-@router.get("/exit-clearance/{employee_id}")
-def check_clearance(employee_id: str, db: Session = Depends(get_db)):
+CLEARANCE_MAX_EMPLOYEES = 5000
+
+# One row per employee with the asset codes blocking their clearance
+CLEARANCE_SQL = """
+    SELECT
+        e.employee_id,
+        array_agg(DISTINCT aa.asset_code) FILTER (WHERE aa.is_active) AS assigned,
+        array_agg(DISTINCT aa.asset_code) FILTER (WHERE a.status = 'missing') AS missing
+    FROM employees e
+    LEFT JOIN (
+        asset_assignments aa
+        JOIN assets a ON a.asset_code = aa.asset_code
+    ) ON aa.employee_id = e.employee_id
+        AND (aa.is_active = TRUE OR a.status = 'missing')
+    WHERE {where}
+    GROUP BY e.employee_id
+    ORDER BY e.employee_id
+"""
+
+
+# Deactivates the employees of :ids with nothing blocking their clearance and
+# evaluates the same employees against the same snapshot, so the approved and
+# blocked lists come from the UPDATE's own decision
+BULK_APPROVE_SQL = f"""
+    WITH approved AS (
+        UPDATE employees e
+        SET status = 'inactive'
+        WHERE e.employee_id = ANY(:ids)
+        AND NOT EXISTS (
+            SELECT 1
+            FROM asset_assignments aa
+            JOIN assets a ON a.asset_code = aa.asset_code
+            WHERE aa.employee_id = e.employee_id
+            AND (aa.is_active = TRUE OR a.status = 'missing')
+        )
+        RETURNING e.employee_id
+    )
+    SELECT c.*, ap.employee_id IS NOT NULL AS approved
+    FROM ({CLEARANCE_SQL.format(where="e.employee_id = ANY(:ids)")}) c
+    LEFT JOIN approved ap ON ap.employee_id = c.employee_id
+    ORDER BY c.employee_id
+"""
+
+
+class ClearanceBatch(BaseModel):
+    # Defaults to every employee with `status` when omitted. Approval is what
+    # makes an employee inactive, so leavers still pending clearance are active.
+    employee_ids: Optional[List[str]] = Field(None, min_length=1, max_length=CLEARANCE_MAX_EMPLOYEES)
+    status: str = "active"
 
-    # Active assignments
-    assigned_assets = db.execute(
-        text("""
-            SELECT asset_code
-            FROM asset_assignments
-            WHERE employee_id = :eid
-            AND is_active = TRUE
-        """),
-        {"eid": employee_id}
-    ).fetchall()
 
-    if assigned_assets:
+def _clearance_result(assigned, missing):
+    if assigned:
         return {
             "clearance": False,
             "reason": "Assets still assigned",
-            "assets": [row.asset_code for row in assigned_assets]
+            "assets": sorted(assigned)
         }
 
-    # Missing assets previously held
-    missing_assets = db.execute(
-        text("""
-            SELECT DISTINCT aa.asset_code
-            FROM asset_assignments aa
-            JOIN assets a ON a.asset_code = aa.asset_code
-            WHERE aa.employee_id = :eid
-            AND a.status = 'missing'
-        """),
-        {"eid": employee_id}
-    ).fetchall()
-
-    if missing_assets:
+    if missing:
         return {
             "clearance": False,
             "reason": "Employee linked to missing assets",
-            "assets": [row.asset_code for row in missing_assets]
+            "assets": sorted(missing)
         }
 
     return {
@@ -54,21 +83,63 @@ def check_clearance(employee_id: str, db: Session = Depends(get_db)):
     }
 
 
+async def _evaluate_clearance(db: AsyncSession, employee_ids=None, status=None):
+    """Evaluate clearance for the given employees (or all with `status`) in one grouped query"""
+
+    if employee_ids is not None:
+        where, params = "e.employee_id = ANY(:ids)", {"ids": list(employee_ids)}
+    else:
+        where, params = "e.status = :status", {"status": status}
+
+    result = await db.execute(text(CLEARANCE_SQL.format(where=where)), params)
+
+    return {row.employee_id: _clearance_result(row.assigned, row.missing) for row in result}
+
+
+@router.get("/exit-clearance/{employee_id}")
+async def check_clearance(employee_id: str, db: AsyncSession = Depends(get_async_db)):
+
+    results = await _evaluate_clearance(db, [employee_id])
+
+    # Unknown employees have nothing blocking them, as before
+    return results.get(employee_id) or _clearance_result(None, None)
+
+
+@router.post("/exit-clearance/bulk")
+async def bulk_check_clearance(batch: ClearanceBatch, db: AsyncSession = Depends(get_async_db)):
+    """Evaluate clearance for a batch of leavers; unknown ids are listed under `not_found`"""
+
+    results = await _evaluate_clearance(db, batch.employee_ids, batch.status)
+
+    not_found = []
+    if batch.employee_ids is not None:
+        not_found = [eid for eid in dict.fromkeys(batch.employee_ids) if eid not in results]
+
+    cleared = sum(1 for r in results.values() if r["clearance"])
+    return {
+        "evaluated": len(results),
+        "cleared": cleared,
+        "blocked": len(results) - cleared,
+        "results": [{"employee_id": eid, **r} for eid, r in results.items()],
+        "not_found": not_found,
+    }
+
+
 @router.post("/exit-clearance/approve")
-def approve_clearance(employee_id: str, secret: str, db: Session = Depends(get_db)):
+async def approve_clearance(employee_id: str, secret: str, db: AsyncSession = Depends(get_async_db)):
 
     if secret != ADMIN_SECRET:
         raise HTTPException(status_code=403, detail="Invalid admin secret")
 
     # Check active assignments
-    active_assets = db.execute(
+    active_assets = (await db.execute(
         text("""
             SELECT 1 FROM asset_assignments
             WHERE employee_id = :eid
             AND is_active = TRUE
         """),
         {"eid": employee_id}
-    ).fetchone()
+    )).fetchone()
 
     if active_assets:
         raise HTTPException(
@@ -77,7 +148,7 @@ def approve_clearance(employee_id: str, secret: str, db: Session = Depends(get_d
         )
 
     # Deactivate employee
-    db.execute(
+    await db.execute(
         text("""
             UPDATE employees
             SET status = 'inactive'
@@ -86,6 +157,39 @@ def approve_clearance(employee_id: str, secret: str, db: Session = Depends(get_d
         {"eid": employee_id}
     )
 
-    db.commit()
+    await db.commit()
+
+    lookup_cache.invalidate(EMPLOYEES_KEY, EMPLOYEE_HOLDINGS_KEY)
 
     return {"message": "Exit clearance approved"}
+
+
+@router.post("/exit-clearance/bulk/approve")
+async def bulk_approve_clearance(batch: ClearanceBatch, secret: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Deactivate every cleared employee of the batch in one statement; blocked
+    ones are reported with their reasons and unknown ids under `not_found`.
+    """
+
+    if secret != ADMIN_SECRET:
+        raise HTTPException(status_code=403, detail="Invalid admin secret")
+
+    if batch.employee_ids is None:
+        raise HTTPException(status_code=400, detail="employee_ids is required for bulk approval")
+
+    rows = (await db.execute(text(BULK_APPROVE_SQL), {"ids": list(dict.fromkeys(batch.employee_ids))})).all()
+
+    await db.commit()
+
+    lookup_cache.invalidate(EMPLOYEES_KEY, EMPLOYEE_HOLDINGS_KEY)
+
+    found = {row.employee_id for row in rows}
+    return {
+        "approved": [row.employee_id for row in rows if row.approved],
+        "blocked": [
+            {"employee_id": row.employee_id, **_clearance_result(row.assigned, row.missing)}
+            for row in rows
+            if not row.approved
+        ],
+        "not_found": [eid for eid in dict.fromkeys(batch.employee_ids) if eid not in found],
+    }
@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from typing import List
+
+from fastapi import APIRouter, Depends, Request
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from app.database import get_db
+from app.database import get_async_db
+from app.utils.cache import lookup_cache, cached_response, json_entry, EMPLOYEES_KEY, EMPLOYEE_HOLDINGS_KEY
+from app.utils.holdings import holdings_cache, load_employee_holdings
 
 router = APIRouter()
 
-@router.get("/employees")
-def get_employees(db: Session = Depends(get_db)):
+HOLDINGS_MAX_EMPLOYEES = 500
 
-    result = db.execute(
+async def load_employees(db: AsyncSession):
+    result = await db.execute(
         text("""
             SELECT employee_id, name, email, location
             FROM employees
@@ -17,7 +22,7 @@ def get_employees(db: Session = Depends(get_db)):
         """)
     )
 
-    employees = [
+    return json_entry([
         {
             "employee_id": row.employee_id,
             "name": row.name,
@@ -25,30 +30,57 @@ def get_employees(db: Session = Depends(get_db)):
             "location": row.location,
         }
         for row in result
-    ]
+    ])
+
+
+@router.get("/employees")
+async def get_employees(request: Request, include_holdings: bool = False, db: AsyncSession = Depends(get_async_db)):
+    """Active employees; `include_holdings` adds each one's active asset count and codes"""
+
+    if include_holdings:
+        entry = await lookup_cache.get_or_load(EMPLOYEE_HOLDINGS_KEY, lambda: load_employee_holdings(db))
+    else:
+        entry = await lookup_cache.get_or_load(EMPLOYEES_KEY, lambda: load_employees(db))
+
+    return cached_response(request, entry)
+
+
+class HoldingsRequest(BaseModel):
+    employee_ids: List[str] = Field(..., min_length=1, max_length=HOLDINGS_MAX_EMPLOYEES)
 
-    return employees
+
+@router.post("/employees/holdings")
+async def employee_holdings(request: HoldingsRequest, db: AsyncSession = Depends(get_async_db)):
+    """Active asset count and codes for a batch of employees; unknown IDs are listed under `missing`"""
+
+    found = await holdings_cache.get_many(db, request.employee_ids)
+    employee_ids = list(dict.fromkeys(request.employee_ids))
+
+    return {
+        "items": [{"employee_id": eid, **found[eid]} for eid in employee_ids if eid in found],
+        "missing": [eid for eid in employee_ids if eid not in found],
+    }
 
 from fastapi import HTTPException
 
 @router.post("/employees/add")
-def add_employee(
+async def add_employee(
     employee_id: str,
     name: str,
     email: str,
     location: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
 
-    exists = db.execute(
+    exists = (await db.execute(
         text("SELECT 1 FROM employees WHERE employee_id=:id"),
         {"id": employee_id}
-    ).fetchone()
+    )).fetchone()
 
     if exists:
         raise HTTPException(status_code=400, detail="Employee already exists")
 
-    db.execute(
+    await db.execute(
         text("""
             INSERT INTO employees
             (employee_id, name, email, location, status)
@@ -57,27 +89,28 @@ def add_employee(
         {"id": employee_id, "name": name, "email": email, "loc": location}
     )
 
-    db.commit()
+    await db.commit()
+    lookup_cache.invalidate(EMPLOYEES_KEY, EMPLOYEE_HOLDINGS_KEY)
     return {"message": "Employee added"}
 
 
 from fastapi import HTTPException
 
 @router.post("/employees/deactivate")
-def deactivate_employee(employee_id: str, db: Session = Depends(get_db)):
+async def deactivate_employee(employee_id: str, db: AsyncSession = Depends(get_async_db)):
     # Check for active asset assignments
-    active_assets = db.execute(
+    active_assets = (await db.execute(
         text("""
             SELECT 1 FROM asset_assignments
             WHERE employee_id = :id
             AND is_active = TRUE
         """),
         {"id": employee_id}
-    ).fetchone()
+    )).fetchone()
     if active_assets:
         raise HTTPException(status_code=400, detail="Cannot deactivate employee with assigned assets.")
 
-    db.execute(
+    await db.execute(
         text("""
             UPDATE employees
             SET status='inactive'
@@ -86,22 +119,16 @@ def deactivate_employee(employee_id: str, db: Session = Depends(get_db)):
         {"id": employee_id}
     )
 
-    db.commit()
+    await db.commit()
+    lookup_cache.invalidate(EMPLOYEES_KEY, EMPLOYEE_HOLDINGS_KEY)
     return {"message": "Employee deactivated"}
 
 
 @router.get("/employees/{employee_id}/assets")
-def get_employee_assets(employee_id: str, db: Session = Depends(get_db)):
+async def get_employee_assets(employee_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get count of active assets for an employee"""
-    result = db.execute(
-        text("""
-            SELECT COUNT(*) as count FROM asset_assignments
-            WHERE employee_id = :id
-            AND is_active = TRUE
-        """),
-        {"id": employee_id}
-    ).fetchone()
-    
-    return {"active_assets": result.count if result else 0}
+    holding = (await holdings_cache.get_many(db, [employee_id])).get(employee_id)
+
+    return {"active_assets": holding["active_assets"] if holding else 0}
 
 
@@ -0,0 +1,80 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.database import AsyncSessionLocal
+from app.utils.change_feed import change_feed, sse_message
+from app.utils.readiness import server_state
+
+router = APIRouter()
+
+SSE_KEEPALIVE_SECONDS = 15
+SSE_RETRY_MS = 3000
+
+
+@router.get("/events/assets")
+async def asset_events(
+    since: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-sent events for asset changes.
+
+    `change` events carry the asset_history row and its sequence as the event
+    id; apply them to a list loaded once. A `reload` event means deltas were
+    lost and the list should be fetched again. Browsers resume automatically
+    through Last-Event-ID; `since` does the same for other clients.
+    """
+
+    after = since
+    if last_event_id:
+        try:
+            after = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+
+    async def stream():
+        # Subscribe before replaying so nothing committed in between is lost
+        queue = change_feed.subscribe()
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+
+            # An error status would stop EventSource for good; an empty stream makes it retry elsewhere
+            if server_state.draining:
+                return
+
+            replayed = set()
+            if after is not None:
+                # Short-lived session: idle subscribers must not pin pool connections
+                async with AsyncSessionLocal() as db:
+                    events = await change_feed.replay(db, after)
+
+                if events is None:
+                    yield sse_message({"reload": True})
+                else:
+                    for event in events:
+                        replayed.add(event["seq"])
+                        yield sse_message(event)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if event.get("shutdown"):
+                    return
+                if event.get("seq") in replayed:
+                    continue
+                yield sse_message(event)
+        finally:
+            change_feed.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
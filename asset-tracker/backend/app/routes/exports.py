@@ -0,0 +1,123 @@
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+from app.database import get_async_db
+from app.utils.exports import EXPORT_WRITERS, EXPORT_MEDIA_TYPES
+
+router = APIRouter()
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMAT = Query("csv", pattern="^(csv|xlsx|parquet)$")
+
+# Column types of each export that aren't text
+ASSET_EXPORT_TYPES = {
+    "warranty_applicable": "bool",
+    "warranty_end_date": "date",
+    "created_at": "timestamp",
+    "updated_at": "timestamp",
+}
+ASSIGNMENT_EXPORT_TYPES = {
+    "id": "int64",
+    "assigned_date": "timestamp",
+    "returned_date": "timestamp",
+    "is_active": "bool",
+}
+REPAIR_EXPORT_TYPES = {"repair_start_date": "timestamp"}
+
+
+async def _stream_export(request: Request, db: AsyncSession, query: str, format: str, name: str, types):
+    """
+    Stream a query from a server-side cursor through the writer for `format`.
+    `types` gives the non-string columns, see app/utils/exports.py.
+    """
+
+    result = await db.stream(
+        text(query),
+        execution_options={"yield_per": EXPORT_BATCH_SIZE},
+    )
+    columns = list(result.keys())
+
+    async def batches():
+        try:
+            async for partition in result.partitions(EXPORT_BATCH_SIZE):
+                # Stop pulling rows as soon as the client goes away
+                if await request.is_disconnected():
+                    break
+                yield partition
+        finally:
+            await result.close()
+
+    return StreamingResponse(
+        EXPORT_WRITERS[format](columns, batches(), types),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'},
+    )
+
+
+@router.get("/export/assets")
+async def export_assets(request: Request, format: str = EXPORT_FORMAT, db: AsyncSession = Depends(get_async_db)):
+
+    return await _stream_export(request, db, """
+        SELECT
+            a.asset_code,
+            c.name AS category,
+            a.type,
+            a.brand,
+            a.model,
+            a.serial_number,
+            a.status,
+            a.location,
+            a.warranty_applicable,
+            a.warranty_end_date,
+            a.remarks,
+            aa.employee_id,
+            e.name AS employee_name,
+            a.created_at,
+            a.updated_at
+        FROM assets a
+        JOIN categories c ON a.category_id = c.id
+        LEFT JOIN asset_assignments aa
+            ON aa.asset_code = a.asset_code
+            AND aa.is_active = TRUE
+        LEFT JOIN employees e
+            ON e.employee_id = aa.employee_id
+        ORDER BY a.created_at DESC, a.asset_code DESC
+    """, format, "assets", ASSET_EXPORT_TYPES)
+
+
+@router.get("/export/assignments")
+async def export_assignments(request: Request, format: str = EXPORT_FORMAT, db: AsyncSession = Depends(get_async_db)):
+
+    return await _stream_export(request, db, """
+        SELECT
+            aa.id,
+            aa.asset_code,
+            aa.employee_id,
+            e.name AS employee_name,
+            aa.assigned_date,
+            aa.returned_date,
+            aa.is_active
+        FROM asset_assignments aa
+        LEFT JOIN employees e
+            ON e.employee_id = aa.employee_id
+        ORDER BY aa.id
+    """, format, "assignments", ASSIGNMENT_EXPORT_TYPES)
+
+
+@router.get("/export/repairs")
+async def export_repairs(request: Request, format: str = EXPORT_FORMAT, db: AsyncSession = Depends(get_async_db)):
+
+    return await _stream_export(request, db, """
+        SELECT
+            r.asset_code,
+            r.repair_assignee_id,
+            e.name,
+            r.repair_start_date
+        FROM repair_tracking r
+        LEFT JOIN employees e
+            ON r.repair_assignee_id = e.employee_id
+        WHERE r.is_active = TRUE
+        ORDER BY r.repair_start_date
+    """, format, "repairs", REPAIR_EXPORT_TYPES)
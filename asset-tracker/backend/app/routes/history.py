@@ -0,0 +1,123 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+from app.database import get_async_db
+from app.utils.pagination import encode_cursor, decode_cursor, naive_utc
+
+router = APIRouter()
+
+HISTORY_DEFAULT_LIMIT = 50
+HISTORY_MAX_LIMIT = 500
+
+
+async def _timeline(db: AsyncSession, filters, params, limit: int, cursor: Optional[str],
+                    since: Optional[datetime], until: Optional[datetime]):
+    """
+    One page of asset_history newest first, keyset on (created_at, id).
+
+    Every bound is also applied to created_at on its own so the planner can
+    prune the monthly partitions outside the requested window. since/until
+    given with a zone (...Z, +02:00) are compared as UTC.
+    """
+
+    if since:
+        filters.append("h.created_at >= :since")
+        params["since"] = naive_utc(since)
+
+    if until:
+        filters.append("h.created_at < :until")
+        params["until"] = naive_utc(until)
+
+    if cursor:
+        params["cursor_created_at"], params["cursor_id"] = decode_cursor(cursor, int)
+        filters.append("h.created_at <= :cursor_created_at")
+        filters.append("(h.created_at, h.id) < (:cursor_created_at, :cursor_id)")
+
+    where_clause = ("WHERE " + " AND ".join(filters)) if filters else ""
+    # Fetch one extra row to know whether another page exists
+    params["limit"] = limit + 1
+
+    result = await db.execute(
+        text(f"""
+            SELECT
+                h.id,
+                h.asset_code,
+                h.action,
+                h.old_status,
+                h.new_status,
+                h.employee_id,
+                e.name AS employee_name,
+                h.remarks,
+                h.created_at
+            FROM asset_history h
+            LEFT JOIN employees e ON e.employee_id = h.employee_id
+            {where_clause}
+            ORDER BY h.created_at DESC, h.id DESC
+            LIMIT :limit
+        """),
+        params
+    )
+    rows = [dict(row._mapping) for row in result]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+@router.get("/history")
+async def history_feed(
+    limit: int = Query(HISTORY_DEFAULT_LIMIT, ge=1, le=HISTORY_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Global activity feed across all assets"""
+
+    filters, params = [], {}
+    if action:
+        filters.append("h.action = :action")
+        params["action"] = action
+
+    return await _timeline(db, filters, params, limit, cursor, since, until)
+
+
+@router.get("/assets/{asset_code}/history")
+async def asset_history(
+    asset_code: str,
+    limit: int = Query(HISTORY_DEFAULT_LIMIT, ge=1, le=HISTORY_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Lifecycle timeline of one asset"""
+
+    return await _timeline(
+        db, ["h.asset_code = :code"], {"code": asset_code}, limit, cursor, since, until
+    )
+
+
+@router.get("/employees/{employee_id}/history")
+async def employee_history(
+    employee_id: str,
+    limit: int = Query(HISTORY_DEFAULT_LIMIT, ge=1, le=HISTORY_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Assignments, returns and repairs recorded against one employee"""
+
+    return await _timeline(
+        db, ["h.employee_id = :eid"], {"eid": employee_id}, limit, cursor, since, until
+    )
@@ -0,0 +1,57 @@
+from datetime import datetime, time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.utils.config import WARRANTY_BUCKET_DAYS
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.warranty_report import warranty_report
+
+router = APIRouter()
+
+WARRANTY_DEFAULT_LIMIT = 50
+WARRANTY_MAX_LIMIT = 500
+
+
+@router.get("/warranty/expiring/summary")
+async def expiring_summary(db: AsyncSession = Depends(get_async_db)):
+    """How many warranties end within each of the 30/60/90 day buckets"""
+    return await warranty_report.summary(db)
+
+
+@router.get("/warranty/expiring")
+async def expiring_warranties(
+    bucket: Optional[int] = None,
+    limit: int = Query(WARRANTY_DEFAULT_LIMIT, ge=1, le=WARRANTY_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Assets whose warranty ends soonest first, from the cached report.
+
+    `bucket` (30, 60 or 90) limits the page to expiries beyond the previous
+    bucket and up to that many days ahead. Pass `next_cursor` back as
+    `cursor` for the next page.
+    """
+
+    if bucket is not None and bucket not in WARRANTY_BUCKET_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"bucket must be one of {', '.join(map(str, WARRANTY_BUCKET_DAYS))}"
+        )
+
+    after = None
+    if cursor:
+        end_date, asset_code = decode_cursor(cursor)
+        after = (end_date.date(), asset_code)
+
+    as_of, items, has_more = await warranty_report.page(db, bucket, limit, after)
+
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor(datetime.combine(last["warranty_end_date"], time()), last["asset_code"])
+
+    return {"as_of": as_of, "bucket": bucket, "items": items, "next_cursor": next_cursor}
@@ -0,0 +1,89 @@
+"""
+Production launcher: N uvicorn workers sharing one PostgreSQL connection budget.
+
+Each worker gets an equal share of --db-connection-budget. Out of that share
+it reserves the change-feed LISTEN connection and a small sync pool for
+migrations and maintenance jobs. The rest goes to the async request pool,
+three quarters as the steady pool_size and the remainder as overflow. The
+sizes reach the workers through the DB_* environment variables read by
+app.database.
+
+With DB_POOLER_MODE=transaction the pooler owns the server connection
+budget, so the workers run without pools of their own.
+
+SIGTERM drains each worker gracefully, see app/utils/readiness.py. In-flight
+requests get up to --graceful-timeout seconds to finish.
+
+Usage from the backend directory:
+
+    python -m app.server --workers 4 --db-connection-budget 80
+    python -m app.server --workers 2 --port 8000 --drain-grace 10
+"""
+import argparse
+import os
+
+import uvicorn
+
+# Per worker: the change feed's LISTEN connection plus the sync pool
+SYNC_POOL_SIZE = 1
+SYNC_MAX_OVERFLOW = 1
+RESERVED_PER_WORKER = 1 + SYNC_POOL_SIZE + SYNC_MAX_OVERFLOW
+
+
+def pool_settings(connection_budget: int, workers: int):
+    """(pool_size, max_overflow) of each worker's async pool"""
+
+    available = connection_budget // workers - RESERVED_PER_WORKER
+    if available < 2:
+        raise SystemExit(
+            f"A budget of {connection_budget} connections is too small for {workers} workers "
+            f"(each needs at least {RESERVED_PER_WORKER + 2})"
+        )
+
+    pool_size = max(1, available * 3 // 4)
+    return pool_size, available - pool_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with several workers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--db-connection-budget", type=int, default=80,
+                        help="total PostgreSQL connections all workers together may open")
+    parser.add_argument("--drain-grace", type=float, default=5,
+                        help="seconds a worker reports not ready before it stops accepting")
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="seconds in-flight requests get to finish on shutdown")
+    args = parser.parse_args()
+
+    # Inherited by the worker processes before they import app.database
+    os.environ["DRAIN_GRACE_SECONDS"] = str(args.drain_grace)
+
+    if os.getenv("DB_POOLER_MODE") == "transaction":
+        # The pooler enforces the server connection budget; workers keep no pools
+        print(f"{args.workers} workers behind a transaction pooler")
+    else:
+        pool_size, max_overflow = pool_settings(args.db_connection_budget, args.workers)
+        print(
+            f"{args.workers} workers x (async pool {pool_size}+{max_overflow}, "
+            f"reserved {RESERVED_PER_WORKER}) within a budget of {args.db_connection_budget}"
+        )
+        os.environ.update({
+            "DB_POOL_SIZE": str(pool_size),
+            "DB_MAX_OVERFLOW": str(max_overflow),
+            "DB_SYNC_POOL_SIZE": str(SYNC_POOL_SIZE),
+            "DB_SYNC_MAX_OVERFLOW": str(SYNC_MAX_OVERFLOW),
+        })
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def next_asset_codes(db: AsyncSession, category_id: int, count: int = 1):
+    """
+    Hand out `count` consecutive asset codes for a category in one round trip.
+
+    Codes look like <first 3 letters of category><DDMMYY><nnn>. The per
+    (prefix, day) counter row is bumped with a single upsert, so concurrent
+    callers never receive the same code. The first call of a day seeds the
+    counter from codes already present in `assets`.
+    """
+
+    day = datetime.now().strftime("%d%m%y")
+
+    result = (await db.execute(
+        text("""
+            WITH stem AS (
+                SELECT COALESCE(
+                    (SELECT UPPER(LEFT(name, 3)) FROM categories WHERE id = :cat),
+                    'XXX'
+                ) AS prefix
+            )
+            INSERT INTO asset_code_counters (prefix, day, last_value)
+            SELECT
+                s.prefix,
+                :day,
+                COALESCE((
+                    SELECT MAX(CAST(SUBSTRING(a.asset_code FROM char_length(s.prefix || :day) + 1) AS INTEGER))
+                    FROM assets a
+                    WHERE a.asset_code LIKE s.prefix || :day || '%'
+                    AND SUBSTRING(a.asset_code FROM char_length(s.prefix || :day) + 1) ~ '^[0-9]{1,9}$'
+                ), 0) + :count
+            FROM stem s
+            ON CONFLICT (prefix, day) DO UPDATE
+            SET last_value = asset_code_counters.last_value + :count
+            RETURNING prefix, last_value
+        """),
+        {"cat": category_id, "day": day, "count": count}
+    )).fetchone()
+
+    first = result.last_value - count + 1
+    return [
+        f"{result.prefix}{day}{number:03d}"
+        for number in range(first, result.last_value + 1)
+    ]
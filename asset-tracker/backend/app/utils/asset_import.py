@@ -0,0 +1,343 @@
+"""
+Bulk asset import from CSV/XLSX.
+
+Rows are parsed in chunks, validated against a preloaded category map,
+COPYed into a temporary staging table and merged into `assets` with one
+INSERT ... ON CONFLICT (asset_code) DO UPDATE per chunk. Like add_asset,
+re-importing an asset that is in repair closes its repair entry and moves it
+back to stock, and every added or updated asset gets an asset_history row.
+
+CLI usage from the backend directory:
+
+    python -m app.utils.asset_import inventory.csv
+    python -m app.utils.asset_import inventory.xlsx --chunk-size 2000
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import logging
+import sys
+from collections import defaultdict
+from itertools import islice
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.asset_codes import next_asset_codes
+from app.utils.inventory_stats import reconcile_counters
+from app.utils.asset_lookup import scan_cache
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+STAGING_COLUMNS = [
+    "row_number", "asset_code", "category_id", "type",
+    "brand", "model", "serial_number", "location",
+]
+
+
+def read_rows(file, file_format: str):
+    """Yield each data row as a dict keyed by lowercased header"""
+
+    if file_format == "csv":
+        stream = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        for row in csv.DictReader(stream):
+            yield {(key or "").strip().lower(): value for key, value in row.items()}
+        return
+
+    # Only needed for spreadsheet uploads
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    rows = workbook.active.iter_rows(values_only=True)
+    header = [str(cell).strip().lower() if cell is not None else "" for cell in next(rows, ())]
+    for values in rows:
+        if any(value is not None for value in values):
+            yield dict(zip(header, values))
+
+
+def _clean(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _resolve_category(row, categories_by_name, category_ids):
+    """Return (category_id, error) for a row"""
+
+    raw_id = _clean(row.get("category_id"))
+    if raw_id is not None:
+        try:
+            # Spreadsheets may hand over 3 as 3.0
+            number = float(raw_id)
+        except ValueError:
+            number = None
+        # is_integer() also turns away inf and nan
+        if number is None or not number.is_integer():
+            return None, f"Invalid category_id '{raw_id}'"
+        category_id = int(number)
+        if category_id not in category_ids:
+            return None, f"Unknown category_id {category_id}"
+        return category_id, None
+
+    name = _clean(row.get("category"))
+    if name is None:
+        return None, "Missing category"
+    if name.lower() not in categories_by_name:
+        return None, f"Unknown category '{name}'"
+    return categories_by_name[name.lower()], None
+
+
+async def _load_categories(db: AsyncSession):
+    result = await db.execute(
+        text("SELECT id, name FROM categories WHERE is_active = TRUE")
+    )
+    rows = result.fetchall()
+    return {row.name.lower(): row.id for row in rows}, {row.id for row in rows}
+
+
+async def _merge_chunk(db: AsyncSession, records):
+    """COPY one validated chunk into staging and merge it; returns (inserted, updated)"""
+
+    await db.execute(
+        text("""
+            CREATE TEMP TABLE asset_import_staging (
+                row_number INTEGER,
+                asset_code TEXT,
+                category_id INTEGER,
+                type TEXT,
+                brand TEXT,
+                model TEXT,
+                serial_number TEXT,
+                location TEXT
+            ) ON COMMIT DROP
+        """)
+    )
+
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        "asset_import_staging", records=records, columns=STAGING_COLUMNS
+    )
+
+    # Close repair entries of assets coming back through the import
+    await db.execute(
+        text("""
+            UPDATE repair_tracking r
+            SET is_active = FALSE,
+                repair_end_date = CURRENT_TIMESTAMP,
+                close_action = 'imported'
+            FROM assets a
+            JOIN asset_import_staging s ON s.asset_code = a.asset_code
+            WHERE r.asset_code = a.asset_code
+            AND a.status = 'repair'
+            AND r.is_active = TRUE
+        """)
+    )
+
+    # Duplicates within a chunk are resolved by import_assets; across chunks the later one updates.
+    # Like add_asset, every added or updated asset gets a history row, which
+    # the 0005 trigger publishes on the live feed.
+    result = await db.execute(
+        text("""
+            WITH previous AS (
+                SELECT asset_code, status
+                FROM assets
+                WHERE asset_code IN (SELECT asset_code FROM asset_import_staging)
+            ),
+            merged AS (
+                INSERT INTO assets
+                (asset_code, category_id, type, brand, model,
+                 serial_number, status, location)
+                SELECT DISTINCT ON (asset_code)
+                    asset_code, category_id, type, brand, model,
+                    serial_number, 'instock', location
+                FROM asset_import_staging
+                ORDER BY asset_code, row_number DESC
+                ON CONFLICT (asset_code) DO UPDATE
+                SET category_id = EXCLUDED.category_id,
+                    type = EXCLUDED.type,
+                    brand = EXCLUDED.brand,
+                    model = EXCLUDED.model,
+                    serial_number = EXCLUDED.serial_number,
+                    location = EXCLUDED.location,
+                    updated_at = CURRENT_TIMESTAMP,
+                    status = CASE WHEN assets.status = 'repair' THEN 'instock' ELSE assets.status END
+                RETURNING asset_code, status, (xmax = 0) AS inserted
+            ),
+            history AS (
+                INSERT INTO asset_history (asset_code, action, old_status, new_status, remarks)
+                SELECT
+                    m.asset_code,
+                    CASE WHEN m.inserted THEN 'added' ELSE 'updated' END,
+                    p.status,
+                    m.status,
+                    'imported'
+                FROM merged m
+                LEFT JOIN previous p ON p.asset_code = m.asset_code
+                ORDER BY m.asset_code
+            )
+            SELECT inserted FROM merged
+        """)
+    )
+
+    flags = [row.inserted for row in result]
+    inserted = sum(1 for flag in flags if flag)
+    return inserted, len(flags) - inserted
+
+
+async def _reserve_codes(db: AsyncSession, needs_code, taken):
+    """
+    Fill in generated codes, skipping any in `taken` (the chunk's explicit
+    codes) or already in assets, e.g. entered by hand in today's pattern.
+    A generated code must never merge into an unrelated asset.
+    """
+
+    for category_id, pending in needs_code.items():
+        while pending:
+            # One counter bump per category hands out codes for the whole chunk
+            codes = await next_asset_codes(db, category_id, len(pending))
+            existing = {
+                row.asset_code
+                for row in await db.execute(
+                    text("SELECT asset_code FROM assets WHERE asset_code = ANY(:codes)"),
+                    {"codes": codes}
+                )
+            }
+            free = [code for code in codes if code not in taken and code not in existing]
+            for record, code in zip(pending, free):
+                record[1] = code
+            pending = pending[len(free):]
+
+
+async def import_assets(db: AsyncSession, file, file_format: str, chunk_size: int = IMPORT_CHUNK_SIZE):
+    """
+    Import assets from an open binary file, committing once per chunk.
+
+    Yields a progress dict after every committed chunk and a final summary
+    with the per-row errors (row numbers count the header as row 1). A row
+    whose asset_code appears again later in the same chunk is superseded by
+    the later row and reported. If a chunk fails, the earlier chunks stay
+    committed and the final event is an error naming the last committed row.
+    """
+
+    categories_by_name, category_ids = await _load_categories(db)
+    rows = read_rows(file, file_format)
+
+    totals = {"rows": 0, "inserted": 0, "updated": 0, "failed": 0, "superseded": 0}
+    errors = []
+    row_number = 1
+    last_committed_row = 1
+    failure = None
+
+    try:
+        while True:
+            chunk = await run_in_threadpool(lambda: list(islice(rows, chunk_size)))
+            if not chunk:
+                break
+
+            # Counted into totals only once the chunk is committed
+            chunk_totals = dict.fromkeys(totals, 0)
+            chunk_errors = []
+            explicit = {}
+            needs_code = defaultdict(list)
+
+            for row in chunk:
+                row_number += 1
+                category_id, error = _resolve_category(row, categories_by_name, category_ids)
+
+                if error:
+                    chunk_totals["failed"] += 1
+                    chunk_errors.append({"row": row_number, "error": error})
+                    continue
+
+                record = [
+                    row_number,
+                    _clean(row.get("asset_code")),
+                    category_id,
+                    _clean(row.get("type")),
+                    _clean(row.get("brand")),
+                    _clean(row.get("model")),
+                    _clean(row.get("serial_number")),
+                    _clean(row.get("location")),
+                ]
+                if record[1] is None:
+                    needs_code[category_id].append(record)
+                    continue
+
+                previous = explicit.get(record[1])
+                if previous:
+                    chunk_totals["superseded"] += 1
+                    chunk_errors.append({
+                        "row": previous[0],
+                        "error": f"asset_code {record[1]} appears again in row {row_number}, which wins",
+                    })
+                explicit[record[1]] = record
+
+            await _reserve_codes(db, needs_code, explicit)
+            records = list(explicit.values()) + [record for pending in needs_code.values() for record in pending]
+
+            if records:
+                inserted, updated = await _merge_chunk(db, [tuple(record) for record in records])
+                chunk_totals["inserted"] = inserted
+                chunk_totals["updated"] = updated
+
+            await db.commit()
+            scan_cache.clear()
+            last_committed_row = row_number
+
+            chunk_totals["rows"] = len(chunk)
+            for key, value in chunk_totals.items():
+                totals[key] += value
+            errors.extend(chunk_errors[:MAX_REPORTED_ERRORS - len(errors)])
+            yield {"event": "progress", **totals}
+    except Exception as exc:
+        logger.exception("Asset import failed after row %d", last_committed_row)
+        await db.rollback()
+        failure = {"event": "error", "detail": str(exc), "last_committed_row": last_committed_row}
+
+    # Bulk merges bypass the per-asset counter deltas, so recount once at the end
+    if totals["inserted"] or totals["updated"]:
+        try:
+            # Waits for a reconcile another worker is running, which may predate our rows
+            await reconcile_counters(db, wait=True)
+            await db.commit()
+        except Exception as exc:
+            # The periodic reconcile corrects the counters later
+            logger.exception("Counter recount after asset import failed")
+            await db.rollback()
+            failure = failure or {"event": "error", "detail": str(exc), "last_committed_row": last_committed_row}
+
+    yield {**(failure or {"event": "done"}), **totals, "errors": errors}
+
+
+async def _run_cli(path: str, file_format: str, chunk_size: int):
+    from app.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        with open(path, "rb") as file:
+            async for event in import_assets(db, file, file_format, chunk_size):
+                print(json.dumps(event), file=sys.stderr if event["event"] == "progress" else sys.stdout)
+    return event["event"] == "done"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import assets from CSV or XLSX")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "xlsx"], help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    file_format = args.format or ("xlsx" if args.path.lower().endswith(".xlsx") else "csv")
+    if not asyncio.run(_run_cli(args.path, file_format, args.chunk_size)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Scanner lookups by asset code.
+
+Single scans and batch lookups share one module-level statement that takes
+the codes as an array (`= ANY(:codes)`), so the SQL text never varies. The
+asyncpg dialect therefore prepares it once per pooled connection and reuses
+the server-side prepared statement on every later scan (except behind a
+transaction pooler, where app.database turns statement caching off).
+
+Recently scanned snapshots sit in a bounded LRU. Writers invalidate the
+codes they touched after committing, and the change feed invalidates codes
+written by other workers. The TTL bounds staleness for edits made outside
+the API and for notifications missed while the feed reconnects.
+"""
+import time
+from collections import OrderedDict
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.config import SCAN_CACHE_SIZE, SCAN_CACHE_TTL_SECONDS
+
+LOOKUP_SQL = text("""
+    SELECT
+        a.asset_code,
+        c.name AS category,
+        a.type,
+        a.brand,
+        a.model,
+        a.serial_number,
+        a.status,
+        a.location,
+        a.warranty_applicable,
+        a.warranty_end_date,
+        a.remarks,
+        aa.employee_id,
+        e.name AS employee_name,
+        e.email AS employee_email,
+        e.location AS employee_location
+    FROM assets a
+    JOIN categories c ON a.category_id = c.id
+    LEFT JOIN asset_assignments aa ON a.asset_code = aa.asset_code
+        AND aa.is_active = TRUE
+    LEFT JOIN employees e ON aa.employee_id = e.employee_id
+    WHERE a.asset_code = ANY(:codes)
+""")
+
+
+class AssetLRU:
+    """
+    Bounded LRU of asset snapshots keyed by asset code.
+
+    Like VersionedCache, each code carries a version that invalidate() bumps,
+    and a load that started before an invalidation is never stored.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._generation = 0
+
+    def version(self, code: str):
+        return self._generation, self._versions.get(code, 0)
+
+    def get(self, code: str):
+        cached = self._entries.get(code)
+        if cached is None:
+            return None
+        if cached[1] <= time.monotonic():
+            del self._entries[code]
+            return None
+        self._entries.move_to_end(code)
+        return cached[0]
+
+    def put(self, code: str, value, version: int):
+        if self.version(code) != version:
+            return
+        self._entries[code] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(code)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *codes: str):
+        for code in codes:
+            self._versions[code] = self._versions.get(code, 0) + 1
+            self._entries.pop(code, None)
+
+    def clear(self):
+        """Drop every snapshot, e.g. after a bulk import"""
+        self._generation += 1
+        self._entries.clear()
+        self._versions.clear()
+
+
+scan_cache = AssetLRU(SCAN_CACHE_SIZE, SCAN_CACHE_TTL_SECONDS)
+
+
+async def lookup_assets(db: AsyncSession, codes):
+    """Return {asset_code: snapshot} for the codes that exist, serving from the LRU where possible"""
+
+    found = {}
+    pending = {}
+
+    for code in dict.fromkeys(codes):
+        cached = scan_cache.get(code)
+        if cached is not None:
+            found[code] = cached
+        else:
+            pending[code] = scan_cache.version(code)
+
+    if pending:
+        result = await db.execute(LOOKUP_SQL, {"codes": list(pending)})
+        for row in result:
+            snapshot = dict(row._mapping)
+            found[row.asset_code] = snapshot
+            scan_cache.put(row.asset_code, snapshot, pending[row.asset_code])
+
+    return found
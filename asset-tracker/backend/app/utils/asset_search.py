@@ -0,0 +1,184 @@
+"""
+Tiered prefix and fuzzy search over assets.
+
+Backed by the asset_search side table (migrations/0006_asset_search.sql),
+which triggers keep in step with assets, assignments, categories and
+employees. Results are ranked by tier, and within a tier by asset_code:
+
+- code: the asset code starts with the query (btree range, already ordered)
+- word: every query word is the prefix of a word in the document (GIN)
+- fuzzy: queries of SEARCH_FUZZY_MIN_LENGTH characters or more that leave
+  the page short have each word corrected against asset_search_words by
+  trigram similarity, and the corrections are matched like the word tier
+
+Each tier stops once the page is full. GIN has no ordered scan and builds
+its whole bitmap before any LIMIT applies, which is slow for common words,
+so a word tier first walks the primary key over the first SEARCH_WINDOW
+codes; when that fills the page those are exactly the first matches. Only
+a term that is rare there is fetched through the GIN index and sorted.
+Only the returned page is joined and pays for ts_headline. See
+migrations/0011_asset_search_ranked.sql and benchmarks/bench_search.py.
+"""
+import re
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+SEARCH_FUZZY_MIN_LENGTH = 3
+SEARCH_WINDOW = 5000
+SEARCH_CORRECTIONS = 5
+
+WORD = re.compile(r"\w+")
+
+CODE_SQL = text("""
+    SELECT asset_code
+    FROM asset_search
+    WHERE lower(asset_code) COLLATE "C" >= :low
+    AND lower(asset_code) COLLATE "C" < :high
+    ORDER BY lower(asset_code) COLLATE "C"
+    LIMIT :limit
+""")
+
+# The subquery's LIMIT keeps the filter off the GIN index: read the first
+# :window codes in primary key order and stop at :limit matches
+WINDOW_SQL = text("""
+    SELECT asset_code
+    FROM (
+        SELECT asset_code, vector
+        FROM asset_search
+        ORDER BY asset_code
+        LIMIT :window
+    ) w
+    WHERE vector @@ to_tsquery('simple', :tsquery)
+    LIMIT :limit
+""")
+
+SORTED_SQL = text("""
+    WITH matches AS MATERIALIZED (
+        SELECT asset_code
+        FROM asset_search
+        WHERE vector @@ to_tsquery('simple', :tsquery)
+    )
+    SELECT asset_code
+    FROM matches
+    ORDER BY asset_code
+    LIMIT :limit
+""")
+
+CORRECTIONS_SQL = text("""
+    SELECT q.word, w.word AS correction
+    FROM unnest(CAST(:words AS TEXT[])) AS q(word)
+    CROSS JOIN LATERAL (
+        SELECT word
+        FROM asset_search_words
+        WHERE word % q.word OR q.word <% word
+        ORDER BY GREATEST(similarity(word, q.word), word_similarity(q.word, word)) DESC, word
+        LIMIT :corrections
+    ) w
+""")
+
+DETAILS_SQL = text("""
+    SELECT
+        a.asset_code,
+        c.name AS category,
+        a.type,
+        a.brand,
+        a.model,
+        a.serial_number,
+        a.status,
+        a.location,
+        aa.employee_id,
+        e.name AS employee_name,
+        r.match,
+        ts_headline(
+            'simple', s.document, to_tsquery('simple', :highlight),
+            'StartSel=<mark>, StopSel=</mark>, HighlightAll=true'
+        ) AS highlight
+    FROM unnest(CAST(:codes AS TEXT[]), CAST(:matches AS TEXT[]))
+        WITH ORDINALITY AS r(asset_code, match, position)
+    JOIN assets a ON a.asset_code = r.asset_code
+    JOIN asset_search s ON s.asset_code = r.asset_code
+    LEFT JOIN categories c ON c.id = a.category_id
+    LEFT JOIN asset_assignments aa ON aa.asset_code = a.asset_code
+        AND aa.is_active = TRUE
+    LEFT JOIN employees e ON e.employee_id = aa.employee_id
+    ORDER BY r.position
+""")
+
+
+def prefix_tsquery(query: str):
+    """'dell lat' -> 'dell:* & lat:*'; only word characters reach to_tsquery"""
+    words = [word.lower() for word in WORD.findall(query)]
+    return " & ".join(f"{word}:*" for word in words) or None
+
+
+def code_range(query: str):
+    """Bounds of the codes starting with query, lowercased, in "C" order"""
+    low = query.lower()
+    return low, low[:-1] + chr(ord(low[-1]) + 1)
+
+
+async def first_matches(db: AsyncSession, tsquery: str, limit: int):
+    """The first `limit` asset codes matching tsquery, in code order"""
+
+    params = {"tsquery": tsquery, "window": SEARCH_WINDOW, "limit": limit}
+    codes = (await db.execute(WINDOW_SQL, params)).scalars().all()
+    if len(codes) < limit:
+        codes = (await db.execute(SORTED_SQL, params)).scalars().all()
+    return codes
+
+
+async def fuzzy_tsquery(db: AsyncSession, query: str):
+    """'lenvo mod' -> '(lenvo:* | lenovo) & (mod:* | model)', or None without corrections"""
+
+    words = [word.lower() for word in WORD.findall(query)]
+    rows = (await db.execute(
+        CORRECTIONS_SQL, {"words": words, "corrections": SEARCH_CORRECTIONS}
+    )).all()
+
+    alternatives = {word: [f"{word}:*"] for word in words}
+    for row in rows:
+        # Lexemes holding punctuation would need tsquery quoting; skip them
+        if WORD.fullmatch(row.correction) and row.correction != row.word:
+            alternatives[row.word].append(row.correction)
+    if all(len(terms) == 1 for terms in alternatives.values()):
+        return None
+    return " & ".join(f"({' | '.join(terms)})" for terms in alternatives.values())
+
+
+async def search_assets(db: AsyncSession, query: str, limit: int):
+    query = query.strip()
+    tsquery = prefix_tsquery(query)
+    if tsquery is None:
+        return []
+
+    low, high = code_range(query)
+    codes = (await db.execute(CODE_SQL, {"low": low, "high": high, "limit": limit})).scalars().all()
+    found = dict.fromkeys(codes, "code")
+
+    # Later tiers repeat earlier hits, so ask for enough to fill the page anyway
+    if len(found) < limit:
+        for code in await first_matches(db, tsquery, limit + len(found)):
+            found.setdefault(code, "word")
+
+    highlight = tsquery
+    if len(found) < limit and len(query) >= SEARCH_FUZZY_MIN_LENGTH:
+        fuzzy = await fuzzy_tsquery(db, query)
+        if fuzzy is not None:
+            highlight = f"({tsquery}) | ({fuzzy})"
+            for code in await first_matches(db, fuzzy, limit + len(found)):
+                found.setdefault(code, "fuzzy")
+
+    codes = list(found)[:limit]
+    if not codes:
+        return []
+
+    result = await db.execute(
+        DETAILS_SQL,
+        {
+            "codes": codes,
+            "matches": [found[code] for code in codes],
+            "highlight": highlight,
+        }
+    )
+    return [dict(row._mapping) for row in result]
@@ -0,0 +1,202 @@
+"""
+Versioned, dictionary-encoded columnar snapshot of the whole inventory.
+
+Assets.jsx filters and groups the full list in the browser. The snapshot
+sends it column by column. category, status, location, employee_id and
+employee_name are dictionary-encoded: their value lists hold indexes into
+`dictionaries[column]`, or null. With format=arrow the same columns come as
+an Arrow IPC stream with dictionary arrays.
+
+The version token is the asset_snapshot_version counter, which every
+committed write to assets increments (migrations/0010), followed by
+max(assets.updated_at). The counter decides whether anything changed. The
+time is only the delta filter: updated_at is the transaction start time,
+so a client passing its token as `since` gets the rows updated after that
+time minus SNAPSHOT_DELTA_OVERLAP_SECONDS. The encoded full snapshot is
+built once per version and cached per format and codec. Assets are never
+deleted, so a delta is applied as an upsert by asset_code.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import orjson
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.config import SNAPSHOT_DELTA_OVERLAP_SECONDS, SNAPSHOT_DELTA_MAX_ROWS
+from app.utils.responses import CACHEABLE_CODECS, COMPRESS_MIN_SIZE, negotiate
+from app.utils.streaming import json_default
+
+SNAPSHOT_FORMATS = "^(json|arrow)$"
+SNAPSHOT_MEDIA_TYPES = {
+    "json": "application/json",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+DICTIONARY_COLUMNS = ("category", "status", "location", "employee_id", "employee_name")
+
+EPOCH = datetime(1970, 1, 1)
+
+VERSION_SQL = text("""
+    SELECT
+        v.version,
+        (SELECT MAX(updated_at) FROM assets) AS updated_at
+    FROM asset_snapshot_version v
+""")
+
+SNAPSHOT_QUERY = """
+    SELECT
+        a.asset_code,
+        c.name AS category,
+        a.type,
+        a.brand,
+        a.model,
+        a.serial_number,
+        a.status,
+        a.location,
+        a.warranty_end_date,
+        aa.employee_id,
+        e.name AS employee_name,
+        a.updated_at
+    FROM assets a
+    LEFT JOIN categories c ON c.id = a.category_id
+    LEFT JOIN asset_assignments aa
+        ON aa.asset_code = a.asset_code
+        AND aa.is_active = TRUE
+    LEFT JOIN employees e ON e.employee_id = aa.employee_id
+    {where}
+    ORDER BY a.created_at DESC, a.asset_code DESC
+    {limit}
+"""
+
+SNAPSHOT_SQL = text(SNAPSHOT_QUERY.format(where="", limit=""))
+# One row past the cap tells that the delta is too big
+DELTA_SQL = text(SNAPSHOT_QUERY.format(where="WHERE a.updated_at > :since", limit="LIMIT :limit"))
+
+
+def version_token(version: int, updated_at) -> str:
+    micros = 0 if updated_at is None else (updated_at - EPOCH) // timedelta(microseconds=1)
+    return f"{version}-{micros}"
+
+
+def version_time(token: str):
+    """max(updated_at) a version token was issued at, or None if it isn't one"""
+    try:
+        version, micros = token.split("-", 1)
+        int(version)
+        return EPOCH + timedelta(microseconds=int(micros))
+    except (ValueError, OverflowError):
+        return None
+
+
+def etag_matches(if_none_match, version: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/").strip('"') for tag in if_none_match.split(",")]
+    return "*" in tags or version in tags
+
+
+async def current_version(db: AsyncSession) -> str:
+    row = (await db.execute(VERSION_SQL)).one()
+    return version_token(row.version, row.updated_at)
+
+
+def _json_body(columns, rows, header):
+    data = {}
+    dictionaries = {}
+    for i, column in enumerate(columns):
+        values = [row[i] for row in rows]
+        if column in DICTIONARY_COLUMNS:
+            index = {}
+            values = [None if value is None else index.setdefault(value, len(index)) for value in values]
+            dictionaries[column] = list(index)
+        data[column] = values
+
+    return orjson.dumps(
+        {**header, "count": len(rows), "columns": columns, "dictionaries": dictionaries, "data": data},
+        default=json_default,
+    )
+
+
+def _arrow_body(columns, rows, header):
+    import pyarrow as pa
+
+    types = {"warranty_end_date": pa.date32(), "updated_at": pa.timestamp("us")}
+    arrays = []
+    for i, column in enumerate(columns):
+        array = pa.array([row[i] for row in rows], type=types.get(column, pa.string()))
+        arrays.append(array.dictionary_encode() if column in DICTIONARY_COLUMNS else array)
+
+    metadata = {key: "" if value is None else str(value).lower() for key, value in header.items()}
+    table = pa.Table.from_arrays(arrays, names=columns).replace_schema_metadata(metadata)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+ENCODERS = {"json": _json_body, "arrow": _arrow_body}
+
+
+def _encode(format: str, columns, rows, header, accepted, codecs):
+    body = ENCODERS[format](columns, rows, header)
+    encoding, compress = negotiate(accepted, codecs)
+    if encoding and len(body) >= COMPRESS_MIN_SIZE:
+        return compress(body), encoding
+    return body, None
+
+
+class SnapshotCache:
+    """Rows of the newest full snapshot and its encoded bodies per (format, encoding)"""
+
+    def __init__(self):
+        self.version = None
+        self.columns = None
+        self.rows = None
+        self.bodies = {}
+        self.lock = asyncio.Lock()
+
+    async def body(self, db: AsyncSession, version: str, format: str, accepted):
+        encoding, _ = negotiate(accepted, CACHEABLE_CODECS)
+        key = (format, encoding)
+
+        # One build per version, however many clients ask at once
+        async with self.lock:
+            if self.version != version:
+                result = await db.execute(SNAPSHOT_SQL)
+                self.columns = list(result.keys())
+                self.rows = result.all()
+                self.bodies = {}
+                self.version = version
+
+            if key not in self.bodies:
+                header = {"version": version, "delta": False, "since": None}
+                self.bodies[key] = await run_in_threadpool(
+                    _encode, format, self.columns, self.rows, header, accepted, CACHEABLE_CODECS
+                )
+            return self.bodies[key]
+
+
+snapshot_cache = SnapshotCache()
+
+
+async def snapshot_body(db: AsyncSession, version: str, format: str, accepted, since=None):
+    """(body, Content-Encoding) of the delta since `since` or of the full snapshot"""
+
+    since_time = version_time(since) if since else None
+    if since_time is not None:
+        result = await db.execute(
+            DELTA_SQL,
+            {
+                "since": since_time - timedelta(seconds=SNAPSHOT_DELTA_OVERLAP_SECONDS),
+                "limit": SNAPSHOT_DELTA_MAX_ROWS + 1,
+            }
+        )
+        columns = list(result.keys())
+        rows = result.all()
+        if len(rows) <= SNAPSHOT_DELTA_MAX_ROWS:
+            header = {"version": version, "delta": True, "since": since}
+            return await run_in_threadpool(_encode, format, columns, rows, header, accepted, CACHEABLE_CODECS)
+
+    return await snapshot_cache.body(db, version, format, accepted)
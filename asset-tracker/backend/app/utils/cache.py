@@ -0,0 +1,76 @@
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+
+from fastapi import Request, Response
+
+from app.utils.streaming import json_default
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    etag: str
+
+
+def json_entry(value) -> CacheEntry:
+    """Encode a value once so cached responses skip serialization"""
+    body = json.dumps(value, default=json_default, separators=(",", ":")).encode()
+    return CacheEntry(body=body, etag='"%s"' % hashlib.sha1(body).hexdigest())
+
+
+class VersionedCache:
+    """
+    In-process read-through cache for small lookup lists and derived indexes.
+
+    Every key carries a version that invalidate() bumps. A load that started
+    before an invalidation is returned to its caller but never stored, so a
+    write can't be shadowed by a slower concurrent read.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}
+        self._versions = {}
+
+    def version(self, key: str) -> int:
+        return self._versions.get(key, 0)
+
+    async def get_or_load(self, key: str, loader):
+        cached = self._entries.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        version = self.version(key)
+        value = await loader()
+
+        if self.version(key) == version:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        return value
+
+    def invalidate(self, *keys: str):
+        for key in keys:
+            self._versions[key] = self.version(key) + 1
+            self._entries.pop(key, None)
+
+
+def cached_response(request: Request, entry: CacheEntry) -> Response:
+    """Serve a cache entry as JSON, or 304 when the client already holds it"""
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if entry.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+# Categories and active employees change a few times a day
+lookup_cache = VersionedCache(ttl_seconds=300)
+
+CATEGORIES_KEY = "categories"
+CATEGORY_INDEX_KEY = "category_index"
+EMPLOYEES_KEY = "employees"
+EMPLOYEE_HOLDINGS_KEY = "employee_holdings"
+REPAIR_ANALYTICS_KEY = "repair_analytics"
@@ -0,0 +1,197 @@
+"""
+Live inventory change feed fanned out from PostgreSQL LISTEN/NOTIFY.
+
+Each worker holds one dedicated LISTEN connection on the asset_changes
+channel (filled by the asset_history trigger, see
+migrations/0005_asset_change_notify.sql) and fans every notification out to
+in-process subscriber queues. The connection goes to DB_LISTEN_URL, which
+has to bypass any transaction pooler. An idle subscriber therefore costs a queue
+and a parked coroutine, not a database connection.
+
+Events carry asset_history.id as their sequence. A reconnecting client
+passes the last sequence it saw. Recent events are replayed from an
+in-memory ring buffer, and older ones from asset_history. When the gap is
+too large, or events may have been lost (the listener reconnected or the
+subscriber fell behind), the client is told to reload instead. Sequences
+are allocated before commit, so a transaction that commits after a
+later-numbered one can be missed on reconnect; periodic reloads cover
+that rare case.
+"""
+import asyncio
+import json
+import logging
+from collections import deque
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import LISTEN_DATABASE_URL
+from app.utils.asset_lookup import scan_cache
+from app.utils.warranty_report import warranty_report
+from app.utils.holdings import clear_holdings, invalidate_for_event
+from app.utils.repair_analytics import clear_repair_analytics, invalidate_analytics_for_event
+from app.utils.streaming import json_default
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "asset_changes"
+
+# Events a subscriber may have queued before it is told to reload
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Recent events kept per worker for reconnects
+REPLAY_BUFFER_SIZE = 5000
+# Beyond this many missed events a reload is cheaper than a replay
+REPLAY_MAX_EVENTS = 5000
+
+RELOAD = {"reload": True}
+# Ends the stream; the client's EventSource reconnects to another worker
+SHUTDOWN = {"shutdown": True}
+
+
+def _listen_dsn(url: str) -> str:
+    """asyncpg wants a plain libpq URL, without the SQLAlchemy driver suffix"""
+    scheme, rest = url.split("://", 1)
+    return "postgresql://" + rest
+
+
+class ChangeFeed:
+    def __init__(self, database_url: str):
+        self.dsn = _listen_dsn(database_url)
+        self._subscribers = set()
+        self._recent = deque(maxlen=REPLAY_BUFFER_SIZE)
+        self._task = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _listen_forever(self):
+        connected_before = False
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _: lost.set())
+                await conn.add_listener(CHANNEL, self._on_notify)
+
+                # Anything committed while we were disconnected was missed
+                if connected_before:
+                    self._recent.clear()
+                    scan_cache.clear()
+                    warranty_report.clear()
+                    clear_holdings()
+                    clear_repair_analytics()
+                    self._broadcast(RELOAD)
+                connected_before = True
+
+                await lost.wait()
+                logger.warning("Change feed listener connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Change feed listener failed, retrying")
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(1)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed change notification: %.200s", payload)
+            return
+
+        # Also keeps this worker's caches in step with writes made by other workers
+        if event.get("reload"):
+            scan_cache.clear()
+            warranty_report.clear()
+            clear_holdings()
+            clear_repair_analytics()
+        elif "asset_code" in event:
+            scan_cache.invalidate(event["asset_code"])
+            warranty_report.invalidate(event["asset_code"])
+            invalidate_for_event(event)
+            invalidate_analytics_for_event(event)
+
+        if event.get("seq") is not None:
+            self._recent.append(event)
+        self._broadcast(event)
+
+    def close_streams(self):
+        """End every open stream, used when the worker starts draining"""
+        for queue in list(self._subscribers):
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(SHUTDOWN)
+
+    def _broadcast(self, event):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and make it start over
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RELOAD)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    async def replay(self, db: AsyncSession, after_seq: int):
+        """Events with seq > after_seq in order, or None when the client should reload"""
+
+        if self._recent and self._recent[0]["seq"] <= after_seq + 1:
+            return [event for event in self._recent if event["seq"] > after_seq]
+
+        result = await db.execute(
+            text("""
+                SELECT
+                    id AS seq,
+                    asset_code,
+                    action,
+                    old_status,
+                    new_status,
+                    employee_id,
+                    created_at
+                FROM asset_history
+                WHERE id > :seq
+                ORDER BY id
+                LIMIT :limit
+            """),
+            {"seq": after_seq, "limit": REPLAY_MAX_EVENTS + 1}
+        )
+        events = [dict(row._mapping) for row in result]
+
+        if len(events) > REPLAY_MAX_EVENTS:
+            return None
+        return events
+
+
+def sse_message(event) -> str:
+    """Format one feed event as a server-sent event"""
+
+    if event.get("reload"):
+        return "event: reload\ndata: {}\n\n"
+
+    data = json.dumps(event, default=json_default, separators=(",", ":"))
+    return f"id: {event['seq']}\nevent: change\ndata: {data}\n\n"
+
+
+change_feed = ChangeFeed(LISTEN_DATABASE_URL)
@@ -1 +1,40 @@
-ADMIN_SECRET = "admin123"
\ No newline at end of file
+import os
+
+ADMIN_SECRET = "admin123"
+
+# Apply pending migrations from backend/migrations when the app starts
+RUN_MIGRATIONS_ON_STARTUP = True
+
+# Statements slower than this are logged and counted in db_slow_queries
+SLOW_QUERY_THRESHOLD_MS = 200
+
+# How often the inventory counters behind /stats are recounted from assets
+STATS_RECONCILE_INTERVAL_SECONDS = 900
+
+# Recently scanned asset snapshots kept per worker for the barcode scan path
+SCAN_CACHE_SIZE = 2048
+SCAN_CACHE_TTL_SECONDS = 30
+
+# /assets/snapshot deltas re-send rows updated this long before the client's
+# version, covering transactions that committed after a newer one; bigger
+# deltas are answered with a full snapshot
+SNAPSHOT_DELTA_OVERLAP_SECONDS = 60
+SNAPSHOT_DELTA_MAX_ROWS = 20000
+
+# Upcoming warranty expiry buckets (days ahead) and how often each worker
+# rebuilds its cached report from scratch
+WARRANTY_BUCKET_DAYS = (30, 60, 90)
+WARRANTY_REPORT_REFRESH_SECONDS = 60 * 60
+
+# /repair/analytics: completed repairs within this many days count towards
+# turnaround, and open repairs are aged into buckets up to these many days
+REPAIR_ANALYTICS_WINDOW_DAYS = 90
+REPAIR_AGING_BUCKET_DAYS = (7, 14, 30)
+
+# Monthly asset_history partitions created ahead, and months kept attached
+HISTORY_PARTITION_MONTHS_AHEAD = 3
+HISTORY_RETENTION_MONTHS = 24
+HISTORY_MAINTENANCE_INTERVAL_SECONDS = 24 * 60 * 60
+
+# Seconds a draining worker keeps serving (reporting not ready) before it stops accepting
+DRAIN_GRACE_SECONDS = float(os.getenv("DRAIN_GRACE_SECONDS", "5"))
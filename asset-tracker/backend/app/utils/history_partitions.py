@@ -0,0 +1,137 @@
+"""
+Rolling maintenance of the monthly asset_history partitions.
+
+Partitions are created HISTORY_PARTITION_MONTHS_AHEAD months in advance so
+inserts never fall into the default partition. Months older than
+HISTORY_RETENTION_MONTHS are detached and moved to the history_archive
+schema, where they stay queryable and can be dumped or dropped by hand.
+Runs are serialized with an advisory lock so several workers can call it.
+
+CLI usage from the backend directory:
+
+    python -m app.utils.history_partitions            # create ahead + archive expired
+    python -m app.utils.history_partitions --status   # list attached partitions
+"""
+import argparse
+import asyncio
+import logging
+import re
+from datetime import date
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.config import HISTORY_PARTITION_MONTHS_AHEAD, HISTORY_RETENTION_MONTHS
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant identifying the partition maintenance advisory lock
+PARTITION_LOCK_KEY = 7301003
+
+ARCHIVE_SCHEMA = "history_archive"
+
+PARTITION_NAME = re.compile(r"^asset_history_y(\d{4})m(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"asset_history_y{month.year:04d}m{month.month:02d}"
+
+
+def _attached_partitions(conn):
+    """{month: name} of the monthly partitions currently attached to asset_history"""
+
+    rows = conn.execute(text("""
+        SELECT c.relname AS name
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST('asset_history' AS regclass)
+    """))
+
+    partitions = {}
+    for row in rows:
+        match = PARTITION_NAME.match(row.name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = row.name
+    return partitions
+
+
+def maintain_partitions(engine, today: date = None):
+    """Create upcoming partitions and archive expired ones; returns (created, archived)"""
+
+    this_month = (today or date.today()).replace(day=1)
+    cutoff = add_months(this_month, -HISTORY_RETENTION_MONTHS)
+    created, archived = [], []
+
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+        attached = _attached_partitions(conn)
+
+        for offset in range(HISTORY_PARTITION_MONTHS_AHEAD + 1):
+            month = add_months(this_month, offset)
+            if month in attached:
+                continue
+            name = partition_name(month)
+            conn.execute(text(
+                f"CREATE TABLE {name} PARTITION OF asset_history "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            created.append(name)
+
+        expired = [name for month, name in sorted(attached.items()) if month < cutoff]
+        if expired:
+            conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+        for name in expired:
+            conn.execute(text(f"ALTER TABLE asset_history DETACH PARTITION {name}"))
+            conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+            archived.append(name)
+
+        leftover = conn.execute(text("SELECT COUNT(*) FROM asset_history_default")).scalar()
+        if leftover:
+            logger.warning("%s asset_history rows fell into the default partition", leftover)
+
+    for name in created:
+        logger.info("Created history partition %s", name)
+    for name in archived:
+        logger.info("Archived history partition %s to %s", name, ARCHIVE_SCHEMA)
+
+    return created, archived
+
+
+async def maintain_periodically(engine, interval_seconds: float):
+    """Background loop started from the app lifespan"""
+    while True:
+        try:
+            await run_in_threadpool(maintain_partitions, engine)
+        except Exception:
+            logger.exception("History partition maintenance failed")
+        await asyncio.sleep(interval_seconds)
+
+
+def main():
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description="Maintain asset_history partitions")
+    parser.add_argument("--status", action="store_true", help="only list attached partitions")
+    args = parser.parse_args()
+
+    if args.status:
+        with engine.connect() as conn:
+            for month, name in sorted(_attached_partitions(conn).items()):
+                print(f"attached  {name}")
+        return
+
+    created, archived = maintain_partitions(engine)
+    for name in created:
+        print(f"created   {name}")
+    for name in archived:
+        print(f"archived  {ARCHIVE_SCHEMA}.{name}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,136 @@
+"""
+Active asset holdings per employee: how many assets each one holds and which.
+
+Computed with one LEFT JOIN over the active assignments grouped per
+employee, for the whole active staff (/employees?include_holdings=true) or a
+batch of IDs (/employees/holdings). Batches are served from a per-employee
+cache. Lifecycle routes invalidate it with the `holder_id` of each applied
+transition, and the change feed does the same for other workers' writes.
+"""
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.cache import lookup_cache, json_entry, EMPLOYEE_HOLDINGS_KEY
+
+HOLDINGS_TTL_SECONDS = 300
+
+HOLDINGS_QUERY = """
+    SELECT
+        e.employee_id,
+        {columns}
+        COUNT(aa.asset_code) AS active_assets,
+        COALESCE(
+            array_agg(aa.asset_code ORDER BY aa.asset_code) FILTER (WHERE aa.asset_code IS NOT NULL),
+            '{{}}'
+        ) AS asset_codes
+    FROM employees e
+    LEFT JOIN asset_assignments aa
+        ON aa.employee_id = e.employee_id
+        AND aa.is_active = TRUE
+    WHERE {where}
+    GROUP BY e.employee_id
+"""
+
+EMPLOYEE_HOLDINGS_SQL = text(HOLDINGS_QUERY.format(
+    columns="e.name, e.email, e.location,", where="e.status = 'active'"
+))
+HOLDINGS_SQL = text(HOLDINGS_QUERY.format(columns="", where="e.employee_id = ANY(:ids)"))
+
+
+def _holding(row):
+    return {"active_assets": row.active_assets, "asset_codes": list(row.asset_codes)}
+
+
+async def load_employee_holdings(db: AsyncSession):
+    """Active employees as in GET /employees, each with their holdings"""
+    result = await db.execute(EMPLOYEE_HOLDINGS_SQL)
+
+    return json_entry([
+        {
+            "employee_id": row.employee_id,
+            "name": row.name,
+            "email": row.email,
+            "location": row.location,
+            **_holding(row),
+        }
+        for row in result
+    ])
+
+
+class HoldingsCache:
+    """Holdings per employee with the same stale-load guard as VersionedCache"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}
+        self._versions = {}
+        self._generation = 0
+
+    async def get_many(self, db: AsyncSession, employee_ids):
+        """Holdings keyed by employee_id; unknown employees are left out"""
+
+        now = time.monotonic()
+        found = {}
+        missing = []
+        for employee_id in dict.fromkeys(employee_ids):
+            cached = self._entries.get(employee_id)
+            if cached and cached[1] > now:
+                found[employee_id] = cached[0]
+            else:
+                missing.append(employee_id)
+
+        if missing:
+            versions = {employee_id: self._versions.get(employee_id, 0) for employee_id in missing}
+            generation = self._generation
+
+            for row in await db.execute(HOLDINGS_SQL, {"ids": missing}):
+                holding = _holding(row)
+                found[row.employee_id] = holding
+                # Skip storing if a write invalidated it while we were loading
+                if generation == self._generation and self._versions.get(row.employee_id, 0) == versions[row.employee_id]:
+                    self._entries[row.employee_id] = (holding, time.monotonic() + self.ttl_seconds)
+
+        return found
+
+    def invalidate(self, *employee_ids):
+        for employee_id in employee_ids:
+            self._versions[employee_id] = self._versions.get(employee_id, 0) + 1
+            self._entries.pop(employee_id, None)
+
+    def clear(self):
+        self._generation += 1
+        self._entries.clear()
+
+
+holdings_cache = HoldingsCache(HOLDINGS_TTL_SECONDS)
+
+
+def invalidate_holdings(results):
+    """After commit: drop the holdings of every employee a transition gave or took an asset from"""
+
+    holders = {r["holder_id"] for r in results if r["success"] and r.get("holder_id")}
+    if holders:
+        holdings_cache.invalidate(*holders)
+        lookup_cache.invalidate(EMPLOYEE_HOLDINGS_KEY)
+
+
+def clear_holdings():
+    """Forget every holding, e.g. when change feed events may have been missed"""
+    holdings_cache.clear()
+    lookup_cache.invalidate(EMPLOYEE_HOLDINGS_KEY)
+
+
+def invalidate_for_event(event):
+    """Same for a change feed event, which may come from another worker"""
+
+    if "assigned" not in (event.get("old_status"), event.get("new_status")):
+        return
+
+    # History names the previous holder when an assignment was closed
+    if not event.get("employee_id"):
+        clear_holdings()
+    else:
+        holdings_cache.invalidate(event["employee_id"])
+        lookup_cache.invalidate(EMPLOYEE_HOLDINGS_KEY)
@@ -0,0 +1,169 @@
+"""
+Incrementally maintained inventory counters behind GET /stats.
+
+Writers apply small deltas to inventory_counters in the same transaction as
+the asset change; the lifecycle engine does it inside its single statement.
+A periodic reconcile recomputes everything from assets to correct any drift
+(e.g. from rows edited by hand).
+"""
+import asyncio
+import logging
+from collections import defaultdict
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary constant identifying the reconcile advisory lock
+RECONCILE_LOCK_KEY = 7301002
+
+RECOUNT_SQL = """
+    SELECT 'total' AS dimension, '' AS key, COUNT(*) AS count FROM assets
+    UNION ALL
+    SELECT 'status', status, COUNT(*) FROM assets GROUP BY status
+    UNION ALL
+    SELECT 'category', CAST(category_id AS TEXT), COUNT(*) FROM assets GROUP BY category_id
+    UNION ALL
+    SELECT 'location', COALESCE(location, ''), COUNT(*) FROM assets GROUP BY COALESCE(location, '')
+"""
+
+# One statement, so the recount and the counters come from the same snapshot:
+# a write committed before it is in both, one committed after it in neither
+DRIFT_SQL = f"""
+    SELECT
+        COALESCE(a.dimension, c.dimension) AS dimension,
+        COALESCE(a.key, c.key) AS key,
+        COALESCE(a.count, 0) - COALESCE(c.count, 0) AS drift
+    FROM ({RECOUNT_SQL}) a
+    FULL JOIN inventory_counters c ON c.dimension = a.dimension AND c.key = a.key
+    WHERE COALESCE(a.count, 0) <> COALESCE(c.count, 0)
+"""
+
+
+def asset_deltas(old, new):
+    """
+    Counter deltas for an asset going from `old` to `new`.
+
+    Both are (status, category_id, location) tuples, or None when the asset
+    did not exist before / does not exist after.
+    """
+
+    deltas = defaultdict(int)
+    for snapshot, sign in ((old, -1), (new, 1)):
+        if snapshot is None:
+            continue
+        status, category_id, location = snapshot
+        deltas[("total", "")] += sign
+        deltas[("status", status)] += sign
+        deltas[("category", str(category_id))] += sign
+        deltas[("location", location or "")] += sign
+
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+async def apply_counter_deltas(db: AsyncSession, deltas):
+    if not deltas:
+        return
+
+    keys = sorted(deltas)
+    await db.execute(
+        text("""
+            INSERT INTO inventory_counters (dimension, key, count)
+            SELECT * FROM unnest(
+                CAST(:dimensions AS text[]),
+                CAST(:keys AS text[]),
+                CAST(:deltas AS bigint[])
+            )
+            ON CONFLICT (dimension, key) DO UPDATE
+            SET count = inventory_counters.count + EXCLUDED.count
+        """),
+        {
+            "dimensions": [dimension for dimension, _ in keys],
+            "keys": [key for _, key in keys],
+            "deltas": [deltas[key] for key in keys],
+        }
+    )
+
+
+async def reconcile_counters(db: AsyncSession, wait: bool = False):
+    """
+    Correct the counters by their drift from a recount of assets; the caller commits.
+
+    The recount takes no lock, so writers keep applying deltas while it
+    scans. The drift is then added like any other delta, which only locks
+    the drifted rows and keeps the deltas committed meanwhile.
+
+    Returns the number of corrected keys, or None if another worker is
+    already reconciling. With `wait`, waits for that worker to finish and
+    recounts anyway.
+    """
+
+    if wait:
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": RECONCILE_LOCK_KEY})
+    else:
+        locked = (await db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key) AS locked"),
+            {"key": RECONCILE_LOCK_KEY}
+        )).fetchone().locked
+        if not locked:
+            return None
+
+    drift = {
+        (row.dimension, row.key): row.drift
+        for row in await db.execute(text(DRIFT_SQL))
+    }
+    if drift:
+        logger.warning("Inventory counters drifted on %d keys, correcting", len(drift))
+        await apply_counter_deltas(db, drift)
+
+    return len(drift)
+
+
+async def reconcile_periodically(session_factory, interval_seconds: float):
+    """Background task run from the app lifespan"""
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            async with session_factory() as db:
+                await reconcile_counters(db)
+                await db.commit()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Inventory counter reconcile failed")
+
+
+async def read_stats(db: AsyncSession):
+    result = await db.execute(
+        text("""
+            SELECT ic.dimension, ic.key, ic.count, c.name AS category_name
+            FROM inventory_counters ic
+            LEFT JOIN categories c
+                ON ic.dimension = 'category'
+                AND CAST(c.id AS TEXT) = ic.key
+            WHERE ic.count <> 0
+        """)
+    )
+
+    stats = {"total": 0, "by_status": {}, "by_category": [], "by_location": {}}
+    for row in result:
+        if row.dimension == "total":
+            stats["total"] = row.count
+        elif row.dimension == "status":
+            stats["by_status"][row.key] = row.count
+        elif row.dimension == "category":
+            stats["by_category"].append({
+                "category_id": int(row.key),
+                "name": row.category_name,
+                "count": row.count,
+            })
+        elif row.dimension == "location":
+            stats["by_location"][row.key] = row.count
+
+    stats["by_category"].sort(key=lambda item: item["count"], reverse=True)
+    stats["in_repair"] = stats["by_status"].get("repair", 0)
+    stats["missing"] = stats["by_status"].get("missing", 0)
+
+    return stats
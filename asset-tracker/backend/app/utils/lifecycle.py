@@ -0,0 +1,335 @@
+"""
+Asset lifecycle state machine.
+
+Every transition is declared once in TRANSITIONS and executed as a single
+CTE-chained statement: the eligible assets are locked with SELECT ... FOR
+UPDATE (re-checking their status after any concurrent write), then the status
+change, assignment/repair bookkeeping, the status counters and the
+asset_history row are written together. A batch of assets costs the same
+single round trip as one asset.
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+ASSET_STATES = ("instock", "assigned", "repair", "missing", "retired")
+
+
+@dataclass(frozen=True)
+class Transition:
+    action: str
+    from_states: tuple
+    to_state: str
+    invalid_detail: str
+    requires_employee: bool = False
+    close_assignment: bool = False
+    open_assignment: bool = False
+    close_repair: bool = False
+    open_repair: bool = False
+    mark_repaired: bool = False
+
+
+TRANSITIONS = {
+    "assign": Transition(
+        action="assign",
+        from_states=("instock",),
+        to_state="assigned",
+        invalid_detail="Asset is not available for assignment",
+        requires_employee=True,
+        open_assignment=True,
+    ),
+    "return": Transition(
+        action="return",
+        from_states=("assigned",),
+        to_state="instock",
+        invalid_detail="Asset not currently assigned",
+        close_assignment=True,
+    ),
+    "repair": Transition(
+        action="repair",
+        from_states=("instock", "assigned", "missing", "repair"),
+        to_state="repair",
+        invalid_detail="Asset cannot be sent to repair",
+        requires_employee=True,
+        close_assignment=True,
+        close_repair=True,
+        open_repair=True,
+    ),
+    "complete_repair": Transition(
+        action="repair_complete",
+        from_states=("repair",),
+        to_state="instock",
+        invalid_detail="Asset is not in repair",
+        close_repair=True,
+        mark_repaired=True,
+    ),
+    "missing": Transition(
+        action="missing",
+        from_states=("instock", "assigned", "repair"),
+        to_state="missing",
+        invalid_detail="Asset cannot be marked missing",
+        close_assignment=True,
+        close_repair=True,
+    ),
+    "recover": Transition(
+        action="recover",
+        from_states=("missing",),
+        to_state="instock",
+        invalid_detail="Asset is not missing",
+    ),
+    "retire": Transition(
+        action="retire",
+        from_states=("instock", "assigned", "repair", "missing"),
+        to_state="retired",
+        invalid_detail="Asset cannot be retired",
+        close_assignment=True,
+        close_repair=True,
+    ),
+}
+
+# More specific messages for common invalid moves
+INVALID_DETAILS = {
+    ("assign", "assigned"): "Asset already assigned",
+    ("retire", "retired"): "Asset already retired",
+}
+
+
+@dataclass
+class TransitionItem:
+    asset_code: str
+    # Assignee for assign, repair technician for repair
+    employee_id: Optional[str] = None
+    remarks: str = ""
+
+
+def _sql_list(values) -> str:
+    return ", ".join(f"'{value}'" for value in values)
+
+
+def _build_statement(transition: Transition):
+    """Compose the CTE chain for a transition from its declared side effects"""
+
+    employee_check = ""
+    if transition.requires_employee:
+        employee_check = """
+            AND EXISTS (
+                SELECT 1 FROM employees e
+                WHERE e.employee_id = i.employee_id
+                AND e.status = 'active'
+            )"""
+
+    ctes = [f"""
+        batch AS (
+            SELECT *
+            FROM unnest(
+                CAST(:codes AS text[]),
+                CAST(:emps AS text[]),
+                CAST(:remarks AS text[])
+            ) WITH ORDINALITY AS v(asset_code, employee_id, remarks, ord)
+        )""", f"""
+        locked AS (
+            SELECT a.asset_code, a.status AS old_status, i.employee_id, i.remarks
+            FROM assets a
+            JOIN batch i ON i.asset_code = a.asset_code
+            WHERE a.status IN ({_sql_list(transition.from_states)}){employee_check}
+            ORDER BY a.asset_code
+            FOR UPDATE OF a
+        )""", f"""
+        moved AS (
+            UPDATE assets a
+            SET status = '{transition.to_state}',
+                {"type = 'Repaired'," if transition.mark_repaired else ""}
+                updated_at = CURRENT_TIMESTAMP
+            FROM locked l
+            WHERE a.asset_code = l.asset_code
+            RETURNING a.asset_code
+        )"""]
+
+    # History names the employee who held the asset, else the one the caller
+    # named for transitions that take one, else the technician of the closed
+    # repair. Bulk callers may send employee_id for any transition.
+    history_employee = []
+    history_joins = []
+
+    if transition.close_assignment:
+        ctes.append("""
+        closed_assignments AS (
+            UPDATE asset_assignments aa
+            SET returned_date = CURRENT_TIMESTAMP,
+                is_active = FALSE
+            FROM locked l
+            WHERE aa.asset_code = l.asset_code
+            AND aa.is_active = TRUE
+            RETURNING aa.asset_code, aa.employee_id
+        )""")
+        history_employee.append("ca.employee_id")
+        history_joins.append("LEFT JOIN closed_assignments ca ON ca.asset_code = l.asset_code")
+
+    if transition.requires_employee:
+        history_employee.append("l.employee_id")
+
+    if transition.open_assignment:
+        ctes.append("""
+        opened_assignments AS (
+            INSERT INTO asset_assignments (asset_code, employee_id)
+            SELECT asset_code, employee_id FROM locked
+        )""")
+
+    if transition.close_repair:
+        ctes.append(f"""
+        closed_repairs AS (
+            UPDATE repair_tracking r
+            SET is_active = FALSE,
+                repair_end_date = CURRENT_TIMESTAMP,
+                close_action = '{transition.action}'
+            FROM locked l
+            WHERE r.asset_code = l.asset_code
+            AND r.is_active = TRUE
+            RETURNING r.asset_code, r.repair_assignee_id
+        )""")
+        if not transition.open_repair:
+            history_employee.append("cr.repair_assignee_id")
+            history_joins.append("LEFT JOIN closed_repairs cr ON cr.asset_code = l.asset_code")
+
+    if transition.open_repair:
+        # Sibling data-modifying CTEs run in no guaranteed order; reading
+        # closed_repairs makes the old repair close before the new one opens
+        after_close = "CROSS JOIN (SELECT COUNT(*) FROM closed_repairs) closed" if transition.close_repair else ""
+        ctes.append(f"""
+        opened_repairs AS (
+            INSERT INTO repair_tracking (asset_code, repair_assignee_id)
+            SELECT l.asset_code, l.employee_id
+            FROM locked l
+            {after_close}
+        )""")
+
+    # Status counters behind GET /stats; keys sorted so concurrent writers lock rows in the same order
+    ctes.append(f"""
+        counted AS (
+            INSERT INTO inventory_counters (dimension, key, count)
+            SELECT 'status', s.key, SUM(s.delta)
+            FROM (
+                SELECT old_status AS key, -1 AS delta FROM locked
+                UNION ALL
+                SELECT '{transition.to_state}', 1 FROM locked
+            ) s
+            GROUP BY s.key
+            ORDER BY s.key
+            ON CONFLICT (dimension, key) DO UPDATE
+            SET count = inventory_counters.count + EXCLUDED.count
+        )""")
+
+    history_join_sql = "\n            ".join(history_joins)
+    ctes.append(f"""
+        history AS (
+            INSERT INTO asset_history (asset_code, action, old_status, new_status, employee_id, remarks)
+            SELECT
+                l.asset_code,
+                '{transition.action}',
+                l.old_status,
+                '{transition.to_state}',
+                {f"COALESCE({', '.join(history_employee)})" if history_employee else "CAST(NULL AS text)"},
+                l.remarks
+            FROM locked l
+            {history_join_sql}
+        )""")
+
+    employee_ok = "TRUE"
+    if transition.requires_employee:
+        employee_ok = """EXISTS (
+                SELECT 1 FROM employees e
+                WHERE e.employee_id = i.employee_id
+                AND e.status = 'active'
+            )"""
+
+    # Employee who gained or lost the asset, for the holdings caches
+    holder = "CAST(NULL AS text)"
+    holder_join = ""
+    if transition.open_assignment:
+        holder = "l.employee_id"
+    elif transition.close_assignment:
+        holder = "ca.employee_id"
+        holder_join = "LEFT JOIN closed_assignments ca ON ca.asset_code = i.asset_code"
+
+    return text(f"""
+        WITH {",".join(ctes)}
+        SELECT
+            i.ord,
+            i.asset_code,
+            cur.status AS current_status,
+            l.old_status,
+            l.asset_code IS NOT NULL AS applied,
+            {employee_ok} AS employee_ok,
+            {holder} AS holder_id
+        FROM batch i
+        LEFT JOIN assets cur ON cur.asset_code = i.asset_code
+        LEFT JOIN locked l ON l.asset_code = i.asset_code
+        {holder_join}
+        ORDER BY i.ord
+    """)
+
+
+STATEMENTS = {name: _build_statement(transition) for name, transition in TRANSITIONS.items()}
+
+
+def _failure(asset_code: str, status_code: int, detail: str):
+    return {"asset_code": asset_code, "success": False, "status_code": status_code, "detail": detail}
+
+
+async def apply_transition(db: AsyncSession, name: str, items: List[TransitionItem]):
+    """
+    Run transition `name` for every item in one statement; the caller commits.
+
+    Returns one result dict per item, in order. Failed items carry the HTTP
+    status code and detail the single-asset routes raise.
+    """
+
+    transition = TRANSITIONS[name]
+    results = [None] * len(items)
+    pending = []
+    seen = set()
+
+    for position, item in enumerate(items):
+        if item.asset_code in seen:
+            results[position] = _failure(item.asset_code, 400, "Duplicate asset in batch")
+        elif transition.requires_employee and not item.employee_id:
+            results[position] = _failure(item.asset_code, 404, "Employee not found")
+        else:
+            seen.add(item.asset_code)
+            pending.append(position)
+
+    if pending:
+        rows = await db.execute(
+            STATEMENTS[name],
+            {
+                "codes": [items[p].asset_code for p in pending],
+                "emps": [items[p].employee_id for p in pending],
+                "remarks": [items[p].remarks for p in pending],
+            }
+        )
+
+        for row in rows:
+            position = pending[row.ord - 1]
+
+            if row.applied:
+                results[position] = {
+                    "asset_code": row.asset_code,
+                    "success": True,
+                    "old_status": row.old_status,
+                    "new_status": transition.to_state,
+                    "holder_id": row.holder_id,
+                }
+            elif row.current_status is None:
+                results[position] = _failure(row.asset_code, 404, "Asset not found")
+            elif row.current_status not in transition.from_states:
+                detail = INVALID_DETAILS.get((name, row.current_status), transition.invalid_detail)
+                results[position] = _failure(row.asset_code, 400, detail)
+            elif not row.employee_ok:
+                results[position] = _failure(row.asset_code, 404, "Employee not found")
+            else:
+                # Status changed underneath us while waiting for the row lock
+                results[position] = _failure(row.asset_code, 409, "Asset was modified concurrently")
+
+    return results
@@ -0,0 +1,192 @@
+"""
+Prometheus instrumentation for requests, queries and connection pools.
+
+MetricsMiddleware times every request by route template and, through a
+context variable shared with the SQLAlchemy cursor hooks, attributes the
+number of queries and the DB time spent to the route that issued them.
+Pool occupancy is read at scrape time; checkout wait is timed per checkout.
+"""
+import logging
+import time
+from contextvars import ContextVar
+
+from prometheus_client import Counter, Histogram, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+
+from app.utils.config import SLOW_QUERY_THRESHOLD_MS
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS = Counter(
+    "http_requests",
+    "Requests by route template and status code",
+    ["method", "route", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Queries issued while handling a request",
+    ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in the database while handling a request",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Latency of individual statements",
+    ["engine"],
+    buckets=LATENCY_BUCKETS,
+)
+SLOW_QUERIES = Counter(
+    "db_slow_queries",
+    "Statements slower than SLOW_QUERY_THRESHOLD_MS",
+    ["engine"],
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_request_stats: ContextVar = ContextVar("request_stats", default=None)
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware so streaming responses are timed until their last chunk"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+
+            method = scope["method"]
+            route = _route_template(scope)
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+            REQUESTS.labels(method, route, str(status["code"])).inc()
+            REQUEST_QUERIES.labels(method, route).observe(stats.queries)
+            REQUEST_DB_TIME.labels(method, route).observe(stats.db_seconds)
+
+
+def instrument_engine(engine, label: str):
+    """Attach query timing hooks and checkout-wait timing to a sync Engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        QUERY_LATENCY.labels(label).observe(elapsed)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+        if elapsed * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+            SLOW_QUERIES.labels(label).inc()
+            logger.warning(
+                "Slow query (%.1f ms) on %s: %s",
+                elapsed * 1000,
+                label,
+                " ".join(statement.split())[:500],
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        starts = context.connection.info.get("query_start") if context.connection else None
+        if starts:
+            starts.pop()
+
+    # QueuePool has no "before checkout" event, so time the blocking get itself
+    pool = engine.pool
+    do_get = pool._do_get
+
+    def timed_do_get():
+        start = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.labels(label).observe(time.perf_counter() - start)
+
+    pool._do_get = timed_do_get
+
+
+class PoolCollector:
+    """Reads pool occupancy at scrape time"""
+
+    def __init__(self, engines):
+        self.engines = engines
+
+    def collect(self):
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"])
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections in use", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections opened beyond pool_size", labels=["engine"])
+        idle = GaugeMetricFamily("db_pool_idle", "Idle connections held by the pool", labels=["engine"])
+
+        for label, engine in self.engines.items():
+            pool = engine.pool
+            # NullPool (transaction pooler mode) keeps nothing to report
+            if not hasattr(pool, "checkedout"):
+                continue
+            size.add_metric([label], pool.size())
+            checked_out.add_metric([label], pool.checkedout())
+            overflow.add_metric([label], max(pool.overflow(), 0))
+            idle.add_metric([label], pool.checkedin())
+
+        yield from (size, checked_out, overflow, idle)
+
+
+def setup_metrics(engines):
+    """Instrument {label: sync Engine} and register their pool gauges"""
+    for label, engine in engines.items():
+        instrument_engine(engine, label)
+    REGISTRY.register(PoolCollector(engines))
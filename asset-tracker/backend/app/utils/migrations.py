@@ -0,0 +1,139 @@
+"""
+Versioned SQL migrations and the startup index check.
+
+Migrations are the numbered .sql files in backend/migrations, applied in
+order and recorded in schema_migrations. Runs are serialized with an advisory
+lock so several workers starting together apply each file exactly once.
+
+CLI usage from the backend directory:
+
+    python -m app.utils.migrations            # apply pending migrations
+    python -m app.utils.migrations --status   # list applied/pending and missing indexes
+"""
+import argparse
+import logging
+from pathlib import Path
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+# Arbitrary constant identifying the migration advisory lock
+MIGRATION_LOCK_KEY = 7301001
+
+# Indexes the hot queries depend on, see migrations/0002_hot_query_indexes.sql
+# and the later migrations that add indexes for new queries
+REQUIRED_INDEXES = [
+    "ux_asset_assignments_active_asset",
+    "ix_asset_assignments_active_employee",
+    "ix_asset_assignments_employee_asset",
+    "ix_repair_tracking_active_asset",
+    "ix_repair_tracking_active_start",
+    "ix_assets_created_at_code",
+    "ix_categories_active_lower_name",
+    "ix_employees_status",
+    "ix_asset_history_asset_created",
+    "ix_asset_history_employee_created",
+    "ix_asset_history_created_id",
+    "ix_asset_search_vector",
+    "ix_assets_updated_at",
+    "ix_assets_warranty_end",
+    "ix_repair_tracking_assignee_active",
+    "ix_asset_search_code_lower",
+    "ix_asset_search_words_trgm",
+]
+
+
+def migration_files():
+    return sorted(MIGRATIONS_DIR.glob("*.sql"))
+
+
+def _applied_versions(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version TEXT PRIMARY KEY,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+    return {row.version for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def run_migrations(engine):
+    """Apply every pending migration in one transaction; returns the versions applied"""
+
+    applied_now = []
+
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        applied = _applied_versions(conn)
+
+        for path in migration_files():
+            if path.stem in applied:
+                continue
+
+            logger.info("Applying migration %s", path.name)
+            conn.connection.cursor().execute(path.read_text())
+            conn.execute(
+                text("INSERT INTO schema_migrations (version) VALUES (:version)"),
+                {"version": path.stem}
+            )
+            applied_now.append(path.stem)
+
+    return applied_now
+
+
+def missing_indexes(engine):
+    """Names from REQUIRED_INDEXES that are absent or left invalid by a failed concurrent build"""
+
+    with engine.connect() as conn:
+        valid = {
+            row.name
+            for row in conn.execute(
+                text("""
+                    SELECT c.relname AS name
+                    FROM pg_index i
+                    JOIN pg_class c ON c.oid = i.indexrelid
+                    JOIN pg_namespace n ON n.oid = c.relnamespace
+                    WHERE n.nspname = current_schema()
+                    AND i.indisvalid
+                    AND c.relname = ANY(:names)
+                """),
+                {"names": REQUIRED_INDEXES}
+            )
+        }
+
+    return [name for name in REQUIRED_INDEXES if name not in valid]
+
+
+def check_indexes(engine):
+    missing = missing_indexes(engine)
+    for name in missing:
+        logger.warning("Missing index %s; hot queries will fall back to sequential scans", name)
+    return missing
+
+
+def main():
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description="Apply database migrations")
+    parser.add_argument("--status", action="store_true", help="only report migration and index status")
+    args = parser.parse_args()
+
+    if args.status:
+        with engine.begin() as conn:
+            applied = _applied_versions(conn)
+        for path in migration_files():
+            print(f"{'applied' if path.stem in applied else 'pending'}  {path.name}")
+        for name in missing_indexes(engine):
+            print(f"missing  {name}")
+        return
+
+    for version in run_migrations(engine):
+        print(f"applied  {version}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,28 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+
+
+def naive_utc(value: datetime) -> datetime:
+    """TIMESTAMP columns hold naive UTC; asyncpg refuses to compare them with aware values"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def encode_cursor(created_at: datetime, key) -> str:
+    """Encode the (created_at, key) keyset position of the last row, e.g. key = asset_code"""
+    raw = json.dumps([created_at.isoformat(), key])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key_type=str):
+    """Decode a cursor produced by encode_cursor back into (created_at, key)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, key = json.loads(base64.urlsafe_b64decode(padded))
+        return naive_utc(datetime.fromisoformat(created_at)), key_type(key)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,103 @@
+"""
+Startup warmup, readiness state and graceful drain for a worker.
+
+The lifespan hook warms the worker before it reports ready. It opens the
+async pool's connections up front, prepares the hot statements on each of
+them and fills the lookup caches, so the first requests after a restart
+don't pay for connection setup.
+
+On SIGTERM the worker first reports not ready and ends its change-feed
+streams. After DRAIN_GRACE_SECONDS, long enough for a load balancer polling
+/health/ready to stop routing to it, uvicorn's own handler runs: it stops
+accepting connections and waits for in-flight requests to finish.
+"""
+import asyncio
+import logging
+import signal
+import threading
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+READINESS_CHECK_TIMEOUT_SECONDS = 2
+
+
+class ServerState:
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+
+
+server_state = ServerState()
+
+
+async def warm_pool(async_engine, connections: int, statements=()):
+    """Open `connections` pooled connections at once and run `statements` (text, params) on each"""
+
+    opened = await asyncio.gather(
+        *(async_engine.connect() for _ in range(connections)), return_exceptions=True
+    )
+    conns = [conn for conn in opened if not isinstance(conn, BaseException)]
+    try:
+        if len(conns) < len(opened):
+            raise next(conn for conn in opened if isinstance(conn, BaseException))
+        for conn in conns:
+            await conn.execute(text("SELECT 1"))
+            # Prepares the statement on this connection's server session
+            for statement, params in statements:
+                await conn.execute(statement, params)
+    finally:
+        # Back to the pool, which keeps them open
+        for conn in conns:
+            await conn.close()
+
+
+async def warm_caches(session_factory, cache, loaders):
+    """Fill `cache`; `loaders` maps each key to an async loader taking a session"""
+
+    async with session_factory() as db:
+        for key, loader in loaders.items():
+            await cache.get_or_load(key, lambda: loader(db))
+
+
+async def database_ready(async_engine) -> bool:
+    try:
+        async with async_engine.connect() as conn:
+            await asyncio.wait_for(
+                conn.execute(text("SELECT 1")), READINESS_CHECK_TIMEOUT_SECONDS
+            )
+        return True
+    except Exception:
+        logger.warning("Readiness check could not reach the database", exc_info=True)
+        return False
+
+
+def install_drain_handler(on_drain, grace_seconds: float):
+    """
+    Run `on_drain` on SIGTERM/SIGINT, then hand the signal to the server's
+    handler after `grace_seconds`. Must be called after uvicorn has installed
+    its handlers, i.e. from the lifespan startup.
+    """
+
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    loop = asyncio.get_running_loop()
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            if server_state.draining:
+                # Second signal: stop waiting
+                previous(signum, frame)
+                return
+            logger.info("Draining before shutdown (%.1fs grace)", grace_seconds)
+            server_state.draining = True
+            loop.call_soon_threadsafe(on_drain)
+            loop.call_soon_threadsafe(loop.call_later, grace_seconds, previous, signum, None)
+
+        signal.signal(sig, handler)
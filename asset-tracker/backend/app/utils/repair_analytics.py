@@ -0,0 +1,144 @@
+"""
+Repair queue analytics per technician.
+
+One pass over repair_tracking reads the open repairs and the repairs
+completed in the last REPAIR_ANALYTICS_WINDOW_DAYS. Both are served by the
+covering index on (repair_assignee_id, is_active). Turnaround percentiles
+come from CUME_DIST() over each technician's completed repairs. The p50 is
+the shortest turnaround whose cumulative share reaches 0.5 (nearest rank),
+since percentile_cont can't be combined with the per-technician window.
+Open repairs are counted into aging buckets by days since they started.
+
+Only repairs ended by repair_complete count towards turnaround. Repairs that
+ended as missing or retired did not come back repaired. The result is cached
+in lookup_cache. send_to_repair, complete_repair and the other transitions
+that open or close repairs invalidate it after commit. The change feed does
+the same for other workers' writes. The TTL keeps ages from drifting far
+between writes.
+"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.cache import lookup_cache, REPAIR_ANALYTICS_KEY
+from app.utils.config import REPAIR_ANALYTICS_WINDOW_DAYS, REPAIR_AGING_BUCKET_DAYS
+
+
+def _aging_columns():
+    """COUNT(...) FILTER columns for each aging bucket, the last one open-ended"""
+    columns = []
+    lower = None
+    for days in REPAIR_AGING_BUCKET_DAYS:
+        bounds = f"r.age_days < {days}" if lower is None else f"r.age_days >= {lower} AND r.age_days < {days}"
+        columns.append(f"COUNT(*) FILTER (WHERE {bounds}) AS aged_{days}")
+        lower = days
+    columns.append(f"COUNT(*) FILTER (WHERE r.age_days >= {lower}) AS aged_over")
+    return ",\n        ".join(columns)
+
+
+REPAIR_ANALYTICS_SQL = text(f"""
+    WITH scoped AS (
+        SELECT
+            r.repair_assignee_id,
+            r.is_active,
+            CASE WHEN NOT r.is_active
+                THEN EXTRACT(EPOCH FROM r.repair_end_date - r.repair_start_date) / 3600.0
+            END AS turnaround_hours,
+            CASE WHEN r.is_active
+                THEN EXTRACT(EPOCH FROM LOCALTIMESTAMP - r.repair_start_date) / 86400.0
+            END AS age_days
+        FROM repair_tracking r
+        WHERE r.is_active = TRUE
+        OR (
+            r.is_active = FALSE
+            AND r.close_action = 'repair_complete'
+            AND r.repair_end_date >= LOCALTIMESTAMP - make_interval(days => :window_days)
+        )
+    ),
+    ranked AS (
+        SELECT
+            s.*,
+            CUME_DIST() OVER (
+                PARTITION BY s.repair_assignee_id, s.is_active
+                ORDER BY s.turnaround_hours
+            ) AS turnaround_rank
+        FROM scoped s
+    )
+    SELECT
+        r.repair_assignee_id AS technician_id,
+        e.name AS technician_name,
+        COUNT(*) FILTER (WHERE r.is_active) AS queue_depth,
+        COUNT(*) FILTER (WHERE NOT r.is_active) AS completed,
+        AVG(r.turnaround_hours) AS avg_turnaround_hours,
+        MIN(r.turnaround_hours) FILTER (WHERE r.turnaround_rank >= 0.5) AS p50_turnaround_hours,
+        MIN(r.turnaround_hours) FILTER (WHERE r.turnaround_rank >= 0.9) AS p90_turnaround_hours,
+        MAX(r.age_days) AS oldest_open_days,
+        {_aging_columns()}
+    FROM ranked r
+    LEFT JOIN employees e ON e.employee_id = r.repair_assignee_id
+    GROUP BY r.repair_assignee_id, e.name
+    ORDER BY queue_depth DESC, technician_id
+""")
+
+# Transitions whose commits change the queue or the turnaround figures
+REPAIR_TRANSITIONS = {"repair", "complete_repair", "missing", "retire"}
+
+
+def _hours(value):
+    return None if value is None else round(float(value), 2)
+
+
+def _aging(row):
+    buckets = [
+        {"max_days": days, "count": getattr(row, f"aged_{days}")}
+        for days in REPAIR_AGING_BUCKET_DAYS
+    ]
+    buckets.append({"max_days": None, "count": row.aged_over})
+    return buckets
+
+
+async def load_repair_analytics(db: AsyncSession):
+    result = await db.execute(REPAIR_ANALYTICS_SQL, {"window_days": REPAIR_ANALYTICS_WINDOW_DAYS})
+
+    technicians = [
+        {
+            "technician_id": row.technician_id,
+            "technician_name": row.technician_name,
+            "queue_depth": row.queue_depth,
+            "completed": row.completed,
+            "avg_turnaround_hours": _hours(row.avg_turnaround_hours),
+            "p50_turnaround_hours": _hours(row.p50_turnaround_hours),
+            "p90_turnaround_hours": _hours(row.p90_turnaround_hours),
+            "oldest_open_days": _hours(row.oldest_open_days),
+            "aging": _aging(row),
+        }
+        for row in result
+    ]
+
+    return {
+        "window_days": REPAIR_ANALYTICS_WINDOW_DAYS,
+        "queue_depth": sum(t["queue_depth"] for t in technicians),
+        "completed": sum(t["completed"] for t in technicians),
+        "technicians": technicians,
+    }
+
+
+async def repair_analytics(db: AsyncSession):
+    return await lookup_cache.get_or_load(REPAIR_ANALYTICS_KEY, lambda: load_repair_analytics(db))
+
+
+def invalidate_repair_analytics(name: str, results):
+    """After commit of transition `name`: drop the analytics if it touched a repair"""
+
+    if name in REPAIR_TRANSITIONS and any(r["success"] for r in results):
+        lookup_cache.invalidate(REPAIR_ANALYTICS_KEY)
+
+
+def clear_repair_analytics():
+    lookup_cache.invalidate(REPAIR_ANALYTICS_KEY)
+
+
+def invalidate_analytics_for_event(event):
+    """Same for a change feed event, which may come from another worker"""
+
+    if "repair" in (event.get("old_status"), event.get("new_status")):
+        lookup_cache.invalidate(REPAIR_ANALYTICS_KEY)
@@ -0,0 +1,90 @@
+import heapq
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from itertools import chain
+
+SIMILARITY_THRESHOLD = 0.7
+SIMILARITY_CANDIDATES = 24
+
+
+def trigrams(value: str):
+    """pg_trgm style trigrams: lowercased and padded so short names still produce grams"""
+    padded = "  " + value.lower() + " "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Inverted trigram index over a list of names.
+
+    search() ranks names by trigram overlap with the query (Dice coefficient,
+    the trigram analogue of ratio's 2*M / (len_a + len_b)) and scores only
+    the top candidates with SequenceMatcher.ratio(), so every reported
+    similarity and the 0.7 threshold are exactly the old scan's. Recall is
+    not: a similar name outside the candidates, or sharing no trigram at all
+    ('abd' vs 'eabcd' is 0.75), is missed. Exact (case-insensitive) matches
+    are always found. The benchmark's random suffixes are a worst case, where
+    about three in four of the scan's top 10 are found.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self._lower = [name.lower() for name in self.names]
+        # seq2 is the side SequenceMatcher preprocesses, so do it once per name
+        self._matchers = [SequenceMatcher(None, "", lower) for lower in self._lower]
+        self._gram_counts = []
+        self._exact = defaultdict(list)
+        self._postings = defaultdict(list)
+
+        for idx, lower in enumerate(self._lower):
+            self._exact[lower].append(idx)
+            grams = trigrams(lower)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(idx)
+
+    def search(self, query: str, threshold: float = SIMILARITY_THRESHOLD, limit: int = 10):
+        """Exact matches and the `limit` most similar names, in index order"""
+
+        query_lower = query.lower()
+        query_len = len(query_lower)
+        query_grams = trigrams(query_lower)
+        exact = self._exact.get(query_lower, [])
+
+        shared = Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in query_grams))
+        size = max(SIMILARITY_CANDIDATES, 2 * limit) + len(exact)
+        gram_counts = self._gram_counts
+        # most_common() selects in C; Dice then only reorders that pool
+        candidates = heapq.nlargest(
+            size,
+            shared.most_common(4 * size),
+            key=lambda item: item[1] / (len(query_grams) + gram_counts[item[0]])
+        )
+
+        similar = []
+        for idx, _ in candidates:
+            lower = self._lower[idx]
+            if lower == query_lower:
+                continue
+
+            # ratio = 2*M / (len_a + len_b) and M <= min(len_a, len_b)
+            if 2 * min(query_len, len(lower)) <= threshold * (query_len + len(lower)):
+                continue
+
+            matcher = self._matchers[idx]
+            matcher.set_seq1(query_lower)
+            if matcher.quick_ratio() <= threshold:
+                continue
+
+            similarity = matcher.ratio()
+            if similarity > threshold:
+                similar.append((idx, {
+                    "name": self.names[idx],
+                    "similarity": round(similarity, 2),
+                    "type": "similar"
+                }))
+
+        matches = [(idx, {"name": self.names[idx], "similarity": 1.0, "type": "exact"}) for idx in exact]
+        matches += heapq.nlargest(limit, similar, key=lambda match: match[1]["similarity"])
+
+        return [match for _, match in sorted(matches, key=lambda match: match[0])]
@@ -0,0 +1,23 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def json_default(value):
+    """json.dumps fallback for the column types returned by our queries"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+async def ndjson_lines(result, batch_size: int = 500):
+    """Yield NDJSON chunks from a streaming AsyncResult, one chunk per fetched batch"""
+    async for partition in result.partitions(batch_size):
+        yield "".join(
+            json.dumps(dict(row._mapping), default=json_default) + "\n"
+            for row in partition
+        )
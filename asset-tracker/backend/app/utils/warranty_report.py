@@ -0,0 +1,170 @@
+"""
+Cached report of warranties expiring in the next 30/60/90 days.
+
+Each worker keeps the assets whose warranty ends between today and the
+largest bucket, sorted by end date. They are selected through the partial
+index on assets(warranty_end_date). A background task rebuilds the report
+every WARRANTY_REPORT_REFRESH_SECONDS and on the first read of a new day.
+In between, changed assets are marked stale through invalidate(). add_asset
+calls it after commit, and the change feed does so for writes from every
+worker. The next read then re-selects only the stale codes. Report requests
+never scan assets.
+"""
+import asyncio
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.config import WARRANTY_BUCKET_DAYS
+
+logger = logging.getLogger(__name__)
+
+REPORT_QUERY = """
+    SELECT
+        a.asset_code,
+        a.warranty_end_date,
+        c.name AS category,
+        a.type,
+        a.brand,
+        a.model,
+        a.serial_number,
+        a.status,
+        a.location,
+        aa.employee_id,
+        e.name AS employee_name
+    FROM assets a
+    LEFT JOIN categories c ON c.id = a.category_id
+    LEFT JOIN asset_assignments aa
+        ON aa.asset_code = a.asset_code
+        AND aa.is_active = TRUE
+    LEFT JOIN employees e ON e.employee_id = aa.employee_id
+    WHERE a.warranty_applicable
+    AND a.warranty_end_date BETWEEN :today AND :horizon
+    AND a.status <> 'retired'
+    {codes}
+"""
+
+REPORT_SQL = text(REPORT_QUERY.format(codes=""))
+REFRESH_SQL = text(REPORT_QUERY.format(codes="AND a.asset_code = ANY(:codes)"))
+
+
+def _sort_key(entry):
+    return entry["warranty_end_date"], entry["asset_code"]
+
+
+def bucket_for(days_left: int):
+    """Smallest bucket (in days) the expiry falls into"""
+    return next(days for days in WARRANTY_BUCKET_DAYS if days_left <= days)
+
+
+class WarrantyReport:
+    def __init__(self):
+        # Day the entries were selected for; None forces a rebuild
+        self.as_of = None
+        self.entries = []
+        self.keys = []
+        self.stale_codes = set()
+        self.lock = asyncio.Lock()
+
+    def invalidate(self, *codes):
+        self.stale_codes.update(codes)
+
+    def clear(self):
+        self.as_of = None
+
+    def _params(self, today: date):
+        return {"today": today, "horizon": today + timedelta(days=max(WARRANTY_BUCKET_DAYS))}
+
+    def _store(self, entries):
+        self.entries = sorted(entries, key=_sort_key)
+        self.keys = [_sort_key(entry) for entry in self.entries]
+
+    async def _rebuild(self, db: AsyncSession, today: date):
+        # Marks arriving while we query stay pending for the next read
+        self.stale_codes.clear()
+        result = await db.execute(REPORT_SQL, self._params(today))
+        self._store([dict(row._mapping) for row in result])
+        self.as_of = today
+
+    async def _refresh(self, db: AsyncSession):
+        codes = list(self.stale_codes)
+        self.stale_codes.clear()
+        try:
+            result = await db.execute(REFRESH_SQL, {**self._params(self.as_of), "codes": codes})
+        except Exception:
+            self.stale_codes.update(codes)
+            raise
+        refreshed = [dict(row._mapping) for row in result]
+
+        stale = set(codes)
+        self._store([entry for entry in self.entries if entry["asset_code"] not in stale] + refreshed)
+
+    async def current(self, db: AsyncSession, rebuild: bool = False):
+        """(as_of, entries sorted by end date), brought up to date first"""
+
+        async with self.lock:
+            today = date.today()
+            if rebuild or self.as_of != today:
+                await self._rebuild(db, today)
+            elif self.stale_codes:
+                await self._refresh(db)
+            return self.as_of, self.entries
+
+    async def summary(self, db: AsyncSession):
+        as_of, entries = await self.current(db)
+        counts = dict.fromkeys(WARRANTY_BUCKET_DAYS, 0)
+        for entry in entries:
+            counts[bucket_for((entry["warranty_end_date"] - as_of).days)] += 1
+
+        return {
+            "as_of": as_of,
+            "total": len(entries),
+            "buckets": [{"days": days, "count": count} for days, count in counts.items()],
+        }
+
+    async def page(self, db: AsyncSession, bucket, limit: int, after=None):
+        """
+        Entries of `bucket` (all buckets when None) after the (end date,
+        asset_code) position `after`; returns (as_of, entries, has_more).
+        """
+
+        as_of, entries = await self.current(db)
+        start = bisect_right(self.keys, after) if after else 0
+
+        if bucket is not None:
+            # Skip straight to the first day of the bucket
+            previous = [days for days in WARRANTY_BUCKET_DAYS if days < bucket]
+            first_day = as_of + timedelta(days=max(previous) + 1 if previous else 0)
+            start = max(start, bisect_left(self.keys, (first_day,)))
+
+        page = []
+        for index in range(start, len(entries)):
+            entry = entries[index]
+            days_left = (entry["warranty_end_date"] - as_of).days
+            if bucket is not None and days_left > bucket:
+                break
+            page.append({**entry, "days_left": days_left, "bucket": bucket_for(days_left)})
+            if len(page) > limit:
+                break
+
+        return as_of, page[:limit], len(page) > limit
+
+
+warranty_report = WarrantyReport()
+
+
+async def refresh_periodically(session_factory, interval_seconds: float):
+    """Background task run from the app lifespan; the first rebuild happens right away"""
+
+    while True:
+        try:
+            async with session_factory() as db:
+                await warranty_report.current(db, rebuild=True)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Warranty report refresh failed")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,105 @@
+"""
+Compare the indexed duplicate check against the old SequenceMatcher scan.
+
+Reports recall against the scan's `limit` most similar names and exits
+non-zero when a query through the index takes longer than --target-ms.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_category_similarity --categories 2000 --target-ms 1
+"""
+import argparse
+import random
+import string
+import time
+from difflib import SequenceMatcher
+
+from app.utils.similarity import TrigramIndex, SIMILARITY_THRESHOLD
+
+WORDS = [
+    "laptop", "desktop", "monitor", "keyboard", "mouse", "printer", "scanner",
+    "router", "switch", "headset", "webcam", "tablet", "phone", "projector",
+    "docking", "station", "charger", "cable", "adapter", "server", "storage",
+]
+
+
+def make_names(count: int, rng: random.Random):
+    names = set()
+    while len(names) < count:
+        words = rng.sample(WORDS, rng.randint(1, 2))
+        suffix = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(0, 4)))
+        names.add((" ".join(words) + " " + suffix).strip().title())
+    return list(names)
+
+
+def scan(name: str, existing_categories):
+    """The original per-request loop from check_duplicate_category"""
+    similar_categories = []
+    for existing_name in existing_categories:
+        if existing_name.lower() == name.lower():
+            similar_categories.append({"name": existing_name, "similarity": 1.0, "type": "exact"})
+        else:
+            similarity = SequenceMatcher(None, name.lower(), existing_name.lower()).ratio()
+            if similarity > SIMILARITY_THRESHOLD:
+                similar_categories.append({
+                    "name": existing_name,
+                    "similarity": round(similarity, 2),
+                    "type": "similar"
+                })
+    return similar_categories
+
+
+def top_names(matches, limit: int):
+    """Exact matches plus the `limit` most similar, as check_duplicate_category returns them"""
+    similar = sorted((m for m in matches if m["type"] == "similar"), key=lambda m: -m["similarity"])
+    return {m["name"] for m in matches if m["type"] == "exact"} | {m["name"] for m in similar[:limit]}
+
+
+def timed(fn, queries, repeat: int):
+    best, results = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [fn(query) for query in queries]
+        elapsed = (time.perf_counter() - start) / len(queries)
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--categories", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--target-ms", type=float, default=1.0, help="fail above this per-query latency")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = make_names(args.categories, rng)
+    queries = [rng.choice(names)[:-1] for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    index = TrigramIndex(names)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    scan_s, scan_results = timed(lambda q: scan(q, names), queries, 1)
+    index_s, index_results = timed(lambda q: index.search(q, limit=args.limit), queries, args.repeat)
+
+    expected = [top_names(result, args.limit) for result in scan_results]
+    found = sum(len(want & {m["name"] for m in got}) for want, got in zip(expected, index_results))
+    recall = found / max(1, sum(len(want) for want in expected))
+
+    print(f"categories:        {len(names)}")
+    print(f"index build:       {build_ms:.1f} ms")
+    print(f"SequenceMatcher:   {scan_s * 1000:.3f} ms/query")
+    print(f"trigram index:     {index_s * 1000:.3f} ms/query")
+    print(f"speedup:           {scan_s / index_s:.1f}x")
+    print(f"recall:            {recall:.1%} of the scan's top {args.limit}")
+
+    if index_s * 1000 > args.target_ms:
+        raise SystemExit(f"trigram index took {index_s * 1000:.3f} ms/query, target is {args.target_ms} ms")
+
+
+if __name__ == "__main__":
+    main()
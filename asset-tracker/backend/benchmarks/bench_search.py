@@ -0,0 +1,122 @@
+"""
+Time GET /assets/search's queries against a seeded database.
+
+Runs load_test.SEARCH_TERMS through app.utils.asset_search.search_assets,
+printing the EXPLAIN (ANALYZE, BUFFERS) execution time of every statement
+it issues and the wall time of the whole search over --repeat runs (later
+runs use PostgreSQL's generic plans, as the app's prepared statements do).
+Exits non-zero when a term's slowest run is over --target-ms.
+
+Seeds a scratch database like load_test, or reuses --url when given:
+
+    python -m benchmarks.bench_search --assets 1000000 --employees 20000 --keep
+    python -m benchmarks.bench_search --url postgresql://localhost/<scratch database>
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.utils.asset_search import search_assets
+from benchmarks.load_test import SEARCH_TERMS, create_scratch_database, drop_scratch_database, seed
+
+
+class ExplainingSession:
+    """Runs each statement under EXPLAIN ANALYZE first and records its plan"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.plans = []
+
+    async def execute(self, statement, params=None):
+        explain = text("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement.text)
+        [plan] = (await self.session.execute(explain, params)).scalar()
+        self.plans.append(plan)
+        return await self.session.execute(statement, params)
+
+
+def plan_nodes(node, depth=0):
+    yield depth, node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child, depth + 1)
+
+
+def print_plan(plan):
+    for depth, node in plan_nodes(plan["Plan"]):
+        name = node["Node Type"]
+        if "Index Name" in node:
+            name += f" using {node['Index Name']}"
+        print(f"      {'  ' * depth}{name}  rows={node['Actual Rows']} "
+              f"time={node['Actual Total Time']:.2f} ms  hit={node['Shared Hit Blocks']} "
+              f"read={node['Shared Read Blocks']}")
+
+
+async def run(url: str, args):
+    engine = create_async_engine(url.replace("postgresql://", "postgresql+asyncpg://"))
+    slowest = {}
+    async with AsyncSession(engine) as session:
+        for term in SEARCH_TERMS:
+            explaining = ExplainingSession(session)
+            items = await search_assets(explaining, term, args.limit)
+            total = sum(plan["Execution Time"] for plan in explaining.plans)
+            print(f"{term!r}: {len(explaining.plans)} statements, {total:.2f} ms executing, "
+                  f"top: {[(item['asset_code'], item['match']) for item in items[:3]]}")
+            for plan in explaining.plans:
+                print(f"    {plan['Execution Time']:.2f} ms")
+                if args.plans:
+                    print_plan(plan)
+
+            walls = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                await search_assets(session, term, args.limit)
+                walls.append((time.perf_counter() - start) * 1000)
+            slowest[term] = max(walls[1:] or walls)
+            print(f"    wall over {args.repeat} runs: best {min(walls):.2f} ms, "
+                  f"worst after the first {slowest[term]:.2f} ms")
+    await engine.dispose()
+    return slowest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="already seeded database to search")
+    parser.add_argument("--admin-url", default="postgresql://localhost/postgres",
+                        help="server to create the scratch database on")
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--assets", type=int, default=1000000)
+    parser.add_argument("--assigned", type=int, default=400000)
+    parser.add_argument("--history", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database")
+    parser.add_argument("--limit", type=int, default=8, help="page size, QuickCheck asks for 8")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--plans", action="store_true", help="print each plan's nodes")
+    parser.add_argument("--target-ms", type=float, default=20.0, help="fail above this per-search latency")
+    args = parser.parse_args()
+
+    url, name = args.url, None
+    if url is None:
+        url, name = create_scratch_database(args.admin_url)
+        print(f"seeding {name}...")
+        engine = create_engine(url)
+        seed(engine, args)
+        engine.dispose()
+    try:
+        slowest = asyncio.run(run(url, args))
+    finally:
+        if name is not None and not args.keep:
+            drop_scratch_database(args.admin_url, name)
+
+    print(json.dumps({term: round(ms, 2) for term, ms in slowest.items()}))
+    over = {term: ms for term, ms in slowest.items() if ms > args.target_ms}
+    if over:
+        raise SystemExit(f"over the {args.target_ms} ms target: " + ", ".join(
+            f"{term!r} {ms:.2f} ms" for term, ms in over.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Compare the old list_assets response path with the orjson row encoders.
+
+Builds an in-memory result shaped like GET /assets and times the old path
+(dict(row._mapping), jsonable_encoder, json.dumps, gzip level 9 in
+GZipMiddleware) against app.utils.responses with the object and columnar
+layouts, uncompressed and with each of its codecs (zstd, br). The old path
+body is also run through those codecs, so sizes compare like for like.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_serialization --rows 100000
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.engine.result import IteratorResult, SimpleResultMetaData
+
+from app.utils.responses import CODECS, rows_content, _encode
+
+COLUMNS = [
+    "asset_code", "category", "type", "brand", "model", "serial_number", "status",
+    "location", "warranty_end_date", "employee_id", "employee_name", "created_at",
+]
+GZIP_LEVEL = 9  # GZipMiddleware's default
+
+
+def make_rows(count: int, rng: random.Random):
+    now = datetime.now(timezone.utc)
+    tuples = []
+    for n in range(1, count + 1):
+        assigned = rng.random() < 0.4
+        employee = rng.randint(1, 2000)
+        tuples.append((
+            f"BEN{n:09d}",
+            f"Category {n % 50}",
+            "New",
+            rng.choice(["Dell", "HP", "Lenovo", "Apple"]),
+            f"Model {n % 50}",
+            f"SN{n}",
+            "assigned" if assigned else "instock",
+            f"Site {n % 10}",
+            date.today() + timedelta(days=n % 1000 - 300),
+            f"EMP{employee:06d}" if assigned else None,
+            f"Employee {employee}" if assigned else None,
+            now - timedelta(seconds=n),
+        ))
+    return IteratorResult(SimpleResultMetaData(COLUMNS), iter(tuples)).all()
+
+
+def old_path(rows):
+    content = jsonable_encoder([dict(row._mapping) for row in rows])
+    # JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def best_of(repeat: int, fn):
+    best, value = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+
+def report(name, encode_ms, body, baseline_ms=None):
+    speedup = f"  x{baseline_ms / encode_ms:.1f}" if baseline_ms else ""
+    print(f"  {name:<28} {encode_ms:>9.1f} ms {len(body) / 1024:>10.0f} KiB{speedup}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, random.Random(args.seed))
+    print(f"{args.rows} rows, best of {args.repeat}; time includes compression")
+
+    base_ms, body = best_of(args.repeat, lambda: old_path(rows))
+    report("old path, uncompressed", base_ms, body)
+    gzip_ms, gzipped = best_of(args.repeat, lambda: gzip.compress(old_path(rows), GZIP_LEVEL))
+    report(f"old path, gzip {GZIP_LEVEL}", gzip_ms, gzipped)
+    for encoding, compress in CODECS:
+        ms, body = best_of(args.repeat, lambda: compress(old_path(rows)))
+        report(f"old path, {encoding}", ms, body, gzip_ms)
+
+    for layout in ("objects", "columnar"):
+        build = lambda: rows_content(COLUMNS, rows, layout)
+        encode_ms, (body, _) = best_of(args.repeat, lambda: _encode(build, set()))
+        report(f"orjson {layout}", encode_ms, body, base_ms)
+
+        ms, gzipped = best_of(args.repeat, lambda: gzip.compress(_encode(build, set())[0], GZIP_LEVEL))
+        report(f"orjson {layout}, gzip {GZIP_LEVEL}", ms, gzipped, gzip_ms)
+
+        for encoding, _ in CODECS:
+            ms, (body, _) = best_of(args.repeat, lambda: _encode(build, {encoding}))
+            report(f"orjson {layout}, {encoding}", ms, body, gzip_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Latency/throughput benchmark of the real app against a throwaway local PostgreSQL.
+
+Creates a scratch database next to the one in --admin-url, applies the
+migrations, seeds it, serves app.main:app with uvicorn in a background thread
+and drives the scan-heavy request mix over HTTP. Results are written as JSON
+to benchmarks/results/ so runs from different commits can be compared.
+
+Run from the backend directory (needs httpx, see benchmarks/requirements.txt):
+
+    python -m benchmarks.load_test --assets 100000 --concurrency 32 --duration 30
+    python -m benchmarks.load_test --compare benchmarks/results/<previous>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# (operation, weight) for the scanner-heavy traffic mix
+REQUEST_MIX = [
+    ("get_asset", 45),
+    ("list_assets", 10),
+    ("search", 10),
+    ("assign", 12),
+    ("return", 12),
+    ("exit_clearance", 11),
+]
+
+# Typed-ahead fragments: code prefixes, brands, serial fragments and a typo
+SEARCH_TERMS = ["BEN0000", "BEN00012", "dell", "lenovo mod", "SN123", "Employee 17", "lenvo"]
+
+SEED_STATEMENTS = [
+    """
+    INSERT INTO categories (name)
+    SELECT 'Category ' || g FROM generate_series(1, :categories) g
+    """,
+    """
+    INSERT INTO employees (employee_id, name, email, location, status)
+    SELECT
+        'EMP' || LPAD(CAST(g AS text), 6, '0'),
+        'Employee ' || g,
+        'emp' || g || '@example.com',
+        'Site ' || (g % 10),
+        'active'
+    FROM generate_series(1, :employees) g
+    """,
+    """
+    INSERT INTO assets
+    (asset_code, category_id, type, brand, model, serial_number, status,
+     location, warranty_applicable, warranty_end_date, created_at, updated_at)
+    SELECT
+        'BEN' || LPAD(CAST(g AS text), 9, '0'),
+        (SELECT MIN(id) FROM categories) + g % :categories,
+        'New',
+        (ARRAY['Dell', 'HP', 'Lenovo', 'Apple'])[1 + g % 4],
+        'Model ' || (g % 50),
+        'SN' || g,
+        CASE WHEN g <= :assigned THEN 'assigned' ELSE 'instock' END,
+        'Site ' || (g % 10),
+        g % 2 = 0,
+        CURRENT_DATE + (g % 1000) - 300,
+        now() - make_interval(secs => g),
+        now() - make_interval(secs => g)
+    FROM generate_series(1, :assets) g
+    """,
+    """
+    INSERT INTO asset_assignments (asset_code, employee_id)
+    SELECT
+        'BEN' || LPAD(CAST(g AS text), 9, '0'),
+        'EMP' || LPAD(CAST(1 + g % :employees AS text), 6, '0')
+    FROM generate_series(1, :assigned) g
+    """,
+    """
+    INSERT INTO asset_history (asset_code, action, old_status, new_status, created_at)
+    SELECT
+        'BEN' || LPAD(CAST(1 + g % :assets AS text), 9, '0'),
+        'return',
+        'assigned',
+        'instock',
+        now() - make_interval(mins => g)
+    FROM generate_series(1, :history) g
+    """,
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies_ms):
+    return {
+        "count": len(latencies_ms),
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 3) if latencies_ms else None,
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99),
+        "max_ms": max(latencies_ms) if latencies_ms else None,
+    }
+
+
+def create_scratch_database(admin_url: str):
+    url = make_url(admin_url)
+    name = f"asset_tracker_bench_{os.getpid()}"
+    admin = create_engine(url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'CREATE DATABASE "{name}"'))
+    admin.dispose()
+    return url.set(database=name).render_as_string(hide_password=False), name
+
+
+def drop_scratch_database(admin_url: str, name: str):
+    admin = create_engine(make_url(admin_url), isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+    admin.dispose()
+
+
+def seed(engine, args):
+    from app.utils.migrations import run_migrations
+
+    run_migrations(engine)
+    params = {
+        "categories": args.categories,
+        "employees": args.employees,
+        "assets": args.assets,
+        "assigned": min(args.assigned, args.assets),
+        "history": args.history,
+    }
+    with engine.begin() as conn:
+        for statement in SEED_STATEMENTS:
+            conn.execute(text(statement), params)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def track_pool_wait(async_engine):
+    """Record how long each connection checkout waits on the app's pool"""
+    pool = async_engine.sync_engine.pool
+    waits_ms = []
+    do_get = pool._do_get
+
+    def timed_do_get():
+        start = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            waits_ms.append((time.perf_counter() - start) * 1000)
+
+    pool._do_get = timed_do_get
+    return waits_ms
+
+
+def start_server(port: int):
+    import uvicorn
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+class Workload:
+    """Picks requests from REQUEST_MIX while keeping assign/return targets valid"""
+
+    def __init__(self, args, rng):
+        self.rng = rng
+        assigned = min(args.assigned, args.assets)
+        self.codes = [f"BEN{n:09d}" for n in range(1, args.assets + 1)]
+        self.assigned = self.codes[:assigned]
+        self.instock = self.codes[assigned:]
+        self.employees = [f"EMP{n:06d}" for n in range(1, args.employees + 1)]
+        self.operations = [op for op, _ in REQUEST_MIX]
+        self.weights = [weight for _, weight in REQUEST_MIX]
+
+    def next_request(self):
+        op = self.rng.choices(self.operations, self.weights)[0]
+
+        if op == "assign" and self.instock:
+            code = self.instock.pop(self.rng.randrange(len(self.instock)))
+            emp = self.rng.choice(self.employees)
+            return op, "POST", f"/assign?asset_code={code}&employee_id={emp}", code
+        if op == "return" and self.assigned:
+            code = self.assigned.pop(self.rng.randrange(len(self.assigned)))
+            return op, "POST", f"/return?asset_code={code}", code
+        if op == "list_assets":
+            return op, "GET", "/assets?limit=100", None
+        if op == "search":
+            return op, "GET", f"/assets/search?q={self.rng.choice(SEARCH_TERMS)}", None
+        if op == "exit_clearance":
+            return op, "GET", f"/exit-clearance/{self.rng.choice(self.employees)}", None
+        return "get_asset", "GET", f"/assets/{self.rng.choice(self.codes)}", None
+
+    def settle(self, op, code, ok):
+        if code is None:
+            return
+        moved_to_assigned = (op == "assign") == ok
+        (self.assigned if moved_to_assigned else self.instock).append(code)
+
+
+async def drive(base_url: str, args, workload: Workload):
+    import httpx
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    measuring = False
+
+    async def worker(client, deadline):
+        while time.perf_counter() < deadline:
+            op, method, path, code = workload.next_request()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            workload.settle(op, code, ok)
+            if measuring:
+                latencies[op].append(round(elapsed_ms, 3))
+                if not ok:
+                    errors[op] += 1
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        if args.warmup:
+            deadline = time.perf_counter() + args.warmup
+            await asyncio.gather(*(worker(client, deadline) for _ in range(args.concurrency)))
+
+        measuring = True
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(worker(client, deadline) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return latencies, errors, elapsed
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_comparison(report, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\nvs {baseline['revision']} ({baseline_path}):")
+    for op, stats in report["operations"].items():
+        before = baseline["operations"].get(op)
+        if not before or not before["p95_ms"] or not stats["p95_ms"]:
+            continue
+        change = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        print(f"  {op:<16} p95 {before['p95_ms']:>8.2f} -> {stats['p95_ms']:>8.2f} ms ({change:+.1f}%)")
+    change = (report["throughput_rps"] - baseline["throughput_rps"]) / baseline["throughput_rps"] * 100
+    print(f"  {'throughput':<16} {baseline['throughput_rps']:>8.1f} -> {report['throughput_rps']:>8.1f} req/s ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the asset tracker API")
+    parser.add_argument("--admin-url", default="postgresql://localhost/postgres",
+                        help="server to create the scratch database on")
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--assets", type=int, default=100000)
+    parser.add_argument("--assigned", type=int, default=40000)
+    parser.add_argument("--history", type=int, default=200000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database")
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    args = parser.parse_args()
+
+    database_url, database_name = create_scratch_database(args.admin_url)
+    try:
+        # Must be set before app.database is imported
+        os.environ["DATABASE_URL"] = database_url
+        from app.database import engine, async_engine
+
+        print(f"seeding {database_name}...")
+        seed(engine, args)
+
+        pool_waits_ms = track_pool_wait(async_engine)
+        server, thread = start_server(args.port)
+
+        workload = Workload(args, random.Random(args.seed))
+        latencies, errors, elapsed = asyncio.run(drive(f"http://127.0.0.1:{args.port}", args, workload))
+
+        server.should_exit = True
+        thread.join()
+        engine.dispose()
+    finally:
+        if not args.keep:
+            drop_scratch_database(args.admin_url, database_name)
+
+    total = sum(len(values) for values in latencies.values())
+    report = {
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": vars(args),
+        "elapsed_s": round(elapsed, 3),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1),
+        "operations": {
+            op: {**summarize(latencies[op]), "errors": errors[op]}
+            for op, _ in REQUEST_MIX
+        },
+        "pool_wait": summarize([round(wait, 3) for wait in pool_waits_ms]),
+    }
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    output = RESULTS_DIR / f"{report['timestamp'].replace(':', '')}-{report['revision']}.json"
+    output.write_text(json.dumps(report, indent=2))
+
+    print(f"{total} requests in {elapsed:.1f}s = {report['throughput_rps']} req/s")
+    for op, stats in report["operations"].items():
+        print(f"  {op:<16} n={stats['count']:<7} p50={stats['p50_ms']} p95={stats['p95_ms']} "
+              f"p99={stats['p99_ms']} errors={stats['errors']}")
+    print(f"  {'pool wait':<16} n={report['pool_wait']['count']:<7} p50={report['pool_wait']['p50_ms']} "
+          f"p95={report['pool_wait']['p95_ms']} p99={report['pool_wait']['p99_ms']}")
+    print(f"results written to {output}")
+
+    if args.compare:
+        print_comparison(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Smoke check of every router behind a transaction-level pooler.
+
+Creates a scratch database like load_test, starts the stand-in pooler from
+benchmarks/txn_pooler.py in front of it with only a few server connections,
+and serves the app with DB_POOLER_MODE=transaction through it. The change
+feed's LISTEN connection goes straight to PostgreSQL (DB_LISTEN_URL). Every
+endpoint is called once, then a burst of concurrent scans and lifecycle
+writes checks that many client connections share the server connections
+without leaking state between transactions.
+
+Run from the backend directory (needs httpx, see benchmarks/requirements.txt):
+
+    python -m benchmarks.pooler_check --admin-url postgresql://localhost/postgres
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from benchmarks.load_test import create_scratch_database, drop_scratch_database, seed, start_server
+from benchmarks.txn_pooler import serve
+
+SEED = SimpleNamespace(categories=5, employees=40, assets=400, assigned=100, history=500)
+SECRET = "admin123"
+
+IMPORT_CSV = (
+    "asset_code,category,type,brand,model,serial_number,location\n"
+    "POOL00001,Category 1,New,Dell,Latitude,SNPOOL1,Site 1\n"
+    "POOL00002,Category 2,New,HP,EliteBook,SNPOOL2,Site 2\n"
+)
+
+
+def start_pooler(server_url: str, port: int, pool_size: int):
+    started = threading.Event()
+    pools = []
+
+    def on_started(pool):
+        pools.append(pool)
+        started.set()
+
+    thread = threading.Thread(
+        target=asyncio.run,
+        args=(serve(server_url, "127.0.0.1", port, pool_size, on_started),),
+        daemon=True,
+    )
+    thread.start()
+    if not started.wait(10):
+        raise SystemExit("stand-in pooler did not start")
+    return pools[0]
+
+
+def router_checks(category_id: int):
+    """(name, method, path, request kwargs, expected status) in execution order"""
+
+    instock = f"BEN{SEED.assets:09d}"
+    spare = f"BEN{SEED.assets - 1:09d}"
+    assigned = "BEN000000001"
+
+    return [
+        ("health ready", "GET", "/health/ready", {}, 200),
+        ("metrics", "GET", "/metrics", {}, 200),
+        ("categories", "GET", "/categories", {}, 200),
+        ("category duplicate", "POST", "/categories/check-duplicate", {"params": {"name": "Categry 1"}}, 200),
+        ("category add", "POST", "/categories/add", {"params": {"name": "Pooler Check"}}, 200),
+        ("employees", "GET", "/employees", {}, 200),
+        ("employee add", "POST", "/employees/add",
+         {"params": {"employee_id": "EMPPOOL", "name": "Pooler", "email": "pool@example.com", "location": "Site 1"}}, 200),
+        ("employee assets", "GET", "/employees/EMP000001/assets", {}, 200),
+        ("asset count", "GET", "/assets/count", {}, 200),
+        ("stats", "GET", "/stats", {}, 200),
+        ("search", "GET", "/assets/search", {"params": {"q": "dell"}}, 200),
+        ("get asset", "GET", f"/assets/{assigned}", {}, 200),
+        ("list assets", "GET", "/assets", {"params": {"limit": 20}}, 200),
+        ("list assets ndjson", "GET", "/assets", {"params": {"format": "ndjson", "status": "instock"}}, 200),
+        ("lookup", "POST", "/assets/lookup", {"json": {"codes": [assigned, instock, "NOPE"]}}, 200),
+        ("add asset", "POST", "/assets/add",
+         {"params": {"category_id": category_id, "type": "New", "brand": "Dell", "model": "X", "serial_number": "SNX", "location": "Site 1"}}, 200),
+        ("reserve codes", "POST", "/assets/codes/reserve", {"params": {"category_id": category_id, "count": 3}}, 200),
+        ("import", "POST", "/assets/import", {"content": IMPORT_CSV}, 200),
+        ("assign", "POST", "/assign", {"params": {"asset_code": instock, "employee_id": "EMPPOOL"}}, 200),
+        ("return", "POST", "/return", {"params": {"asset_code": instock}}, 200),
+        ("repair", "POST", "/repair", {"params": {"asset_code": instock, "repair_employee_id": "EMP000002"}}, 200),
+        ("repair list", "GET", "/repair/list", {}, 200),
+        ("repair complete", "POST", "/repair/complete", {"params": {"asset_code": instock}}, 200),
+        ("missing", "POST", "/missing", {"params": {"asset_code": instock}}, 200),
+        ("recover", "POST", "/missing/recover", {"params": {"asset_code": instock}}, 200),
+        ("retire", "POST", "/retire", {"params": {"asset_code": instock, "secret": SECRET}}, 200),
+        ("bulk assign", "POST", "/bulk/assign",
+         {"json": {"items": [{"asset_code": spare, "employee_id": "EMP000003"}]}}, 200),
+        ("bulk return", "POST", "/bulk/return", {"json": {"items": [{"asset_code": spare}]}}, 200),
+        ("clearance", "GET", "/exit-clearance/EMP000001", {}, 200),
+        ("clearance bulk", "POST", "/exit-clearance/bulk", {"json": {}}, 200),
+        ("clearance approve", "POST", "/exit-clearance/approve", {"params": {"employee_id": "EMPPOOL", "secret": SECRET}}, 200),
+        ("clearance bulk approve", "POST", "/exit-clearance/bulk/approve",
+         {"params": {"secret": SECRET}, "json": {"employee_ids": ["EMP000040"]}}, 200),
+        ("employee deactivate", "POST", "/employees/deactivate", {"params": {"employee_id": "EMPPOOL"}}, 200),
+        ("export assets", "GET", "/export/assets", {}, 200),
+        ("export assignments", "GET", "/export/assignments", {"params": {"format": "xlsx"}}, 200),
+        ("export repairs", "GET", "/export/repairs", {}, 200),
+        ("history", "GET", "/history", {"params": {"limit": 20}}, 200),
+        ("asset history", "GET", f"/assets/{instock}/history", {}, 200),
+        ("employee history", "GET", "/employees/EMPPOOL/history", {}, 200),
+    ]
+
+
+def check_events(client):
+    """The change feed replays from sequence 0 and streams without holding a pooled connection"""
+
+    with client.stream("GET", "/events/assets", params={"since": 0}) as response:
+        if response.status_code != 200:
+            return f"status {response.status_code}"
+        for line in response.iter_lines():
+            if line.startswith("data:"):
+                return None
+    return "no events replayed"
+
+
+def run_burst(base_url: str, requests: int, concurrency: int):
+    """Concurrent scans plus assign/return pairs on distinct assets; returns failures"""
+
+    import httpx
+
+    def scan(n):
+        with httpx.Client(base_url=base_url, timeout=30) as client:
+            code = f"BEN{1 + n % SEED.assets:09d}"
+            failures = []
+            for method, path, kwargs in (
+                ("GET", f"/assets/{code}", {}),
+                ("POST", "/assets/lookup", {"json": {"codes": [code]}}),
+                ("GET", "/assets/search", {"params": {"q": code[:6]}}),
+            ):
+                response = client.request(method, path, **kwargs)
+                if response.status_code != 200:
+                    failures.append(f"{method} {path}: {response.status_code}")
+
+            # Instock range only, one asset per request
+            if n < SEED.assets - SEED.assigned - 10:
+                code = f"BEN{SEED.assigned + 1 + n:09d}"
+                for path, params in (
+                    ("/assign", {"asset_code": code, "employee_id": "EMP000005"}),
+                    ("/return", {"asset_code": code}),
+                ):
+                    response = client.post(path, params=params)
+                    if response.status_code != 200:
+                        failures.append(f"POST {path} {code}: {response.status_code} {response.text[:200]}")
+            return failures
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        return [failure for failures in executor.map(scan, range(requests)) for failure in failures]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check every router behind a transaction pooler")
+    parser.add_argument("--admin-url", default="postgresql://localhost/postgres",
+                        help="server to create the scratch database on")
+    parser.add_argument("--pooler-port", type=int, default=6433)
+    parser.add_argument("--pool-size", type=int, default=3, help="server connections behind the pooler")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--burst", type=int, default=200, help="concurrent scan/write requests")
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    import httpx
+    from sqlalchemy.engine import make_url
+
+    database_url, database_name = create_scratch_database(args.admin_url)
+    failures = []
+    try:
+        pool = start_pooler(database_url, args.pooler_port, args.pool_size)
+        pooled_url = make_url(database_url).set(host="127.0.0.1", port=args.pooler_port)
+
+        # Must be set before app.database is imported
+        os.environ.update({
+            "DATABASE_URL": pooled_url.render_as_string(hide_password=False),
+            "DB_LISTEN_URL": database_url,
+            "DB_POOLER_MODE": "transaction",
+        })
+        from app.database import engine
+
+        print(f"seeding {database_name} through the pooler...")
+        seed(engine, SEED)
+
+        server, thread = start_server(args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+        with httpx.Client(base_url=base_url, timeout=30) as client:
+            category_id = client.get("/categories").json()[0]["id"]
+            for name, method, path, kwargs, expected in router_checks(category_id):
+                response = client.request(method, path, **kwargs)
+                # Streamed bodies report errors in-band after a 200
+                body = response.text
+                ok = response.status_code == expected and '"error"' not in body[-2000:]
+                print(f"  {'ok' if ok else 'FAIL':<4} {name:<24} {response.status_code}")
+                if not ok:
+                    failures.append(f"{name}: {response.status_code} {body[:300]}")
+
+            error = check_events(client)
+            print(f"  {'ok' if error is None else 'FAIL':<4} {'events':<24} {error or ''}")
+            if error:
+                failures.append(f"events: {error}")
+
+        start = time.perf_counter()
+        burst_failures = run_burst(base_url, args.burst, args.concurrency)
+        elapsed = time.perf_counter() - start
+        print(f"  {'ok' if not burst_failures else 'FAIL':<4} {'burst':<24} "
+              f"{args.burst} clients in {elapsed:.1f}s over {pool.total} server connections, "
+              f"{pool.transactions} pooled transactions")
+        failures.extend(burst_failures)
+
+        server.should_exit = True
+        thread.join()
+        engine.dispose()
+    finally:
+        drop_scratch_database(args.admin_url, database_name)
+
+    if failures:
+        print(f"\n{len(failures)} failures:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("all routers work behind the transaction pooler")
+
+
+if __name__ == "__main__":
+    main()
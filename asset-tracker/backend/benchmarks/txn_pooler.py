@@ -0,0 +1,280 @@
+"""
+Stand-in transaction-level pooler for testing DB_POOLER_MODE=transaction
+without Docker or a PgBouncer install.
+
+Speaks just enough of the PostgreSQL wire protocol to multiplex many client
+connections over a few server connections the way PgBouncer's
+pool_mode=transaction does. A client gets a server connection when it
+sends something. It keeps that connection until every Query/Sync it sent
+has been answered and the server reports ReadyForQuery with status idle
+(outside a transaction). Then the connection returns to a LIFO idle list
+and the next client may get it. Named prepared statements, session SETs,
+advisory session locks or LISTEN that outlive a transaction therefore break
+just as they would behind the real thing.
+
+Clients are not authenticated and their startup parameters are ignored;
+every server connection goes to --server-url (trust, password, md5 and
+SCRAM-SHA-256 auth are supported upstream). Not for production use.
+
+    python -m benchmarks.txn_pooler --server-url postgresql://localhost/asset_tracker --port 6433
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import struct
+
+from sqlalchemy.engine import make_url
+
+logger = logging.getLogger(__name__)
+
+SSL_REQUEST = 80877103
+GSSENC_REQUEST = 80877104
+CANCEL_REQUEST = 80877102
+PROTOCOL_3 = 196608
+
+# Client messages that the server answers with exactly one ReadyForQuery
+SYNCING_MESSAGES = {b"Q", b"S", b"F"}
+
+
+def message(kind: bytes, payload: bytes = b"") -> bytes:
+    return kind + struct.pack("!i", len(payload) + 4) + payload
+
+
+async def read_message(reader):
+    header = await reader.readexactly(5)
+    length = struct.unpack("!i", header[1:])[0]
+    return header[:1], await reader.readexactly(length - 4)
+
+
+class ServerConnection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.parameter_status = []
+
+    def close(self):
+        self.writer.close()
+
+
+async def _scram_auth(reader, writer, user: str, password: str, mechanisms: bytes):
+    if b"SCRAM-SHA-256" not in mechanisms.split(b"\0"):
+        raise ConnectionError(f"Unsupported SASL mechanisms {mechanisms!r}")
+
+    nonce = base64.b64encode(os.urandom(18)).decode()
+    client_first_bare = f"n=,r={nonce}"
+    initial = f"n,,{client_first_bare}".encode()
+    writer.write(message(b"p", b"SCRAM-SHA-256\0" + struct.pack("!i", len(initial)) + initial))
+
+    kind, payload = await read_message(reader)
+    if kind != b"R" or struct.unpack("!i", payload[:4])[0] != 11:
+        raise ConnectionError("Unexpected SCRAM server-first message")
+    server_first = payload[4:].decode()
+    fields = dict(item.split("=", 1) for item in server_first.split(","))
+
+    salted = hashlib.pbkdf2_hmac(
+        "sha256", password.encode(), base64.b64decode(fields["s"]), int(fields["i"])
+    )
+    client_key = hmac.digest(salted, b"Client Key", "sha256")
+    stored_key = hashlib.sha256(client_key).digest()
+    client_final_bare = f"c=biws,r={fields['r']}"
+    auth_message = f"{client_first_bare},{server_first},{client_final_bare}".encode()
+    signature = hmac.digest(stored_key, auth_message, "sha256")
+    proof = base64.b64encode(bytes(a ^ b for a, b in zip(client_key, signature))).decode()
+    writer.write(message(b"p", f"{client_final_bare},p={proof}".encode()))
+
+
+async def open_server_connection(url) -> ServerConnection:
+    reader, writer = await asyncio.open_connection(url.host or "localhost", url.port or 5432)
+    user = url.username or os.getenv("PGUSER") or os.getenv("USER") or "postgres"
+    password = url.password or os.getenv("PGPASSWORD") or ""
+
+    params = f"user\0{user}\0database\0{url.database or user}\0\0".encode()
+    writer.write(struct.pack("!ii", len(params) + 8, PROTOCOL_3) + params)
+
+    server = ServerConnection(reader, writer)
+    while True:
+        kind, payload = await read_message(reader)
+        if kind == b"R":
+            code = struct.unpack("!i", payload[:4])[0]
+            if code == 3:
+                writer.write(message(b"p", password.encode() + b"\0"))
+            elif code == 5:
+                inner = hashlib.md5(password.encode() + user.encode()).hexdigest()
+                outer = hashlib.md5(inner.encode() + payload[4:8]).hexdigest()
+                writer.write(message(b"p", f"md5{outer}".encode() + b"\0"))
+            elif code == 10:
+                await _scram_auth(reader, writer, user, password, payload[4:])
+            elif code not in (0, 12):
+                raise ConnectionError(f"Unsupported authentication request {code}")
+        elif kind == b"S":
+            server.parameter_status.append(message(kind, payload))
+        elif kind == b"E":
+            raise ConnectionError(payload.decode(errors="replace"))
+        elif kind == b"Z":
+            return server
+
+
+class ServerPool:
+    def __init__(self, url, size: int):
+        self.url = url
+        self.size = size
+        self.idle = []
+        self.total = 0
+        self.available = asyncio.Condition()
+        self.parameter_status = []
+        self.transactions = 0
+
+    async def acquire(self) -> ServerConnection:
+        async with self.available:
+            while not self.idle and self.total >= self.size:
+                await self.available.wait()
+            if self.idle:
+                return self.idle.pop()
+            self.total += 1
+
+        try:
+            server = await open_server_connection(self.url)
+            logger.info("Opened server connection %d/%d", self.total, self.size)
+        except BaseException:
+            async with self.available:
+                self.total -= 1
+                self.available.notify()
+            raise
+        if not self.parameter_status:
+            self.parameter_status = server.parameter_status
+        return server
+
+    async def release(self, server: ServerConnection):
+        self.transactions += 1
+        async with self.available:
+            # LIFO like PgBouncer's default, so a hot connection is reused first
+            self.idle.append(server)
+            self.available.notify()
+
+    async def discard(self, server: ServerConnection):
+        server.close()
+        async with self.available:
+            self.total -= 1
+            self.available.notify()
+
+
+class ClientSession:
+    """One client connection and the server connection it currently holds"""
+
+    def __init__(self, pool: ServerPool, reader, writer):
+        self.pool = pool
+        self.reader = reader
+        self.writer = writer
+        self.server = None
+        self.pending = 0
+        self.lock = asyncio.Lock()
+        self.relay = None
+
+    async def startup(self) -> bool:
+        while True:
+            length, code = struct.unpack("!ii", await self.reader.readexactly(8))
+            # Startup parameters are ignored; every client shares the one upstream
+            await self.reader.readexactly(length - 8)
+            if code in (SSL_REQUEST, GSSENC_REQUEST):
+                self.writer.write(b"N")
+                continue
+            if code == CANCEL_REQUEST:
+                return False
+            if code != PROTOCOL_3:
+                return False
+            break
+
+        if not self.pool.parameter_status:
+            await self.pool.release(await self.pool.acquire())
+
+        reply = message(b"R", struct.pack("!i", 0))
+        reply += b"".join(self.pool.parameter_status)
+        reply += message(b"K", struct.pack("!ii", os.getpid(), id(self) & 0x7FFFFFFF))
+        reply += message(b"Z", b"I")
+        self.writer.write(reply)
+        await self.writer.drain()
+        return True
+
+    async def relay_server(self, server: ServerConnection):
+        """Forward server messages until the transaction is over, then give the connection back"""
+        try:
+            while True:
+                kind, payload = await read_message(server.reader)
+                self.writer.write(message(kind, payload))
+                if kind != b"Z":
+                    continue
+                await self.writer.drain()
+                async with self.lock:
+                    self.pending -= 1
+                    if payload == b"I" and self.pending == 0:
+                        self.server = None
+                        await self.pool.release(server)
+                        return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self.writer.close()
+
+    async def run(self):
+        try:
+            if not await self.startup():
+                return
+            while True:
+                kind, payload = await read_message(self.reader)
+                if kind == b"X":
+                    return
+                async with self.lock:
+                    if self.server is None:
+                        self.server = await self.pool.acquire()
+                        self.relay = asyncio.create_task(self.relay_server(self.server))
+                    if kind in SYNCING_MESSAGES:
+                        self.pending += 1
+                    server = self.server
+                    server.writer.write(message(kind, payload))
+                await server.writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self.relay is not None and not self.relay.done():
+            self.relay.cancel()
+        async with self.lock:
+            # Possibly mid-transaction: never hand this one to another client
+            if self.server is not None:
+                await self.pool.discard(self.server)
+                self.server = None
+        self.writer.close()
+
+
+async def serve(server_url: str, host: str, port: int, pool_size: int, started=None):
+    pool = ServerPool(make_url(server_url), pool_size)
+
+    async def handle(reader, writer):
+        await ClientSession(pool, reader, writer).run()
+
+    listener = await asyncio.start_server(handle, host, port)
+    if started is not None:
+        started(pool)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in transaction-level PostgreSQL pooler")
+    parser.add_argument("--server-url", required=True, help="PostgreSQL to pool connections to")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6433)
+    parser.add_argument("--pool-size", type=int, default=4, help="server connections")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(f"pooling on {args.host}:{args.port} -> {args.server_url} ({args.pool_size} server connections)")
+    asyncio.run(serve(args.server_url, args.host, args.port, args.pool_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+-- Base schema for the tables used by the routers.
+-- Written with IF NOT EXISTS so it can be applied to databases that were
+-- created by hand before migrations existed.
+
+CREATE TABLE IF NOT EXISTS categories (
+    id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS employees (
+    employee_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT,
+    location TEXT,
+    status TEXT NOT NULL DEFAULT 'active',
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS assets (
+    asset_code TEXT PRIMARY KEY,
+    category_id INTEGER NOT NULL REFERENCES categories (id),
+    type TEXT,
+    brand TEXT,
+    model TEXT,
+    serial_number TEXT,
+    status TEXT NOT NULL DEFAULT 'instock',
+    location TEXT,
+    warranty_applicable BOOLEAN NOT NULL DEFAULT FALSE,
+    warranty_end_date DATE,
+    remarks TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS asset_assignments (
+    id SERIAL PRIMARY KEY,
+    asset_code TEXT NOT NULL REFERENCES assets (asset_code),
+    employee_id TEXT NOT NULL REFERENCES employees (employee_id),
+    assigned_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    returned_date TIMESTAMP,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE
+);
+
+CREATE TABLE IF NOT EXISTS repair_tracking (
+    id SERIAL PRIMARY KEY,
+    asset_code TEXT NOT NULL REFERENCES assets (asset_code),
+    repair_assignee_id TEXT REFERENCES employees (employee_id),
+    repair_start_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE
+);
+
+CREATE TABLE IF NOT EXISTS asset_history (
+    id BIGSERIAL PRIMARY KEY,
+    asset_code TEXT NOT NULL,
+    action TEXT NOT NULL,
+    old_status TEXT,
+    new_status TEXT,
+    employee_id TEXT,
+    remarks TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Per (category prefix, DDMMYY) asset code counter, see app/utils/asset_codes.py
+CREATE TABLE IF NOT EXISTS asset_code_counters (
+    prefix TEXT NOT NULL,
+    day TEXT NOT NULL,
+    last_value INTEGER NOT NULL,
+    PRIMARY KEY (prefix, day)
+);
@@ -0,0 +1,60 @@
+-- Partial and expression indexes matched to the predicates of the hot queries.
+-- Plain CREATE INDEX (not CONCURRENTLY) because each migration runs in a
+-- transaction; on a large live table build these by hand first with
+-- CREATE INDEX CONCURRENTLY using the same names and this file becomes a no-op.
+
+-- Older data may hold several active assignments for one asset; keep the
+-- newest so the uniqueness constraint below can be built.
+UPDATE asset_assignments aa
+SET is_active = FALSE,
+    returned_date = COALESCE(aa.returned_date, CURRENT_TIMESTAMP)
+WHERE aa.is_active = TRUE
+AND EXISTS (
+    SELECT 1 FROM asset_assignments newer
+    WHERE newer.asset_code = aa.asset_code
+    AND newer.is_active = TRUE
+    AND newer.id > aa.id
+);
+
+-- get_asset / list_assets join: aa.asset_code = a.asset_code AND aa.is_active = TRUE
+-- Also enforces at most one active assignment per asset.
+CREATE UNIQUE INDEX IF NOT EXISTS ux_asset_assignments_active_asset
+    ON asset_assignments (asset_code)
+    WHERE is_active;
+
+-- check_clearance / approve_clearance / deactivate_employee / employee asset count:
+-- employee_id = :eid AND is_active = TRUE
+CREATE INDEX IF NOT EXISTS ix_asset_assignments_active_employee
+    ON asset_assignments (employee_id)
+    WHERE is_active;
+
+-- check_clearance missing-asset lookup over all assignments of an employee
+CREATE INDEX IF NOT EXISTS ix_asset_assignments_employee_asset
+    ON asset_assignments (employee_id, asset_code);
+
+-- Repair bookkeeping: asset_code = :code AND is_active = TRUE
+CREATE INDEX IF NOT EXISTS ix_repair_tracking_active_asset
+    ON repair_tracking (asset_code)
+    WHERE is_active;
+
+-- repair_list: WHERE is_active = TRUE, ordered by start date in exports
+CREATE INDEX IF NOT EXISTS ix_repair_tracking_active_start
+    ON repair_tracking (repair_start_date)
+    WHERE is_active;
+
+-- list_assets keyset pagination: ORDER BY created_at DESC, asset_code DESC
+CREATE INDEX IF NOT EXISTS ix_assets_created_at_code
+    ON assets (created_at DESC, asset_code DESC);
+
+-- add_category duplicate check: LOWER(name) = LOWER(:name) AND is_active = TRUE
+CREATE INDEX IF NOT EXISTS ix_categories_active_lower_name
+    ON categories (LOWER(name))
+    WHERE is_active;
+
+-- get_employees: WHERE status = 'active'
+CREATE INDEX IF NOT EXISTS ix_employees_status
+    ON employees (status);
+
+-- asset_history lookups per asset, newest first
+CREATE INDEX IF NOT EXISTS ix_asset_history_asset_created
+    ON asset_history (asset_code, created_at DESC);
@@ -0,0 +1,21 @@
+-- Dashboard counters kept up to date by the lifecycle routes and periodically
+-- reconciled against assets, see app/utils/inventory_stats.py.
+-- dimension is one of total/status/category/location; key is '' for total,
+-- the category id as text for category and '' for assets without a location.
+
+CREATE TABLE IF NOT EXISTS inventory_counters (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, key)
+);
+
+INSERT INTO inventory_counters (dimension, key, count)
+SELECT 'total', '', COUNT(*) FROM assets
+UNION ALL
+SELECT 'status', status, COUNT(*) FROM assets GROUP BY status
+UNION ALL
+SELECT 'category', CAST(category_id AS TEXT), COUNT(*) FROM assets GROUP BY category_id
+UNION ALL
+SELECT 'location', COALESCE(location, ''), COUNT(*) FROM assets GROUP BY COALESCE(location, '')
+ON CONFLICT (dimension, key) DO NOTHING;
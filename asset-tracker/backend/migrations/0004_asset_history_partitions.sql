@@ -0,0 +1,63 @@
+-- Range-partition asset_history by month of created_at so timeline queries over
+-- recent activity only touch recent partitions and old months can be detached
+-- cheaply, see app/utils/history_partitions.py for the rolling maintenance.
+-- The primary key has to include the partition key, hence (id, created_at).
+
+ALTER TABLE asset_history RENAME TO asset_history_legacy;
+ALTER TABLE asset_history_legacy RENAME CONSTRAINT asset_history_pkey TO asset_history_legacy_pkey;
+DROP INDEX IF EXISTS ix_asset_history_asset_created;
+
+CREATE TABLE asset_history (
+    id BIGINT NOT NULL DEFAULT nextval('asset_history_id_seq'),
+    asset_code TEXT NOT NULL,
+    action TEXT NOT NULL,
+    old_status TEXT,
+    new_status TEXT,
+    employee_id TEXT,
+    remarks TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Keep the sequence when the legacy table is dropped below
+ALTER SEQUENCE asset_history_id_seq OWNED BY asset_history.id;
+
+-- Safety net for rows outside the maintained range; normally stays empty
+CREATE TABLE asset_history_default PARTITION OF asset_history DEFAULT;
+
+-- One partition per month from the oldest existing row to three months ahead
+DO $$
+DECLARE
+    partition_month DATE := date_trunc('month', COALESCE(
+        (SELECT MIN(created_at) FROM asset_history_legacy),
+        CURRENT_TIMESTAMP
+    ));
+BEGIN
+    WHILE partition_month <= date_trunc('month', CURRENT_TIMESTAMP) + INTERVAL '3 months' LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF asset_history FOR VALUES FROM (%L) TO (%L)',
+            'asset_history_' || to_char(partition_month, '"y"YYYY"m"MM'),
+            partition_month,
+            partition_month + INTERVAL '1 month'
+        );
+        partition_month := partition_month + INTERVAL '1 month';
+    END LOOP;
+END $$;
+
+INSERT INTO asset_history
+SELECT id, asset_code, action, old_status, new_status, employee_id, remarks, created_at
+FROM asset_history_legacy;
+
+DROP TABLE asset_history_legacy;
+
+-- Per-asset timeline, newest first
+CREATE INDEX IF NOT EXISTS ix_asset_history_asset_created
+    ON asset_history (asset_code, created_at DESC, id DESC);
+
+-- Per-employee timeline, newest first
+CREATE INDEX IF NOT EXISTS ix_asset_history_employee_created
+    ON asset_history (employee_id, created_at DESC, id DESC);
+
+-- Global feed keyset on (created_at, id)
+CREATE INDEX IF NOT EXISTS ix_asset_history_created_id
+    ON asset_history (created_at DESC, id DESC);
@@ -0,0 +1,38 @@
+-- Publish every asset_history row on the asset_changes channel for the live
+-- change feed, see app/utils/change_feed.py. NOTIFY is transactional, so
+-- listeners only hear about changes once they commit. asset_history.id is the
+-- feed sequence clients reconnect from.
+--
+-- Statement-level with a transition table so a batch costs one trigger call;
+-- very large inserts (seeding, backfills) send a single reload hint instead
+-- of flooding the queue.
+
+CREATE OR REPLACE FUNCTION notify_asset_changes() RETURNS trigger AS $$
+BEGIN
+    IF (SELECT COUNT(*) FROM inserted_history) > 5000 THEN
+        PERFORM pg_notify('asset_changes', '{"reload": true}');
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify('asset_changes', json_build_object(
+        'seq', h.id,
+        'asset_code', h.asset_code,
+        'action', h.action,
+        'old_status', h.old_status,
+        'new_status', h.new_status,
+        'employee_id', h.employee_id,
+        'created_at', h.created_at
+    )::text)
+    FROM (SELECT * FROM inserted_history ORDER BY id) h;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS asset_history_notify ON asset_history;
+
+CREATE TRIGGER asset_history_notify
+    AFTER INSERT ON asset_history
+    REFERENCING NEW TABLE AS inserted_history
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_asset_changes();
@@ -0,0 +1,102 @@
+-- Search documents behind GET /assets/search, see app/utils/asset_search.py.
+--
+-- One row per asset holding the searchable text (code, serial, brand, model,
+-- category name, current assignee name) plus its weighted tsvector. Category
+-- and assignee live in other tables, so the documents are kept in a side
+-- table refreshed by statement-level triggers on every table that feeds them;
+-- each triggering statement refreshes all the assets it touched in one go.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE TABLE IF NOT EXISTS asset_search (
+    asset_code TEXT PRIMARY KEY REFERENCES assets (asset_code) ON DELETE CASCADE,
+    document TEXT NOT NULL,
+    vector TSVECTOR NOT NULL
+);
+
+CREATE OR REPLACE VIEW asset_search_source AS
+SELECT
+    a.asset_code,
+    concat_ws(' ', a.asset_code, a.serial_number, a.brand, a.model, c.name, e.name) AS document,
+    setweight(to_tsvector('simple', concat_ws(' ', a.asset_code, a.serial_number)), 'A')
+        || setweight(to_tsvector('simple', concat_ws(' ', a.brand, a.model)), 'B')
+        || setweight(to_tsvector('simple', concat_ws(' ', c.name, e.name)), 'C') AS vector
+FROM assets a
+LEFT JOIN categories c ON c.id = a.category_id
+LEFT JOIN asset_assignments aa ON aa.asset_code = a.asset_code
+    AND aa.is_active = TRUE
+LEFT JOIN employees e ON e.employee_id = aa.employee_id;
+
+CREATE OR REPLACE FUNCTION refresh_asset_search(codes TEXT[]) RETURNS void AS $$
+    INSERT INTO asset_search (asset_code, document, vector)
+    SELECT asset_code, document, vector
+    FROM asset_search_source
+    WHERE asset_code = ANY(codes)
+    ORDER BY asset_code
+    ON CONFLICT (asset_code) DO UPDATE
+    SET document = EXCLUDED.document,
+        vector = EXCLUDED.vector;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION refresh_asset_search_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'categories' THEN
+        PERFORM refresh_asset_search(ARRAY(
+            SELECT a.asset_code FROM assets a JOIN changed ch ON ch.id = a.category_id
+        ));
+    ELSIF TG_TABLE_NAME = 'employees' THEN
+        PERFORM refresh_asset_search(ARRAY(
+            SELECT aa.asset_code FROM asset_assignments aa
+            JOIN changed ch ON ch.employee_id = aa.employee_id
+            WHERE aa.is_active = TRUE
+        ));
+    ELSE
+        -- assets and asset_assignments both carry asset_code
+        PERFORM refresh_asset_search(ARRAY(SELECT DISTINCT asset_code FROM changed));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow a single event per trigger, hence the pairs
+DROP TRIGGER IF EXISTS assets_search_insert ON assets;
+CREATE TRIGGER assets_search_insert
+    AFTER INSERT ON assets REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_asset_search_trigger();
+
+DROP TRIGGER IF EXISTS assets_search_update ON assets;
+CREATE TRIGGER assets_search_update
+    AFTER UPDATE ON assets REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_asset_search_trigger();
+
+DROP TRIGGER IF EXISTS asset_assignments_search_insert ON asset_assignments;
+CREATE TRIGGER asset_assignments_search_insert
+    AFTER INSERT ON asset_assignments REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_asset_search_trigger();
+
+DROP TRIGGER IF EXISTS asset_assignments_search_update ON asset_assignments;
+CREATE TRIGGER asset_assignments_search_update
+    AFTER UPDATE ON asset_assignments REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_asset_search_trigger();
+
+DROP TRIGGER IF EXISTS categories_search_update ON categories;
+CREATE TRIGGER categories_search_update
+    AFTER UPDATE ON categories REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_asset_search_trigger();
+
+DROP TRIGGER IF EXISTS employees_search_update ON employees;
+CREATE TRIGGER employees_search_update
+    AFTER UPDATE ON employees REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION refresh_asset_search_trigger();
+
+INSERT INTO asset_search (asset_code, document, vector)
+SELECT asset_code, document, vector FROM asset_search_source
+ON CONFLICT (asset_code) DO NOTHING;
+
+-- Prefix matching on words ('lap01:*'), ranked with ts_rank_cd
+CREATE INDEX IF NOT EXISTS ix_asset_search_vector
+    ON asset_search USING GIN (vector);
+
+-- Fuzzy / substring matching (word_similarity, ILIKE)
+CREATE INDEX IF NOT EXISTS ix_asset_search_document_trgm
+    ON asset_search USING GIN (document gin_trgm_ops);
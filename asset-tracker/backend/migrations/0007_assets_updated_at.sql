@@ -0,0 +1,3 @@
+-- /assets/snapshot: max(updated_at) for the version and updated_at > :since for deltas
+CREATE INDEX IF NOT EXISTS ix_assets_updated_at
+    ON assets (updated_at);
@@ -0,0 +1,4 @@
+-- Warranty expiry report: warranty_applicable AND warranty_end_date BETWEEN :today AND :horizon
+CREATE INDEX IF NOT EXISTS ix_assets_warranty_end
+    ON assets (warranty_end_date)
+    WHERE warranty_applicable;
@@ -0,0 +1,43 @@
+-- Repair turnaround: when each repair ended and which action ended it
+ALTER TABLE repair_tracking
+    ADD COLUMN IF NOT EXISTS repair_end_date TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS close_action TEXT;
+
+-- Repairs closed before this migration: the first history row that moved the
+-- asset out of repair after the repair started and no later than the start
+-- of the asset's next repair. complete_repair wrote no history before, so a
+-- later row can belong to a later repair; without the bound an older repair
+-- would take its end. Repairs with no row in their window keep NULL.
+WITH windows AS (
+    SELECT
+        id,
+        asset_code,
+        repair_start_date,
+        LEAD(repair_start_date) OVER (
+            PARTITION BY asset_code
+            ORDER BY repair_start_date, id
+        ) AS next_start_date
+    FROM repair_tracking
+)
+UPDATE repair_tracking r
+SET (repair_end_date, close_action) = (
+    SELECT h.created_at, h.action
+    FROM asset_history h
+    WHERE h.asset_code = w.asset_code
+    AND h.old_status = 'repair'
+    AND h.created_at > w.repair_start_date
+    -- A repair sent straight back to repair ends in the same transaction
+    AND (w.next_start_date IS NULL OR h.created_at <= w.next_start_date)
+    ORDER BY h.created_at, h.id
+    LIMIT 1
+)
+FROM windows w
+WHERE w.id = r.id
+AND r.is_active = FALSE
+AND r.repair_end_date IS NULL;
+
+-- Repair analytics: per-technician queue and turnaround, GROUP BY repair_assignee_id
+-- over active and recently completed repairs; INCLUDE allows an index-only scan
+CREATE INDEX IF NOT EXISTS ix_repair_tracking_assignee_active
+    ON repair_tracking (repair_assignee_id, is_active)
+    INCLUDE (repair_start_date, repair_end_date, close_action);
@@ -0,0 +1,34 @@
+-- Version of /assets/snapshot, see app/utils/asset_snapshot.py.
+--
+-- updated_at is the transaction start time, so it can't tell whether a write
+-- has committed: a transaction that started earlier and commits later leaves
+-- max(updated_at) where it was. Instead every transaction that writes assets
+-- bumps this single counter. The bump is a deferred trigger, so it runs at
+-- commit, after the transaction's other locks are taken, and a concurrent
+-- committer waits for the row and then increments the value it committed.
+-- The counter therefore grows with every committed change, in commit order.
+
+CREATE TABLE IF NOT EXISTS asset_snapshot_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO asset_snapshot_version (id) VALUES (TRUE)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_asset_snapshot_version() RETURNS trigger AS $$
+BEGIN
+    -- Constraint triggers are per row; bump once per transaction
+    IF current_setting('asset_snapshot.bumped', true) IS DISTINCT FROM 'on' THEN
+        UPDATE asset_snapshot_version SET version = version + 1;
+        PERFORM set_config('asset_snapshot.bumped', 'on', true);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS assets_snapshot_version ON assets;
+CREATE CONSTRAINT TRIGGER assets_snapshot_version
+    AFTER INSERT OR UPDATE ON assets
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION bump_asset_snapshot_version();
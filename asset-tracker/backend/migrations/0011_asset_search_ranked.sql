@@ -0,0 +1,53 @@
+-- Ordered candidates for GET /assets/search, see app/utils/asset_search.py.
+--
+-- GIN answers "which documents match" but not "which match first", so the
+-- search ranks by tier and reads each tier in asset_code order. This adds
+-- the btree behind the code tier and the word list behind the fuzzy tier.
+
+-- Code tier: lower(asset_code) range for the typed prefix, in index order.
+-- COLLATE "C" so the range and the ORDER BY agree whatever the database
+-- collation is.
+CREATE INDEX IF NOT EXISTS ix_asset_search_code_lower
+    ON asset_search ((lower(asset_code) COLLATE "C"));
+
+-- Fuzzy tier: every lexeme that has appeared in a document. Typos are
+-- corrected against these short words (a trigram lookup over words, not
+-- over whole documents), then matched through ix_asset_search_vector.
+-- Words are only added; one that no longer occurs just matches nothing.
+CREATE TABLE IF NOT EXISTS asset_search_words (
+    word TEXT PRIMARY KEY
+);
+
+CREATE OR REPLACE FUNCTION add_asset_search_words() RETURNS trigger AS $$
+BEGIN
+    -- Sorted so concurrent writers insert shared new words in the same order
+    INSERT INTO asset_search_words (word)
+    SELECT DISTINCT u.lexeme
+    FROM changed, unnest(changed.vector) AS u
+    ORDER BY u.lexeme
+    ON CONFLICT (word) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS asset_search_words_insert ON asset_search;
+CREATE TRIGGER asset_search_words_insert
+    AFTER INSERT ON asset_search REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION add_asset_search_words();
+
+DROP TRIGGER IF EXISTS asset_search_words_update ON asset_search;
+CREATE TRIGGER asset_search_words_update
+    AFTER UPDATE ON asset_search REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION add_asset_search_words();
+
+INSERT INTO asset_search_words (word)
+SELECT DISTINCT u.lexeme
+FROM asset_search, unnest(asset_search.vector) AS u
+ON CONFLICT (word) DO NOTHING;
+
+-- Fuzzy tier: word % :word OR :word <% word
+CREATE INDEX IF NOT EXISTS ix_asset_search_words_trgm
+    ON asset_search_words USING GIN (word gin_trgm_ops);
+
+-- Fuzzy matching no longer scans whole documents
+DROP INDEX IF EXISTS ix_asset_search_document_trgm;
@@ -0,0 +1,51 @@
+import io
+
+import pytest
+from sqlalchemy import text
+
+from app.utils.asset_import import _resolve_category, import_assets
+
+SEED_SQL = """
+    INSERT INTO categories (id, name) VALUES (1, 'Laptop');
+    INSERT INTO employees (employee_id, name, status) VALUES ('TECH1', 'Technician One', 'active');
+    INSERT INTO assets (asset_code, category_id, status) VALUES
+        ('KEPT', 1, 'assigned'),
+        ('FIXED', 1, 'repair');
+    INSERT INTO repair_tracking (asset_code, repair_assignee_id) VALUES ('FIXED', 'TECH1')
+"""
+
+
+@pytest.mark.parametrize("raw", ["1", "1.0", " 1 "])
+def test_category_id_accepts_integers(raw):
+    assert _resolve_category({"category_id": raw}, {}, {1}) == (1, None)
+
+
+@pytest.mark.parametrize("raw", ["inf", "-inf", "nan", "1.5", "1e400", "one"])
+def test_category_id_rejects_anything_else(raw):
+    assert _resolve_category({"category_id": raw}, {}, {1}) == (None, f"Invalid category_id '{raw}'")
+
+
+@pytest.mark.anyio
+async def test_imported_changes_are_recorded_in_history(db):
+    for statement in filter(str.strip, SEED_SQL.split(";")):
+        await db.execute(text(statement))
+    await db.commit()
+
+    upload = io.BytesIO(b"asset_code,category_id,brand\nKEPT,1,Dell\nFIXED,1,HP\nNEW,1,Lenovo\n")
+    events = [event async for event in import_assets(db, upload, "csv")]
+    assert events[-1]["event"] == "done"
+
+    history = (await db.execute(text("""
+        SELECT asset_code, action, old_status, new_status, remarks
+        FROM asset_history ORDER BY asset_code
+    """))).all()
+    assert [tuple(row) for row in history] == [
+        ("FIXED", "updated", "repair", "instock", "imported"),
+        ("KEPT", "updated", "assigned", "assigned", "imported"),
+        ("NEW", "added", None, "instock", "imported"),
+    ]
+
+    [(is_active, close_action)] = (await db.execute(text(
+        "SELECT is_active, close_action FROM repair_tracking WHERE asset_code = 'FIXED'"
+    ))).all()
+    assert (is_active, close_action) == (False, "imported")
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import text
+
+from app.utils import asset_search
+from app.utils.asset_search import code_range, prefix_tsquery, search_assets
+
+SEED_SQL = """
+    INSERT INTO categories (id, name) VALUES (1, 'Laptop');
+    INSERT INTO assets (asset_code, category_id, brand, model, serial_number, status) VALUES
+        ('A100', 1, 'Lenovo', 'X1', 'SN900', 'instock'),
+        ('A200', 1, 'Dell', 'A10', 'SN100', 'instock'),
+        ('B100', 1, 'Lenovo', 'T14', 'SNA100', 'instock'),
+        ('B200', 1, 'Dell', 'Latitude', 'SN200', 'instock'),
+        ('C100', 1, 'Lenovo', 'X1', 'SN300', 'instock')
+"""
+
+
+def test_query_shapes():
+    assert prefix_tsquery("Dell  lat-5") == "dell:* & lat:* & 5:*"
+    assert prefix_tsquery("--") is None
+    assert code_range("BEN01") == ("ben01", "ben02")
+
+
+async def _write(db, sql: str):
+    for statement in filter(str.strip, sql.split(";")):
+        await db.execute(text(statement))
+    await db.commit()
+
+
+async def _search(db, query: str, limit: int = 10):
+    return [(item["asset_code"], item["match"]) for item in await search_assets(db, query, limit)]
+
+
+@pytest.mark.anyio
+async def test_code_matches_rank_before_word_matches(db):
+    await _write(db, SEED_SQL)
+
+    # 'a10' is the start of A100 and of model A10 on A200
+    assert await _search(db, "a10") == [("A100", "code"), ("A200", "word")]
+    assert await _search(db, "lenovo") == [("A100", "word"), ("B100", "word"), ("C100", "word")]
+    assert await _search(db, "lenovo", limit=2) == [("A100", "word"), ("B100", "word")]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("window", [1, 2, 1000])
+async def test_word_matches_come_in_code_order_from_either_path(db, monkeypatch, window):
+    await _write(db, SEED_SQL)
+    monkeypatch.setattr(asset_search, "SEARCH_WINDOW", window)
+
+    assert await _search(db, "x1 lenovo") == [("A100", "word"), ("C100", "word")]
+    assert await _search(db, "sn", limit=3) == [("A100", "word"), ("A200", "word"), ("B100", "word")]
+
+
+@pytest.mark.anyio
+async def test_typos_are_corrected_from_the_words_seen(db):
+    await _write(db, SEED_SQL)
+    assert await _search(db, "frmework") == []
+
+    # New words reach asset_search_words through the asset_search triggers
+    await _write(db, "UPDATE assets SET brand = 'Framework' WHERE asset_code = 'B200'")
+    [item] = await search_assets(db, "frmework", 10)
+
+    assert (item["asset_code"], item["match"]) == ("B200", "fuzzy")
+    assert "<mark>Framework</mark>" in item["highlight"]
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from app.utils.asset_snapshot import current_version, version_time, version_token
+
+SEED_SQL = """
+    INSERT INTO categories (id, name) VALUES (1, 'Laptop');
+    INSERT INTO assets (asset_code, category_id, status, updated_at) VALUES
+        ('A1', 1, 'instock', TIMESTAMP '2026-01-01 10:00:00'),
+        ('A2', 1, 'instock', TIMESTAMP '2026-01-01 10:00:30')
+"""
+
+
+def test_version_token_carries_the_delta_time():
+    updated_at = datetime(2026, 1, 1, 10, 0, 30, 123456)
+    assert version_time(version_token(7, updated_at)) == updated_at
+    assert version_token(0, None) == "0-0"
+    assert version_time("junk") is None
+
+
+async def _write(db, sql: str):
+    for statement in filter(str.strip, sql.split(";")):
+        await db.execute(text(statement))
+    await db.commit()
+
+
+@pytest.mark.anyio
+async def test_every_committed_write_changes_the_version(db):
+    await _write(db, SEED_SQL)
+    before = await current_version(db)
+
+    # Started before the newest write and committed after it: inside the
+    # overlap window, so neither max(updated_at) nor a count over it moves
+    await _write(db, """
+        UPDATE assets SET location = 'Store', updated_at = TIMESTAMP '2026-01-01 10:00:10'
+        WHERE asset_code = 'A1'
+    """)
+    after = await current_version(db)
+
+    assert after != before
+    assert version_time(after) == version_time(before)
+
+
+@pytest.mark.anyio
+async def test_one_bump_per_transaction(db):
+    await _write(db, SEED_SQL)
+    [(start,)] = (await db.execute(text("SELECT version FROM asset_snapshot_version"))).all()
+
+    await _write(db, "UPDATE assets SET location = 'Store'; UPDATE assets SET location = 'Desk'")
+    await _write(db, "UPDATE assets SET location = 'Store' WHERE asset_code = 'A1'")
+
+    [(end,)] = (await db.execute(text("SELECT version FROM asset_snapshot_version"))).all()
+    assert end == start + 2
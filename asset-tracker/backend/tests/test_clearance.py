@@ -0,0 +1,34 @@
+import pytest
+from sqlalchemy import text
+
+from app.routes.clearance import ClearanceBatch, bulk_approve_clearance
+from app.utils.config import ADMIN_SECRET
+
+pytestmark = pytest.mark.anyio
+
+SEED_SQL = """
+    INSERT INTO categories (id, name) VALUES (1, 'Laptop');
+    INSERT INTO employees (employee_id, name) VALUES ('E1', 'Holder'), ('E2', 'Lost one'), ('E3', 'Clear');
+    INSERT INTO assets (asset_code, category_id, status) VALUES ('A1', 1, 'assigned'), ('A2', 1, 'missing');
+    INSERT INTO asset_assignments (asset_code, employee_id, is_active) VALUES ('A1', 'E1', TRUE), ('A2', 'E2', FALSE)
+"""
+
+
+async def test_bulk_approve_reports_approved_blocked_and_unknown(db):
+    for statement in SEED_SQL.split(";"):
+        await db.execute(text(statement))
+    await db.commit()
+
+    response = await bulk_approve_clearance(
+        ClearanceBatch(employee_ids=["E3", "E1", "E2", "NOPE", "E3"]), ADMIN_SECRET, db
+    )
+
+    assert response["approved"] == ["E3"]
+    assert response["blocked"] == [
+        {"employee_id": "E1", "clearance": False, "reason": "Assets still assigned", "assets": ["A1"]},
+        {"employee_id": "E2", "clearance": False, "reason": "Employee linked to missing assets", "assets": ["A2"]},
+    ]
+    assert response["not_found"] == ["NOPE"]
+
+    statuses = dict((await db.execute(text("SELECT employee_id, status FROM employees"))).all())
+    assert statuses == {"E1": "active", "E2": "active", "E3": "inactive"}
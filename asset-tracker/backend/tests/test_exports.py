@@ -0,0 +1,58 @@
+import io
+from datetime import date, datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from app.utils.exports import csv_chunks, parquet_chunks
+
+pytestmark = pytest.mark.anyio
+
+COLUMNS = ["asset_code", "warranty_end_date", "updated_at", "is_active", "id"]
+TYPES = {"warranty_end_date": "date", "updated_at": "timestamp", "is_active": "bool", "id": "int64"}
+
+
+async def _batches(*batches):
+    for batch in batches:
+        yield batch
+
+
+async def _collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+async def test_parquet_schema_does_not_depend_on_the_first_batch():
+    body = await _collect(parquet_chunks(COLUMNS, _batches(
+        # All NULL except the code in the first batch
+        [("A1", None, None, None, None)],
+        [("A2", date(2027, 1, 31), datetime(2026, 5, 1, 12, 30), True, 7)],
+    ), TYPES))
+
+    table = pq.read_table(io.BytesIO(body))
+    assert table.schema.field("warranty_end_date").type == pa.date32()
+    assert table.schema.field("updated_at").type == pa.timestamp("us")
+    assert table.schema.field("is_active").type == pa.bool_()
+    assert table.schema.field("id").type == pa.int64()
+    assert table.column("warranty_end_date").to_pylist() == [None, date(2027, 1, 31)]
+    assert table.column("id").to_pylist() == [None, 7]
+
+
+async def test_parquet_without_rows_keeps_the_schema():
+    table = pq.read_table(io.BytesIO(await _collect(parquet_chunks(COLUMNS, _batches(), TYPES))))
+
+    assert table.num_rows == 0
+    assert table.schema.field("updated_at").type == pa.timestamp("us")
+
+
+async def test_untyped_columns_are_strings():
+    body = await _collect(parquet_chunks(["asset_code", "serial_number"], _batches([("A1", 12345)])))
+
+    assert pq.read_table(io.BytesIO(body)).column("serial_number").to_pylist() == ["12345"]
+
+
+async def test_csv_streams_each_batch():
+    chunks = [chunk async for chunk in csv_chunks(["a", "b"], _batches([(1, 2)], [(3, None)]))]
+
+    assert b"".join(chunks).decode().splitlines() == ["a,b", "1,2", "3,"]
+    assert len(chunks) == 2
@@ -0,0 +1,195 @@
+import pytest
+from sqlalchemy import text
+
+from app.utils.lifecycle import ASSET_STATES, TRANSITIONS, TransitionItem, apply_transition
+
+pytestmark = pytest.mark.anyio
+
+SEED_SQL = """
+    INSERT INTO categories (id, name) VALUES (1, 'Laptop');
+    INSERT INTO employees (employee_id, name, status) VALUES
+        ('HOLDER', 'Holder', 'active'),
+        ('TECH1', 'Technician One', 'active'),
+        ('TECH2', 'Technician Two', 'active'),
+        ('GONE', 'Former', 'inactive')
+"""
+
+
+async def _execute(db, sql: str, params=None):
+    for statement in filter(str.strip, sql.split(";")):
+        await db.execute(text(statement), params or {})
+
+
+async def _asset_in(db, asset_code: str, state: str):
+    """Seed employees and an asset in `state` with the rows that state implies"""
+
+    await _execute(db, SEED_SQL)
+    await _execute(
+        db,
+        "INSERT INTO assets (asset_code, category_id, status) VALUES (:code, 1, :state)",
+        {"code": asset_code, "state": state},
+    )
+    if state == "assigned":
+        await _execute(db, "INSERT INTO asset_assignments (asset_code, employee_id) VALUES (:code, 'HOLDER')", {"code": asset_code})
+    if state == "repair":
+        await _execute(db, "INSERT INTO repair_tracking (asset_code, repair_assignee_id) VALUES (:code, 'TECH1')", {"code": asset_code})
+    await db.commit()
+
+
+async def _rows(db, sql: str, code: str = "A1"):
+    return (await db.execute(text(sql), {"code": code})).all()
+
+
+async def _run(db, name: str, employee_id=None, code: str = "A1"):
+    [result] = await apply_transition(db, name, [TransitionItem(code, employee_id, "note")])
+    await db.commit()
+    return result
+
+
+def _employee_for(name: str):
+    return "TECH2" if TRANSITIONS[name].requires_employee else None
+
+
+@pytest.mark.parametrize("state", ASSET_STATES)
+@pytest.mark.parametrize("name", list(TRANSITIONS))
+async def test_source_states(db, name, state):
+    transition = TRANSITIONS[name]
+    await _asset_in(db, "A1", state)
+
+    result = await _run(db, name, _employee_for(name))
+
+    [(status,)] = await _rows(db, "SELECT status FROM assets WHERE asset_code = :code")
+    history = await _rows(db, "SELECT action, old_status, new_status FROM asset_history WHERE asset_code = :code")
+
+    if state in transition.from_states:
+        assert result["success"]
+        assert (result["old_status"], result["new_status"]) == (state, transition.to_state)
+        assert status == transition.to_state
+        assert history == [(transition.action, state, transition.to_state)]
+    else:
+        assert not result["success"]
+        assert result["status_code"] == 400
+        assert status == state
+        assert history == []
+
+
+@pytest.mark.parametrize("name, state, employee_id, recorded", [
+    ("assign", "instock", "TECH2", "TECH2"),
+    # The holder, not whatever employee_id a bulk caller sent
+    ("return", "assigned", "TECH2", "HOLDER"),
+    ("repair", "assigned", "TECH2", "HOLDER"),
+    ("repair", "instock", "TECH2", "TECH2"),
+    ("complete_repair", "repair", "TECH2", "TECH1"),
+    ("missing", "assigned", "TECH2", "HOLDER"),
+    ("missing", "repair", "TECH2", "TECH1"),
+    ("missing", "instock", "TECH2", None),
+    ("recover", "missing", "TECH2", None),
+    ("retire", "assigned", "TECH2", "HOLDER"),
+])
+async def test_history_row(db, name, state, employee_id, recorded):
+    await _asset_in(db, "A1", state)
+
+    assert (await _run(db, name, employee_id))["success"]
+
+    assert await _rows(db, "SELECT employee_id, remarks FROM asset_history WHERE asset_code = :code") == [
+        (recorded, "note")
+    ]
+
+
+async def test_assign_and_return_open_and_close_the_assignment(db):
+    await _asset_in(db, "A1", "instock")
+
+    assert (await _run(db, "assign", "HOLDER"))["holder_id"] == "HOLDER"
+    assert await _rows(db, "SELECT employee_id, is_active FROM asset_assignments WHERE asset_code = :code") == [
+        ("HOLDER", True)
+    ]
+
+    assert (await _run(db, "return"))["holder_id"] == "HOLDER"
+    assert await _rows(
+        db, "SELECT is_active, returned_date IS NOT NULL FROM asset_assignments WHERE asset_code = :code"
+    ) == [(False, True)]
+
+
+async def test_repair_from_repair_closes_the_old_repair_first(db):
+    await _asset_in(db, "A1", "repair")
+
+    assert (await _run(db, "repair", "TECH2"))["success"]
+
+    assert await _rows(db, """
+        SELECT repair_assignee_id, is_active, repair_end_date IS NOT NULL, close_action
+        FROM repair_tracking WHERE asset_code = :code ORDER BY id
+    """) == [
+        ("TECH1", False, True, "repair"),
+        ("TECH2", True, False, None),
+    ]
+
+
+async def test_repair_closes_the_assignment(db):
+    await _asset_in(db, "A1", "assigned")
+
+    result = await _run(db, "repair", "TECH2")
+
+    assert result["holder_id"] == "HOLDER"
+    assert await _rows(db, "SELECT is_active FROM asset_assignments WHERE asset_code = :code") == [(False,)]
+    assert await _rows(db, "SELECT repair_assignee_id, is_active FROM repair_tracking WHERE asset_code = :code") == [
+        ("TECH2", True)
+    ]
+
+
+@pytest.mark.parametrize("name, close_action", [
+    ("complete_repair", "repair_complete"),
+    ("missing", "missing"),
+    ("retire", "retire"),
+])
+async def test_leaving_repair_records_the_end(db, name, close_action):
+    await _asset_in(db, "A1", "repair")
+
+    assert (await _run(db, name))["success"]
+
+    assert await _rows(db, """
+        SELECT is_active, repair_end_date >= repair_start_date, close_action
+        FROM repair_tracking WHERE asset_code = :code
+    """) == [(False, True, close_action)]
+
+
+async def test_complete_repair_marks_the_asset_repaired(db):
+    await _asset_in(db, "A1", "repair")
+
+    await _run(db, "complete_repair")
+
+    assert await _rows(db, "SELECT status, type FROM assets WHERE asset_code = :code") == [("instock", "Repaired")]
+
+
+async def test_rejected_items(db):
+    await _asset_in(db, "A1", "instock")
+
+    results = await apply_transition(db, "assign", [
+        TransitionItem("A1", "GONE"),
+        TransitionItem("NOPE", "HOLDER"),
+        TransitionItem("A1", "HOLDER"),
+        TransitionItem("A2"),
+    ])
+
+    assert [(r["success"], r.get("status_code")) for r in results] == [
+        (False, 404),  # inactive employee
+        (False, 404),  # unknown asset
+        (False, 400),  # duplicate in batch
+        (False, 404),  # no employee given
+    ]
+    assert [r["detail"] for r in results] == [
+        "Employee not found", "Asset not found", "Duplicate asset in batch", "Employee not found",
+    ]
+
+
+async def test_status_counters_follow_the_transition(db):
+    await _asset_in(db, "A1", "instock")
+    await _execute(db, "INSERT INTO inventory_counters (dimension, key, count) VALUES ('status', 'instock', 1)")
+    await db.commit()
+
+    await _run(db, "missing")
+
+    assert await _rows(db, """
+        SELECT key, count FROM inventory_counters
+        WHERE dimension = 'status' AND key IN ('instock', 'missing')
+        ORDER BY key
+    """) == [("instock", 0), ("missing", 1)]
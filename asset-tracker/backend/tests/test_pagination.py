@@ -0,0 +1,18 @@
+from datetime import datetime, timedelta, timezone
+
+from app.utils.pagination import decode_cursor, encode_cursor, naive_utc
+
+
+def test_naive_values_pass_through():
+    value = datetime(2026, 1, 1, 10, 0)
+    assert naive_utc(value) == value
+
+
+def test_aware_values_become_naive_utc():
+    value = datetime(2026, 1, 1, 10, 0, tzinfo=timezone(timedelta(hours=2)))
+    assert naive_utc(value) == datetime(2026, 1, 1, 8, 0)
+
+
+def test_cursor_round_trip_is_naive():
+    cursor = encode_cursor(datetime(2026, 1, 1, 10, 0, tzinfo=timezone.utc), 42)
+    assert decode_cursor(cursor, int) == (datetime(2026, 1, 1, 10, 0), 42)
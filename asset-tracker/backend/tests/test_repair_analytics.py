@@ -0,0 +1,117 @@
+import pytest
+from sqlalchemy import text
+
+from app.utils.repair_analytics import load_repair_analytics
+
+SEED_SQL = """
+    INSERT INTO categories (id, name) VALUES (1, 'Laptop');
+    INSERT INTO employees (employee_id, name) VALUES ('E1', 'Tech One'), ('E2', 'Tech Two');
+    INSERT INTO assets (asset_code, category_id, status)
+    SELECT 'A' || n, 1, 'instock' FROM generate_series(1, 12) AS n;
+"""
+
+
+def _repair(asset_code, technician, started, ended=None, close_action=None):
+    """repair_tracking row with times relative to now, e.g. started='3 days'"""
+    end = f"LOCALTIMESTAMP - INTERVAL '{ended}'" if ended else "NULL"
+    action = f"'{close_action}'" if close_action else "NULL"
+    return f"""
+        INSERT INTO repair_tracking
+            (asset_code, repair_assignee_id, repair_start_date, is_active, repair_end_date, close_action)
+        VALUES
+            ('{asset_code}', '{technician}', LOCALTIMESTAMP - INTERVAL '{started}',
+             {'FALSE' if ended else 'TRUE'}, {end}, {action});
+    """
+
+
+async def _seed(db, *statements):
+    for statement in (SEED_SQL, *statements):
+        for part in filter(str.strip, statement.split(";")):
+            await db.execute(text(part))
+    await db.commit()
+
+
+@pytest.mark.anyio
+async def test_turnaround_percentiles_and_aging_buckets(db):
+    await _seed(
+        db,
+        # E1 completed 1, 2, 3, 4 and 10 hours after starting, ending a day ago
+        *(
+            _repair(f"A{i}", "E1", f"1 day {hours} hours", "1 day", "repair_complete")
+            for i, hours in enumerate((1, 2, 3, 4, 10), start=1)
+        ),
+        # Neither counts towards turnaround: retired, and outside the 90 day window
+        _repair("A6", "E1", "5 days", "3 days", "retire"),
+        _repair("A6", "E1", "300 days", "200 days", "repair_complete"),
+        # One open repair for E1, three for E2 which has completed none
+        _repair("A7", "E1", "10 days"),
+        _repair("A8", "E2", "1 day"),
+        _repair("A9", "E2", "20 days"),
+        _repair("A10", "E2", "40 days"),
+    )
+
+    analytics = await load_repair_analytics(db)
+
+    assert analytics["queue_depth"] == 4
+    assert analytics["completed"] == 5
+
+    two, one = analytics["technicians"]
+    assert one["technician_id"] == "E1"
+    assert one["technician_name"] == "Tech One"
+    assert one["queue_depth"] == 1
+    assert one["completed"] == 5
+    assert one["avg_turnaround_hours"] == 4.0
+    # Nearest rank: CUME_DIST of 3h is 0.6, the first to reach 0.5; only 10h reaches 0.9
+    assert one["p50_turnaround_hours"] == 3.0
+    assert one["p90_turnaround_hours"] == 10.0
+    assert one["oldest_open_days"] == 10.0
+    assert [bucket["count"] for bucket in one["aging"]] == [0, 1, 0, 0]
+
+    assert two["technician_id"] == "E2"
+    assert two["queue_depth"] == 3
+    assert two["completed"] == 0
+    assert two["avg_turnaround_hours"] is None
+    assert two["p50_turnaround_hours"] is None
+    assert two["p90_turnaround_hours"] is None
+    assert two["oldest_open_days"] == 40.0
+    assert [bucket["max_days"] for bucket in two["aging"]] == [7, 14, 30, None]
+    assert [bucket["count"] for bucket in two["aging"]] == [1, 0, 1, 1]
+
+
+def test_backfill_stays_within_each_repairs_window(pg_schema):
+    pg_schema.migrate(through="0008_assets_warranty_end")
+    pg_schema.execute(SEED_SQL)
+    pg_schema.execute("""
+        -- A1: completed without history, then repaired again and retired
+        INSERT INTO repair_tracking (id, asset_code, repair_assignee_id, repair_start_date, is_active)
+        VALUES
+            (1, 'A1', 'E1', TIMESTAMP '2026-01-01 09:00', FALSE),
+            (2, 'A1', 'E1', TIMESTAMP '2026-01-10 09:00', FALSE),
+        -- A2: sent straight back to repair, the second one ended as missing
+            (3, 'A2', 'E1', TIMESTAMP '2026-02-01 09:00', FALSE),
+            (4, 'A2', 'E2', TIMESTAMP '2026-02-02 09:00', FALSE);
+
+        INSERT INTO asset_history (asset_code, action, old_status, new_status, created_at)
+        VALUES
+            ('A1', 'retire', 'repair', 'retired', TIMESTAMP '2026-01-11 09:00'),
+            ('A2', 'repair', 'repair', 'repair', TIMESTAMP '2026-02-02 09:00'),
+            ('A2', 'missing', 'repair', 'missing', TIMESTAMP '2026-02-03 09:00');
+    """)
+
+    pg_schema.migrate(through="0009_repair_turnaround")
+
+    with pg_schema.connect() as conn, conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT id, to_char(repair_end_date, 'YYYY-MM-DD HH24:MI'), close_action
+            FROM repair_tracking ORDER BY id
+        """)
+        rows = cursor.fetchall()
+    conn.close()
+
+    assert rows == [
+        # The retire belongs to the later repair, so the first one stays unmatched
+        (1, None, None),
+        (2, "2026-01-11 09:00", "retire"),
+        (3, "2026-02-02 09:00", "repair"),
+        (4, "2026-02-03 09:00", "missing"),
+    ]
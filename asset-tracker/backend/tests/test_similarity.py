@@ -0,0 +1,80 @@
+import random
+import string
+from difflib import SequenceMatcher
+
+from app.utils.similarity import TrigramIndex, SIMILARITY_THRESHOLD
+
+
+def scan(name, existing_categories):
+    """The original check_duplicate_category loop"""
+    similar_categories = []
+    for existing_name in existing_categories:
+        if existing_name.lower() == name.lower():
+            similar_categories.append({"name": existing_name, "similarity": 1.0, "type": "exact"})
+        else:
+            similarity = SequenceMatcher(None, name.lower(), existing_name.lower()).ratio()
+            if similarity > SIMILARITY_THRESHOLD:
+                similar_categories.append({
+                    "name": existing_name,
+                    "similarity": round(similarity, 2),
+                    "type": "similar"
+                })
+    return similar_categories
+
+
+def test_candidates_need_a_shared_trigram():
+    # 0.75 similar to the scan, but no trigram in common to retrieve it by
+    assert scan("abd", ["eabcd"]) != []
+    assert TrigramIndex(["eabcd"]).search("abd") == []
+
+
+def test_exact_matches_are_case_insensitive():
+    names = ["Laptop", "laptop", "Laptops", "Desktop"]
+    assert TrigramIndex(names).search("LAPTOP") == scan("LAPTOP", names)
+
+
+def test_results_are_scored_like_the_scan():
+    rng = random.Random(5)
+    alphabet = "abcde"
+    for _ in range(3000):
+        names = ["".join(rng.choices(alphabet, k=rng.randint(0, 8))) for _ in range(rng.randint(1, 6))]
+        query = "".join(rng.choices(alphabet, k=rng.randint(0, 8)))
+        expected = scan(query, names)
+        found = TrigramIndex(names).search(query)
+        assert all(match in expected for match in found), (query, names)
+        assert [m for m in found if m["type"] == "exact"] == [m for m in expected if m["type"] == "exact"]
+
+
+def test_small_lists_match_the_scan():
+    # Fewer names than candidates: everything sharing a trigram gets scored
+    names = ["Laptop", "Laptops", "Laptop Bag", "Desktop", "Docking Station", "Monitor", "Mouse"]
+    index = TrigramIndex(names)
+    for query in ("laptop", "Lapto", "desktops", "Monitors", "docking statoin"):
+        assert index.search(query) == scan(query, names)
+
+
+def test_recall_on_category_like_names():
+    rng = random.Random(11)
+    words = ["laptop", "desktop", "monitor", "mouse", "printer", "docking", "station", "cable"]
+    names = [
+        " ".join(rng.sample(words, rng.randint(1, 2))) + "".join(rng.choices(string.ascii_lowercase, k=rng.randint(0, 3)))
+        for _ in range(500)
+    ]
+    index = TrigramIndex(names)
+
+    found = total = 0
+    for _ in range(100):
+        query = rng.choice(names)[:-1].title()
+        expected_matches = scan(query, names)
+        want = sorted(expected_matches, key=lambda m: -m["similarity"])[:10]
+        got = index.search(query)
+        assert all(match in expected_matches for match in got)
+        found += sum(match in got for match in want)
+        total += len(want)
+    assert found / total > 0.85
+
+
+def test_limit_keeps_exact_and_most_similar():
+    names = ["monitor", "monitors", "monitorss", "Monitor", "moniter"]
+    found = TrigramIndex(names).search("monitor", limit=1)
+    assert [m["name"] for m in found] == ["monitor", "monitors", "Monitor"]
@@ -30,6 +30,23 @@ export async function fetchAsset(code) {
   return res.json();
 }
 
+export async function searchAssets(q, limit = 8) {
+  const params = new URLSearchParams({ q, limit }).toString();
+  const res = await fetch(`${BASE_URL}/assets/search?${params}`);
+  if (!res.ok) return [];
+  const data = await res.json();
+  return data.items || [];
+}
+
+export async function lookupAssets(codes) {
+  const res = await fetch(`${BASE_URL}/assets/lookup`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ codes }),
+  });
+  return res.json();
+}
+
 export async function assignAsset(code, employeeId) {
   const res = await fetch(
     `${BASE_URL}/assign?asset_code=${code}&employee_id=${employeeId}`,
@@ -55,6 +72,54 @@ export async function fetchAssets() {
   return res.json();
 }
 
+// Dictionary-encoded columns -> row objects
+function decodeSnapshot({ columns, dictionaries, data, count }) {
+  const rows = new Array(count);
+  for (let i = 0; i < count; i++) {
+    const row = {};
+    for (const column of columns) {
+      const value = data[column][i];
+      const dictionary = dictionaries[column];
+      row[column] = dictionary && value !== null ? dictionary[value] : value;
+    }
+    rows[i] = row;
+  }
+  return rows;
+}
+
+// Full inventory snapshot; pass the previous result to fetch only what changed since
+export async function fetchAssetSnapshot(previous) {
+  const query = previous ? `?since=${encodeURIComponent(previous.version)}` : "";
+  const headers = previous ? { "If-None-Match": `W/"${previous.version}"` } : {};
+  const res = await fetch(`${BASE_URL}/assets/snapshot${query}`, { headers });
+  if (res.status === 304) return previous;
+
+  const snapshot = await res.json();
+  const rows = decodeSnapshot(snapshot);
+  if (!snapshot.delta) return { version: snapshot.version, rows };
+
+  // Deltas are upserts by asset_code; new assets go first like in the full list
+  const changed = new Map(rows.map(row => [row.asset_code, row]));
+  const merged = previous.rows.map(row => changed.get(row.asset_code) || row);
+  const known = new Set(previous.rows.map(row => row.asset_code));
+  const added = rows.filter(row => !known.has(row.asset_code));
+  return { version: snapshot.version, rows: [...added, ...merged] };
+}
+
+// Live asset changes; EventSource reconnects on its own and resumes from the last event id
+export function subscribeAssetChanges({ onChange, onReload }) {
+  const source = new EventSource(`${BASE_URL}/events/assets`);
+  source.addEventListener("change", (e) => onChange(JSON.parse(e.data)));
+  source.addEventListener("reload", () => onReload());
+  return () => source.close();
+}
+
+export async function fetchAssetsPage(filters = {}) {
+  const params = new URLSearchParams({ limit: 100, ...filters }).toString();
+  const res = await fetch(`${BASE_URL}/assets?${params}`);
+  return res.json();
+}
+
 export async function fetchAssetCount() {
   const res = await fetch(`${BASE_URL}/assets/count`);
   const data = await res.json();
@@ -107,11 +172,53 @@ export async function approveClearance(empId, secret) {
   return res.json();
 }
 
+export async function checkClearanceBatch(employeeIds) {
+  const res = await fetch(`${BASE_URL}/exit-clearance/bulk`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ employee_ids: employeeIds }),
+  });
+  return res.json();
+}
+
+export async function approveClearanceBatch(employeeIds, secret) {
+  const res = await fetch(
+    `${BASE_URL}/exit-clearance/bulk/approve?secret=${secret}`,
+    {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ employee_ids: employeeIds }),
+    }
+  );
+  return res.json();
+}
+
 export async function fetchRepairList() {
   const res = await fetch(`${BASE_URL}/repair/list`);
   return res.json();
 }
 
+// Per-technician queue depth, turnaround percentiles and aging buckets
+export async function fetchRepairAnalytics(technicianId) {
+  const query = technicianId ? `?technician_id=${encodeURIComponent(technicianId)}` : "";
+  const res = await fetch(`${BASE_URL}/repair/analytics${query}`);
+  return res.json();
+}
+
+export async function fetchWarrantySummary() {
+  const res = await fetch(`${BASE_URL}/warranty/expiring/summary`);
+  return res.json();
+}
+
+// One page of expiring warranties; pass the previous page's next_cursor to continue
+export async function fetchExpiringWarranties({ bucket, cursor, limit = 50 } = {}) {
+  const params = new URLSearchParams({ limit });
+  if (bucket) params.set("bucket", bucket);
+  if (cursor) params.set("cursor", cursor);
+  const res = await fetch(`${BASE_URL}/warranty/expiring?${params}`);
+  return res.json();
+}
+
 export async function addEmployee(data) {
   const params = new URLSearchParams(data).toString();
   const res = await fetch(
@@ -134,8 +241,19 @@ export async function checkEmployeeAssets(employeeId) {
   return res.json();
 }
 
-export async function fetchEmployees() {
-  const res = await fetch(`${BASE_URL}/employees`);
+export async function fetchEmployees({ includeHoldings = false } = {}) {
+  const query = includeHoldings ? "?include_holdings=true" : "";
+  const res = await fetch(`${BASE_URL}/employees${query}`);
+  return res.json();
+}
+
+// Active asset counts and codes for many employees in one call
+export async function fetchEmployeeHoldings(employeeIds) {
+  const res = await fetch(`${BASE_URL}/employees/holdings`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ employee_ids: employeeIds }),
+  });
   return res.json();
 }
 
@@ -1,5 +1,5 @@
-import { useEffect, useState } from "react";
-import { fetchAssets } from "../api/api";
+import { useEffect, useRef, useState } from "react";
+import { fetchAssetSnapshot, lookupAssets, subscribeAssetChanges } from "../api/api";
 import { Card, Table, Input, Badge, LoadingSpinner, EmptyState } from "../components";
 
 export default function Assets() {
@@ -8,13 +8,35 @@ export default function Assets() {
   const [searchTerm, setSearchTerm] = useState("");
   const [filterStatus, setFilterStatus] = useState("all");
   const [filterCategory, setFilterCategory] = useState("all");
+  const snapshot = useRef(null);
 
   useEffect(() => {
-    setIsLoading(true);
-    fetchAssets().then(data => {
-      setAssets(data || []);
+    // First call loads the whole snapshot, later ones only the rows changed since
+    const load = () => fetchAssetSnapshot(snapshot.current).then(data => {
+      snapshot.current = data;
+      setAssets(data.rows);
       setIsLoading(false);
     });
+
+    setIsLoading(true);
+    load();
+
+    // Load once, then patch single rows as changes arrive
+    return subscribeAssetChanges({
+      onChange: ({ asset_code }) => {
+        lookupAssets([asset_code]).then(({ items }) => {
+          const [updated] = items || [];
+          if (!updated) return;
+          setAssets(prev => {
+            const exists = prev.some(a => a.asset_code === asset_code);
+            return exists
+              ? prev.map(a => (a.asset_code === asset_code ? { ...a, ...updated } : a))
+              : [updated, ...prev];
+          });
+        });
+      },
+      onReload: load,
+    });
   }, []);
 
   // Get unique categories
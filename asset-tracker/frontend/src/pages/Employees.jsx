@@ -17,31 +17,16 @@ export default function Employees() {
   const [showModal, setShowModal] = useState(false);
   const [searchTerm, setSearchTerm] = useState("");
 
+  // Employees and their asset counts in one request
   function load() {
-    fetchEmployees().then(setEmployees);
+    fetchEmployees({ includeHoldings: true }).then(data => {
+      setEmployees(data);
+      setEmployeeAssets(Object.fromEntries(data.map(e => [e.employee_id, e.active_assets || 0])));
+    });
   }
 
   useEffect(load, []);
 
-  // Load asset counts for all employees
-  useEffect(() => {
-    if (employees.length > 0) {
-      employees.forEach(emp => {
-        checkEmployeeAssets(emp.employee_id).then(data => {
-          setEmployeeAssets(prev => ({
-            ...prev,
-            [emp.employee_id]: data.active_assets || 0
-          }));
-        }).catch(() => {
-          setEmployeeAssets(prev => ({
-            ...prev,
-            [emp.employee_id]: 0
-          }));
-        });
-      });
-    }
-  }, [employees]);
-
   function update(e) {
     setForm({ ...form, [e.target.name]: e.target.value });
   }
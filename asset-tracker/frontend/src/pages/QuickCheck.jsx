@@ -1,5 +1,5 @@
 import { useState, useRef, useEffect } from "react";
-import { fetchAsset, fetchAssets } from "../api/api";
+import { fetchAsset, searchAssets } from "../api/api";
 import { Button, Card, Alert, Badge } from "../components";
 
 export default function QuickCheck() {
@@ -16,7 +16,6 @@ export default function QuickCheck() {
   const streamRef = useRef(null);
 
   useEffect(() => {
-    fetchAssets().then(setAssets);
     return () => {
       if (streamRef.current) {
         streamRef.current.getTracks().forEach(track => track.stop());
@@ -69,11 +68,26 @@ export default function QuickCheck() {
     setTimeout(() => loadAssetDetails(barcode), 100);
   }
 
-  const filteredAssets = assets.filter(a =>
-    `${a.asset_code} ${a.model}`
-      .toLowerCase()
-      .includes(search.toLowerCase())
-  );
+  // Suggestions come from the server-side search, debounced while typing
+  useEffect(() => {
+    const term = search.trim();
+    if (!term) {
+      setAssets([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      searchAssets(term).then(items => {
+        if (!cancelled) setAssets(items);
+      });
+    }, 150);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [search]);
+
+  const filteredAssets = assets;
 
   async function loadAssetDetails(code) {
     if (!code.trim()) {
@@ -141,7 +155,7 @@ export default function QuickCheck() {
             <div className="relative flex-1">
               <input
                 type="text"
-                placeholder="Search asset code or model..."
+                placeholder="Search code, serial, model or owner..."
                 value={search}
                 onChange={e => {
                   setSearch(e.target.value);
@@ -14,22 +14,26 @@ pkill -9 node 2>/dev/null
 pkill -9 npm 2>/dev/null
 pkill -9 vite 2>/dev/null
 
-# 2. Kill all Python/uvicorn processes
-echo -e "${RED}⛔ Killing backend processes...${NC}"
-pkill -9 -f "uvicorn" 2>/dev/null
-pkill -9 -f "python" 2>/dev/null
+# 2. Stop the backend gracefully (SIGTERM drains in-flight requests), force after 40s
+echo -e "${RED}⛔ Stopping backend processes...${NC}"
+pkill -TERM -f "app.server|uvicorn" 2>/dev/null
+for i in $(seq 1 40); do
+  pgrep -f "app.server|uvicorn" > /dev/null || break
+  sleep 1
+done
+pkill -9 -f "app.server|uvicorn" 2>/dev/null
 
 # 3. Clear ports
 echo -e "${RED}🚫 Clearing ports 5173 and 8000...${NC}"
 lsof -i :5173 -t 2>/dev/null | xargs kill -9 2>/dev/null
-lsof -i :8000 -t 2>/dev/null | xargs kill -9 2>/dev/null
+lsof -i :8000 -t 2>/dev/null | xargs kill -TERM 2>/dev/null
 
 sleep 3
 
 # 4. Start Backend
 echo -e "${YELLOW}⚙️  Starting Backend (port 8000)...${NC}"
 cd /Users/parthan/Desktop/JobAssetTracker/asset-tracker/backend
-nohup /Users/parthan/Desktop/JobAssetTracker/asset-tracker/backend/venv/bin/python -m uvicorn app.main:app --host 127.0.0.1 --port 8000 > /tmp/backend.log 2>&1 &
+nohup /Users/parthan/Desktop/JobAssetTracker/asset-tracker/backend/venv/bin/python -m app.server --host 127.0.0.1 --port 8000 --workers ${BACKEND_WORKERS:-2} --db-connection-budget ${DB_CONNECTION_BUDGET:-40} > /tmp/backend.log 2>&1 &
 BACKEND_PID=$!
 echo -e "${GREEN}✅ Backend started (PID: $BACKEND_PID)${NC}"
 
@@ -46,7 +50,7 @@ sleep 4
 
 # 6. Verify both are running
 echo -e "${YELLOW}📋 Verifying servers...${NC}"
-BACKEND_CHECK=$(curl -s http://127.0.0.1:8000/ 2>&1 | grep -q "Asset Tracker" && echo "✅" || echo "❌")
+BACKEND_CHECK=$(curl -s http://127.0.0.1:8000/health/ready 2>&1 | grep -q '"ready"' && echo "✅" || echo "❌")
 FRONTEND_CHECK=$(lsof -i :5173 2>&1 | grep -q node && echo "✅" || echo "❌")
 
 echo -e "${GREEN}Backend: $BACKEND_CHECK${NC}"